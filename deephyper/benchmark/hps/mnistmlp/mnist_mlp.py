@@ -13,6 +13,7 @@ from keras.models import Sequential
 from keras.optimizers import RMSprop
 
 from deephyper.benchmark.hps.mnistmlp.load_data import load_data
+from deephyper.evaluator.reporter import report
 
 
 def run(param_dict):
@@ -51,11 +52,16 @@ def run(param_dict):
                 optimizer=RMSprop(),
                 metrics=['accuracy'])
 
+    # intermediate objective used by searches with early stopping (e.g. ASHA)
+    report_cb = keras.callbacks.LambdaCallback(
+        on_epoch_end=lambda epoch, logs: report(epoch, -logs['val_acc']))
+
     history = model.fit(x_train, y_train,
                         batch_size=param_dict['batch_size'],
                         epochs=param_dict['epochs'],
                         verbose=1,
-                        validation_data=(x_test, y_test))
+                        validation_data=(x_test, y_test),
+                        callbacks=[report_cb])
     score = model.evaluate(x_test, y_test, verbose=0)
     print('Test loss:', score[0])
     print('Test accuracy:', score[1])
@@ -31,11 +31,29 @@ class Problem:
         return self.__space.copy()
 
 class HpProblem(Problem):
-    """Problem specification for Hyperparameter Optimization"""
+    """Problem specification for Hyperparameter Optimization
+
+    Dimensions can be conditional and some combinations of values can be forbidden:
+
+    ::
+
+        Problem = HpProblem()
+        Problem.add_dim('nunits_l2', (0, 64), 32)
+        Problem.add_dim('dropout_l2', (0.0, 0.5), 0.0)
+        Problem.add_dim('activation', ['relu', 'selu'], 'relu')
+        Problem.add_dim('optimizer', ['sgd', 'adam'], 'adam')
+        # dropout_l2 is active only when nunits_l2 > 0
+        Problem.add_condition('dropout_l2', 'nunits_l2', lambda v: v > 0)
+        Problem.add_forbidden({'activation': 'selu', 'optimizer': 'sgd'})
+
+    The value of an inactive dimension is collapsed to its inactive value (its default value, or the first value of its space when it has no default) so that configurations which only differ by inactive dimensions are identical. Configurations matching a forbidden clause are not sent to the evaluator.
+    """
 
     def __init__(self):
         super().__init__()
         self.__def_values = OrderedDict()
+        self.__conditions = OrderedDict()  # child --> (parent, condition)
+        self.__forbidden = []
 
     def __repr__(self):
         prob = super().__repr__()
@@ -55,6 +73,91 @@ class HpProblem(Problem):
         super().add_dim(p_name, p_space)
         self.__def_values[p_name] = default
 
+    def add_condition(self, p_name, parent, condition):
+        """Make a dimension active only for some values of an other dimension.
+
+        Args:
+            p_name (str): name of the conditional dimension.
+            parent (str): name of the dimension it depends on, it must have been added before ``p_name``.
+            condition: a callable taking the value of ``parent`` and returning a bool, a list of the values of ``parent`` for which ``p_name`` is active, or a single value.
+        """
+        space = self.space
+        assert p_name in space, f'Unknown dimension: {p_name}'
+        assert parent in space, f'Unknown parent dimension: {parent}'
+        names = list(space.keys())
+        assert names.index(parent) < names.index(p_name), f'{parent} must be added before {p_name}'
+        if not callable(condition):
+            values = condition if type(condition) is list else [condition]
+            condition = lambda v: v in values
+        self.__conditions[p_name] = (parent, condition)
+
+    def add_forbidden(self, clause):
+        """Forbid some combinations of values.
+
+        Args:
+            clause: a dict ``{p_name: value}``, configurations where all the given dimensions are active and equal to these values are forbidden; or a callable taking a configuration (dict) and returning True if it is forbidden.
+        """
+        if not callable(clause):
+            assert type(clause) is dict, f'clause must be dict or callable, got {type(clause)} !'
+            for p_name in clause:
+                assert p_name in self.space, f'Unknown dimension: {p_name}'
+            items = dict(clause)
+            clause = lambda x: all(
+                k in x and x[k] == v and self.is_active(k, x)
+                for k, v in items.items())
+        self.__forbidden.append(clause)
+
+    @property
+    def conditional(self):
+        """True if the problem has conditions or forbidden clauses."""
+        return bool(self.__conditions or self.__forbidden)
+
+    def inactive_value(self, p_name):
+        default = self.__def_values[p_name]
+        return default if default is not None else self.space[p_name][0]
+
+    def is_active(self, p_name, x):
+        """Check if a dimension is active in a configuration.
+
+        Args:
+            p_name (str): name of the dimension.
+            x (dict): the configuration.
+
+        Returns:
+            bool: True if all the conditions on ``p_name`` and on its ancestors are satisfied.
+        """
+        while p_name in self.__conditions:
+            parent, condition = self.__conditions[p_name]
+            if not condition(x[parent]):
+                return False
+            p_name = parent
+        return True
+
+    def collapse(self, x):
+        """Return a copy of a configuration where inactive dimensions have their inactive value."""
+        x = dict(x)
+        for p_name in self.__conditions:
+            if not self.is_active(p_name, x):
+                x[p_name] = self.inactive_value(p_name)
+        return x
+
+    def is_forbidden(self, x):
+        return any(clause(x) for clause in self.__forbidden)
+
+    def canonicalize(self, x):
+        """Collapse the inactive dimensions of a configuration and check if it is feasible.
+
+        Args:
+            x (dict): the configuration.
+
+        Returns:
+            dict: the collapsed configuration, ``None`` if it is forbidden.
+        """
+        if not self.conditional:
+            return x
+        x = self.collapse(x)
+        return None if self.is_forbidden(x) else x
+
     @property
     def starting_point(self):
         """Starting point of the search space.
@@ -3,4 +3,5 @@ The goal off the evaluator module is to have a set of objects which can helps us
 """
 
 from deephyper.evaluator.evaluate import Encoder
-__all__ = ['Encoder']
+from deephyper.evaluator.reporter import report, StopEvaluation
+__all__ = ['Encoder', 'report', 'StopEvaluation']
@@ -93,6 +93,23 @@ class BalsamEvaluator(Evaluator):
         future.task_args = args
         return future
 
+    def _collect_reports(self):
+        reports = []
+        for uid, future in self.pending_evals.items():
+            job = future.job
+            try:
+                output = job.read_file_in_workdir(f'{job.name}.out')
+            except Exception:
+                # the job has not started yet
+                continue
+            num_known = len(self.reports.get(uid, []))
+            reports.extend((uid, step, objective)
+                           for step, objective in self._parse_reports(output)[num_known:])
+        return reports
+
+    def _stop_exec(self, future):
+        future.cancel()
+
     @staticmethod
     def _on_done(job):  # def _on_done(job, process_data):
         output = job.read_file_in_workdir(f'{job.name}.out')
@@ -1,10 +1,12 @@
 import logging
 import os
+from multiprocessing import Manager
 from collections import namedtuple
 from concurrent.futures import CancelledError, ProcessPoolExecutor
 from concurrent.futures import wait as _futures_wait
 
 from deephyper.evaluator.evaluate import Evaluator
+from deephyper.evaluator.reporter import QueueReporter, run_with_reporter
 
 logger = logging.getLogger(__name__)
 WaitResult = namedtuple('WaitResult', ['active', 'done', 'failed', 'cancelled'])
@@ -24,13 +26,30 @@ class ProcessPoolEvaluator(Evaluator):
         self.executor = ProcessPoolExecutor(
             max_workers = self.num_workers
         )
+        # reports and stop requests have to be shared with the worker processes
+        self._manager = Manager()
+        self._reports_queue = self._manager.Queue()
+        self._stop_flags = self._manager.dict()
         logger.info(f"ProcessPool Evaluator will execute {self._run_function.__name__}() from module {self._run_function.__module__}")
 
     def _eval_exec(self, x):
         assert isinstance(x, dict)
-        future = self.executor.submit(self._run_function, x)
+        reporter = QueueReporter(self._gen_uid(x), self._reports_queue,
+                                 self._stop_flags)
+        future = self.executor.submit(run_with_reporter, self._run_function,
+                                      reporter, x)
         return future
 
+    def _collect_reports(self):
+        reports = []
+        while not self._reports_queue.empty():
+            reports.append(self._reports_queue.get())
+        return reports
+
+    def _stop_exec(self, future):
+        if not future.cancel():
+            self._stop_flags[future.uid] = True
+
     def wait(self, futures, timeout=None, return_when='ANY_COMPLETED'):
         return_when=return_when.replace('ANY','FIRST')
         results = _futures_wait(futures, timeout=timeout, return_when=return_when)
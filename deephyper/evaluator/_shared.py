@@ -0,0 +1,248 @@
+import json
+import logging
+import math
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from deephyper.evaluator.evaluate import Encoder, Evaluator
+from deephyper.evaluator.reporter import QueueReporter, run_with_reporter
+from deephyper.evaluator._threadPool import ThreadPoolEvaluator
+
+logger = logging.getLogger(__name__)
+
+
+class SharedPool:
+    """Pool of workers shared by the evaluators of several searches running in the same process.
+
+    Each ``SharedEvaluator`` is a tenant of the pool with a weight and a priority. Evals are queued per tenant and a free worker runs the next eval of the tenant with the highest priority and, among tenants with the same priority, with the lowest number of running evals per unit of weight (weighted fair share). Tenants without pending work do not count in the fair share: the idle capacity of a stalled search goes to the searches with pending work.
+
+    Tenants with the same run function and the same problem share their evals: an eval submitted by a tenant which is already pending for an other tenant is not executed again. The reports of a shared eval go to all the tenants waiting for it, and it is stopped when the last of them stops it. Finished evals are forgotten by the pool, each tenant caches its own results.
+
+    ::
+
+        >>> pool = SharedPool(num_workers=8)
+        >>> SharedPool.set_default(pool)
+        >>> searches = [AMBS(problem=p, run=r, evaluator='shared', share_weight=w) for p, r, w in studies]
+        >>> threads = [threading.Thread(target=s.main) for s in searches]
+
+    Args:
+        num_workers (int): number of workers, ``Evaluator.WORKERS_PER_NODE`` by default.
+    """
+    _default = None
+
+    def __init__(self, num_workers=None):
+        self.num_workers = Evaluator.WORKERS_PER_NODE if num_workers is None else num_workers
+        self.executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        self.lock = threading.RLock()
+        self.tenants = []
+        self.queues = {}  # tenant --> deque of (future, x)
+        self.running = {}  # tenant --> number of running evals
+        self.shared = {}  # (namespace, uid) --> SharedEval, for pending evals
+
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @classmethod
+    def set_default(cls, pool):
+        cls._default = pool
+
+    def register(self, tenant):
+        with self.lock:
+            self.tenants.append(tenant)
+            self.queues[tenant] = deque()
+            self.running[tenant] = 0
+        logger.info(f"Shared pool: {len(self.tenants)} tenants, {self.num_workers} workers")
+
+    def outstanding(self, tenant):
+        return len(self.queues[tenant]) + self.running[tenant]
+
+    def num_free_workers(self, tenant):
+        """Number of evals a tenant can submit.
+
+        It is the part of its fair share which is not used yet, or all the idle workers when the pool is not fully used.
+        """
+        with self.lock:
+            active = [t for t in self.tenants if t is tenant or self.outstanding(t) > 0]
+            total_weight = sum(t.weight for t in active)
+            quota = math.ceil(self.num_workers * tenant.weight / total_weight)
+            idle = self.num_workers - sum(self.outstanding(t) for t in self.tenants)
+            return max(quota - self.outstanding(tenant), idle, 0)
+
+    def submit(self, tenant, x):
+        """Queue the eval of ``x`` for a tenant.
+
+        Returns:
+            Future: the future of the eval, its result is ``Evaluator.FAIL_RETURN_VALUE`` if the eval raised an exception.
+        """
+        uid = tenant._gen_uid(x)
+        key = None if tenant.namespace is None else (tenant.namespace, uid)
+        with self.lock:
+            if key in self.shared:
+                entry = self.shared[key]
+                entry.num_subscribed += 1
+                entry.tenants.append(tenant)
+                tenant.stats['num_shared'] += 1
+                logger.info(f"Shared pool: {uid} already submitted by an other tenant")
+                future = Future()
+                future.set_running_or_notify_cancel()
+                entry.future.add_done_callback(lambda f: _copy_result(f, future))
+                return future
+            future = Future()
+            if key is not None:
+                self.shared[key] = SharedEval(future, tenant)
+            self.queues[tenant].append((future, x))
+            self._dispatch()
+        return future
+
+    def stop(self, tenant, future):
+        """Stop an eval of a tenant, a shared eval is stopped only when no other tenant waits for it.
+
+        Args:
+            tenant (SharedEvaluator): the tenant stopping the eval.
+            future (Future): the future of the eval returned by ``submit`` to the tenant.
+        """
+        owner, owner_future = tenant, future
+        if tenant.namespace is not None:
+            key = (tenant.namespace, future.uid)
+            with self.lock:
+                entry = self.shared.get(key)
+                if entry is not None:
+                    if entry.num_subscribed > 1:
+                        entry.num_subscribed -= 1
+                        return
+                    # a stopped eval is not shared anymore, its result is partial
+                    del self.shared[key]
+                    owner, owner_future = entry.owner, entry.future
+        # the eval runs with the stop flags of the tenant which submitted it
+        if not owner_future.cancel():
+            owner._stop_flags[future.uid] = True
+
+    def _release(self, tenant, x, future):
+        """Forget a shared eval when it is finished (or cancelled), before its result is set."""
+        if tenant.namespace is None:
+            return
+        key = (tenant.namespace, tenant._gen_uid(x))
+        with self.lock:
+            entry = self.shared.get(key)
+            if entry is not None and entry.future is future:
+                del self.shared[key]
+
+    def _next_tenant(self):
+        waiting = [t for t in self.tenants if self.queues[t]]
+        if not waiting:
+            return None
+        return min(waiting, key=lambda t: (-t.priority, self.running[t] / t.weight))
+
+    def _dispatch(self):
+        with self.lock:
+            while sum(self.running.values()) < self.num_workers:
+                tenant = self._next_tenant()
+                if tenant is None:
+                    return
+                future, x = self.queues[tenant].popleft()
+                if not future.set_running_or_notify_cancel():
+                    self._release(tenant, x, future)
+                    continue  # cancelled while queued
+                self.running[tenant] += 1
+                uid = tenant._gen_uid(x)
+                entry = None if tenant.namespace is None else self.shared.get((tenant.namespace, uid))
+                reports = tenant._reports_queue if entry is None else entry
+                reporter = QueueReporter(uid, reports, tenant._stop_flags)
+                inner = self.executor.submit(run_with_reporter, tenant._run_function,
+                                             reporter, x)
+                inner.add_done_callback(
+                    lambda f, tenant=tenant, x=x, future=future: self._on_done(tenant, x, f, future))
+
+    def _on_done(self, tenant, x, inner, future):
+        with self.lock:
+            self.running[tenant] -= 1
+        self._release(tenant, x, future)
+        _copy_result(inner, future)
+        self._dispatch()
+
+
+class SharedEval:
+    """Pending eval of a ``SharedPool`` shared by tenants.
+
+    It is the queue of the ``QueueReporter`` of the eval: the reports go to all the tenants which submitted the eval, also after they stopped it.
+
+    Args:
+        future (Future): future of the eval of the tenant which submitted it first.
+        owner (SharedEvaluator): the tenant which submitted it first, the eval runs with its stop flags.
+    """
+    def __init__(self, future, owner):
+        self.future = future
+        self.owner = owner
+        self.tenants = [owner]
+        self.num_subscribed = 1  # tenants waiting for the eval, which did not stop it
+
+    def put(self, item):
+        for tenant in list(self.tenants):
+            tenant._reports_queue.put(item)
+
+
+def _copy_result(source, future):
+    try:
+        result = source.result()
+    except Exception:
+        logger.exception("Eval exception:")
+        result = Evaluator.FAIL_RETURN_VALUE
+    future.set_result(result)
+
+
+class SharedEvaluator(ThreadPoolEvaluator):
+    """Evaluator submitting its evals to a ``SharedPool``.
+
+    The run function is executed by the threads of the pool, see ``ThreadPoolEvaluator``.
+
+    Args:
+        run_function (func): takes one parameter of type dict and returns a scalar value.
+        cache_key (func): takes one parameter of type dict and returns a hashable type, used as the key for caching evaluations.
+        pool (SharedPool): the pool, ``SharedPool.default()`` if ``None``.
+        problem (Problem): the problem of the search, evals are shared with the tenants which have the same run function and the same problem. ``None`` to never share evals.
+        weight (float): fair share weight of the tenant.
+        priority (int): evals of tenants with a higher priority are run first.
+    """
+    def __init__(self, run_function, cache_key=None, pool=None, problem=None,
+                 weight=1., priority=0):
+        # the workers belong to the pool, ThreadPoolEvaluator.__init__ is not called
+        Evaluator.__init__(self, run_function, cache_key)
+        assert weight > 0, f'weight must be > 0, got {weight}'
+        self.pool = SharedPool.default() if pool is None else pool
+        self.weight = weight
+        self.priority = priority
+        self.namespace = self._namespace(problem)
+        # a single search can use all the workers of the pool
+        self.num_workers = self.pool.num_workers
+        self.stats['num_shared'] = 0
+        self._reports_queue = queue.Queue()
+        self._stop_flags = {}
+        self.pool.register(self)
+        logger.info(f"Shared Evaluator will execute {self._run_function.__name__}() from module {self._run_function.__module__}")
+
+    def _namespace(self, problem):
+        if problem is None:
+            return None
+        try:
+            space = json.dumps(problem.space, cls=Encoder, sort_keys=True)
+        except TypeError:
+            logger.info("The problem can not be encoded, evals are not shared")
+            return None
+        return f'{self._run_function.__module__}.{self._run_function.__name__}:{space}'
+
+    def _eval_exec(self, x):
+        assert isinstance(x, dict)
+        future = self.pool.submit(self, x)
+        future.config = x
+        return future
+
+    def _stop_exec(self, future):
+        self.pool.stop(self, future)
+
+    def num_free_workers(self):
+        return self.pool.num_free_workers(self)
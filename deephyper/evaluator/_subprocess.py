@@ -3,8 +3,10 @@ import subprocess
 import time
 from collections import defaultdict, namedtuple
 import sys
+import threading
 
 from deephyper.evaluator.evaluate import Evaluator
+from deephyper.evaluator.reporter import STATS_TAG, parse_reports, parse_stats
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +20,29 @@ class PopenFuture:
         self._state = 'active'
         self._result = None
         self._parse = parse_fxn
+        # the output is read continuously to stream intermediate reports
+        self._stdout_lines = []
+        self.num_known_stats = 0
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+
+    def _read_stdout(self):
+        for line in self.proc.stdout:
+            self._stdout_lines.append(line)
+
+    @property
+    def stdout(self):
+        return ''.join(self._stdout_lines)
+
+    @property
+    def reports(self):
+        """Intermediate ``(step, objective)`` reported by the evaluation so far."""
+        return parse_reports(self.stdout)
+
+    @property
+    def stats(self):
+        """Counters ``(name, count)`` recorded by the evaluation so far."""
+        return parse_stats(self.stdout)
 
     def _poll(self):
         if not self._state == 'active':
@@ -25,10 +50,6 @@ class PopenFuture:
         retcode = self.proc.poll()
         if retcode is None:
             self._state = 'active'
-            stdout, _ = self.proc.communicate()
-            tmp_res = self._parse(stdout)
-            if tmp_res != sys.float_info.max:
-                self._result = tmp_res
         elif retcode == 0:
             self._state = 'done'
         else:
@@ -38,21 +59,17 @@ class PopenFuture:
         if self._result is not None:
             return self._result
         self.proc.wait()
+        self._reader.join()
         if self.done:
-            stdout, _ = self.proc.communicate()
-            self._result = self._parse(stdout)
+            self._result = self._parse(self.stdout)
         else:
-            stdout, _ = self.proc.communicate()
             self._result = self.FAIL_RETURN_VALUE
-            logger.error(f"Eval failed: {stdout}")
+            logger.error(f"Eval failed: {self.stdout}")
         return self._result
 
     def cancel(self):
         self.proc.kill()
-        try:
-            self.proc.communicate()
-        except ValueError:
-            pass
+        self.proc.wait()
         self._state = 'cancelled'
 
     @property
@@ -105,6 +122,21 @@ class SubprocessEvaluator(Evaluator):
         future = PopenFuture(cmd, self._parse)
         return future
 
+    def _collect_reports(self):
+        reports = []
+        for uid, future in self.pending_evals.items():
+            num_known = len(self.reports.get(uid, []))
+            reports.extend((uid, step, objective)
+                           for step, objective in future.reports[num_known:])
+            stats = future.stats
+            reports.extend((uid, STATS_TAG, stat)
+                           for stat in stats[future.num_known_stats:])
+            future.num_known_stats = len(stats)
+        return reports
+
+    def _stop_exec(self, future):
+        future.cancel()
+
     @staticmethod
     def _timer(timeout):
         if timeout is None:
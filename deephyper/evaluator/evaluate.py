@@ -12,6 +12,7 @@ import time
 import types
 
 from deephyper.evaluator import runner
+from deephyper.evaluator.reporter import STATS_TAG, parse_reports
 logger = logging.getLogger(__name__)
 
 
@@ -44,8 +45,16 @@ class Evaluator:
     assert os.path.isfile(PYTHON_EXE)
 
     @staticmethod
-    def create(run_function, cache_key=None, method='balsam'):
-        assert method in ['balsam', 'subprocess', 'processPool', 'threadPool']
+    def create(run_function, cache_key=None, method='balsam', **kwargs):
+        """Create an evaluator.
+
+        Args:
+            run_function (func): the run function.
+            cache_key (func): see ``ThreadPoolEvaluator``.
+            method (str): one of ``['balsam', 'subprocess', 'processPool', 'threadPool', 'shared']``.
+            kwargs: other arguments of the evaluator, e.g. the ``weight`` of a ``SharedEvaluator``.
+        """
+        assert method in ['balsam', 'subprocess', 'processPool', 'threadPool', 'shared']
         if method == "balsam":
             from deephyper.evaluator._balsam import BalsamEvaluator
             Eval = BalsamEvaluator
@@ -55,25 +64,34 @@ class Evaluator:
         elif method == "processPool":
             from deephyper.evaluator._processPool import ProcessPoolEvaluator
             Eval = ProcessPoolEvaluator
+        elif method == "shared":
+            from deephyper.evaluator._shared import SharedEvaluator
+            Eval = SharedEvaluator
         else:
             from deephyper.evaluator._threadPool import ThreadPoolEvaluator
             Eval = ThreadPoolEvaluator
 
-        return Eval(run_function, cache_key=cache_key)
+        return Eval(run_function, cache_key=cache_key, **kwargs)
 
     def __init__(self, run_function, cache_key=None):
         self.pending_evals = {}  # uid --> Future
         self.finished_evals = OrderedDict()  # uid --> scalar
         self.requested_evals = []  # keys
         self.key_uid_map = {}  # map keys to uids
+        self.reports = {}  # uid --> list of (step, objective)
+        self.stopped_evals = set()  # uids stopped by the search
+        self._new_reports = []  # reports not yet yielded by get_reports
 
         self.stats = {
+            'num_requested': 0,
             'num_cache_used': 0
         }
 
         self.transaction_context = dummy_context
         self._start_sec = time.time()
         self.elapsed_times = {}
+        self.submit_times = {}
+        self.finish_times = {}
 
         self._run_function = run_function
         self.num_workers = 0
@@ -105,20 +123,58 @@ class Evaluator:
             raise ValueError(f'Expected dict, but got {type(x)}')
         return x
 
+    @property
+    def dedupe_rate(self):
+        """Fraction of the requested evals whose uid was already known (see ``cache_key``), they are not executed."""
+        if self.stats['num_requested'] == 0:
+            return 0.
+        return self.stats['num_cache_used'] / self.stats['num_requested']
+
     def add_eval(self, x):
         key = self.encode(x)
         self.requested_evals.append(key)
         uid = self._gen_uid(x)
+        self.stats['num_requested'] += 1
         if uid in self.key_uid_map.values():
             self.stats['num_cache_used'] += 1
             logger.info(f"UID: {uid} already evaluated; skipping execution")
         else:
             future = self._eval_exec(x)
             logger.info(f"Submitted new eval of {x}")
+            self.submit_times[uid] = self._elapsed_sec()
             future.uid = uid
+            if hasattr(future, 'add_done_callback'):
+                # concurrent.futures tell exactly when the eval finished
+                future.add_done_callback(self._record_finish_time)
             self.pending_evals[uid] = future
         self.key_uid_map[key] = uid
 
+    def prime_cache(self, xy_data, elapsed_times=None):
+        """Register evals which are already known (e.g. from a previous search) so that they are never executed.
+
+        Evals which are pending or finished in this evaluator are skipped, their result is the one of this evaluator.
+
+        Args:
+            xy_data (list): list of ``(x, y)`` where ``x`` is a dict.
+            elapsed_times (list, optional): elapsed seconds of the evals, ``0`` if ``None``.
+
+        Returns:
+            int: number of evals added to the cache.
+        """
+        if elapsed_times is None:
+            elapsed_times = [0.] * len(xy_data)
+        num_primed = 0
+        for (x, y), elapsed in zip(xy_data, elapsed_times):
+            uid = self._gen_uid(x)
+            if uid in self.pending_evals or uid in self.finished_evals:
+                continue
+            self.key_uid_map[self.encode(x)] = uid
+            self.finished_evals[uid] = y
+            self.elapsed_times[uid] = elapsed
+            num_primed += 1
+        logger.info(f"Cache primed with {num_primed} out of {len(xy_data)} evals")
+        return num_primed
+
     def add_eval_batch(self, XX):
         with self.transaction_context():
             for x in XX:
@@ -132,19 +188,26 @@ class Evaluator:
 
     @staticmethod
     def _parse(run_stdout):
+        """Parse the objective of an evaluation from its ``DH-OUTPUT:`` line, several values are parsed as a tuple of objectives."""
         y = sys.float_info.max
         for line in run_stdout.split('\n'):
             if "DH-OUTPUT:" in line.upper():
+                values = line[line.upper().index("DH-OUTPUT:")+len("DH-OUTPUT:"):].split()
                 try:
-                    y = float(line.split()[-1])
-                except ValueError as e:
+                    values = [float(v) for v in values]
+                    y = values[0] if len(values) == 1 else tuple(values)
+                except (ValueError, IndexError) as e:
                     logger.exception("Could not parse DH-OUTPUT line:\n"+line)
                     y = sys.float_info.max
                 break
-        if isnan(y):
+        if any(isnan(v) for v in (y if isinstance(y, tuple) else [y])):
             y = sys.float_info.max
         return y
 
+    @staticmethod
+    def _parse_reports(run_stdout):
+        return parse_reports(run_stdout)
+
     @property
     def _runner_executable(self):
         funcName = self._run_function.__name__
@@ -174,12 +237,26 @@ class Evaluator:
         logger.info(f"Waiting on {len(futures)} evals to finish...")
 
         logger.info(f'Blocking on completion of {len(futures)} pending evals')
-        self.wait(futures.values(), timeout=timeout,
-                  return_when='ALL_COMPLETED')
+        # evals are awaited one by one to record when each of them finishes
+        deadline = None if timeout is None else time.time() + timeout
+        remaining = dict(futures)
+        while remaining:
+            time_left = None if deadline is None else deadline - time.time()
+            if time_left is not None and time_left <= 0:
+                raise TimeoutError(f'{timeout} sec timeout expired while '
+                                   f'waiting on {len(futures)} tasks until ALL_COMPLETED')
+            try:
+                waitRes = self.wait(remaining.values(), timeout=time_left,
+                                    return_when='ANY_COMPLETED')
+            except TimeoutError:
+                continue
+            for future in (waitRes.done + waitRes.failed + waitRes.cancelled):
+                self.elapsed_times[future.uid] = self._elapsed_sec()
+                del remaining[future.uid]
         # TODO: on TimeoutError, kill the evals that did not finish; return infinity
+        self._update_reports()
         for uid in futures:
-            y = futures[uid].result()
-            self.elapsed_times[uid] = self._elapsed_sec()
+            y = self._result(futures[uid])
             del self.pending_evals[uid]
             self.finished_evals[uid] = y
         for (key, uid, x) in zip(keys, uids, to_read):
@@ -201,9 +278,12 @@ class Evaluator:
         except TimeoutError:
             pass
         else:
-            for future in (waitRes.done + waitRes.failed):
+            self._update_reports()
+            stopped = [f for f in waitRes.cancelled
+                       if f.uid in self.stopped_evals]
+            for future in (waitRes.done + waitRes.failed + stopped):
                 uid = future.uid
-                y = future.result()
+                y = self._result(future)
                 logger.info(f'New eval finished: {uid} --> {y}')
                 self.elapsed_times[uid] = self._elapsed_sec()
                 del self.pending_evals[uid]
@@ -218,6 +298,62 @@ class Evaluator:
                 logger.info(f"Requested eval x: {x} y: {y}")
                 yield (x, y)
 
+    def _result(self, future):
+        """Result of a finished future, evals stopped by the search take their last reported objective."""
+        if future.uid in self.stopped_evals:
+            self._update_reports()
+            reports = self.reports.get(future.uid)
+            return reports[-1][1] if reports else self.FAIL_RETURN_VALUE
+        return future.result()
+
+    def _collect_reports(self):
+        """Return the new intermediate results of pending evals as a list of ``(uid, step, objective)``, counters recorded by the evals are ``(uid, STATS_TAG, (name, count))``."""
+        return []
+
+    def _update_reports(self):
+        for uid, step, objective in self._collect_reports():
+            if step == STATS_TAG:
+                # counter recorded by the run function
+                name, count = objective
+                self.stats[name] = self.stats.get(name, 0) + count
+                continue
+            self.reports.setdefault(uid, []).append((step, objective))
+            self._new_reports.append((uid, step, objective))
+
+    def _stop_exec(self, future):
+        raise NotImplementedError
+
+    def get_reports(self):
+        """Streaming of intermediate results reported by evals (see ``deephyper.evaluator.reporter``).
+
+        Returns:
+            generator: ``(x, step, objective)`` for each new report since the last call.
+        """
+        self._update_reports()
+        new_reports, self._new_reports = self._new_reports, []
+        uid_keys = {}
+        for key in self.requested_evals:
+            uid_keys.setdefault(self.key_uid_map[key], []).append(key)
+        for uid, step, objective in new_reports:
+            for key in uid_keys.get(uid, []):
+                x = self.decode(key)
+                logger.debug(f"Report x: {x} step: {step} objective: {objective}")
+                yield (x, step, objective)
+
+    def stop_eval(self, x):
+        """Ask a pending eval to stop, its objective will be the last one it reported.
+
+        Args:
+            x (dict): the configuration of the eval to stop.
+        """
+        uid = self._gen_uid(x)
+        if uid not in self.pending_evals or uid in self.stopped_evals:
+            return
+        logger.info(f"Stopping eval: {uid}")
+        self._update_reports()
+        self.stopped_evals.add(uid)
+        self._stop_exec(self.pending_evals[uid])
+
     @property
     def counter(self):
         return len(self.finished_evals) + len(self.pending_evals)
@@ -227,9 +363,56 @@ class Evaluator:
         logger.debug(f"{num_evals} pending evals; {self.num_workers} workers")
         return max(self.num_workers - num_evals, 0)
 
+    def _record_finish_time(self, future):
+        self.finish_times[future.uid] = self._elapsed_sec()
+
+    def duration(self, x):
+        """Runtime of a finished eval: seconds between its submission and its completion.
+
+        Args:
+            x (dict): the configuration of the eval.
+
+        Returns:
+            float: the runtime, ``None`` if it is unknown (e.g. eval loaded by ``prime_cache``).
+        """
+        uid = self._gen_uid(x)
+        finish = self.finish_times.get(uid, self.elapsed_times.get(uid))
+        if uid not in self.submit_times or finish is None:
+            return None
+        return finish - self.submit_times[uid]
+
+    def worker_utilization(self):
+        """Fraction of the time the workers have been busy since the first submitted eval.
+
+        It is estimated from the submission and completion times of evals: at any time ``min(num_pending_evals, num_workers)`` workers are busy.
+
+        Returns:
+            float: utilization in [0, 1].
+        """
+        if not self.submit_times or self.num_workers == 0:
+            return 0.
+        events = []
+        for uid, t in self.submit_times.items():
+            events.append((t, 1))
+            if uid in self.elapsed_times:
+                events.append((self.elapsed_times[uid], -1))
+        events.sort()
+        start = last = events[0][0]
+        now = self._elapsed_sec()
+        busy, active = 0., 0
+        for t, delta in events:
+            busy += min(active, self.num_workers) * (t - last)
+            active += delta
+            last = t
+        busy += min(active, self.num_workers) * (now - last)
+        if now <= start:
+            return 0.
+        return busy / (self.num_workers * (now - start))
+
     def dump_evals(self):
         if not self.finished_evals:
             return
+        logger.info(f"Evaluator stats: {self.stats}")
 
         with open('results.json', 'w') as fp:
             json.dump(self.finished_evals, fp, indent=4,
@@ -241,12 +424,21 @@ class Evaluator:
             if uid not in self.finished_evals:
                 continue
             result = self.decode(key)
-            result['objective'] = self.finished_evals[uid]
+            y = self.finished_evals[uid]
+            if isinstance(y, (list, tuple, ndarray)):
+                # one column per objective of a multi-objective search
+                result.update({f'objective_{i}': v for i, v in enumerate(y)})
+            else:
+                result['objective'] = y
             result['elapsed_sec'] = self.elapsed_times[uid]
             resultsList.append(result)
 
         with open('results.csv', 'w') as fp:
-            columns = resultsList[0].keys()
+            columns = []
+            for result in resultsList:
+                for k in result:
+                    if k not in columns:
+                        columns.append(k)
             writer = csv.DictWriter(fp, columns)
             writer.writeheader()
             writer.writerows(resultsList)
@@ -0,0 +1,162 @@
+"""Adaptive replication of noisy evaluations.
+
+Objectives of training runs change with the random seed, a search can then follow a lucky evaluation. ``Replicator`` re-evaluates the most promising configurations with other seeds (the seed is passed to the run function with the ``seed`` key of the configuration) and aggregates the replicas of a configuration by their mean. The other configurations are evaluated once.
+
+A configuration of the ``top_k`` best ones is replicated only while its ranking is uncertain: when the difference between its mean and the mean of its competitor (the best configuration, or the second best for the best one) is smaller than ``Z`` standard errors. Standard errors use the variance of the replicas of the configuration shrunk towards the variance pooled over all the replicated configurations, so that configurations with two replicas do not get a degenerate variance. The number of replicas is bounded by ``max_replicas`` per configuration and by a fraction ``budget`` of all the evaluations. Objectives are minimized.
+"""
+import csv
+import math
+from sys import float_info
+
+SEED_KEY = 'seed'
+Z = 1.96  # width of the confidence intervals
+PRIOR_DOF = 2  # weight of the pooled variance in the variance of a configuration
+
+
+class Replicator:
+    """Choose the configurations to replicate and aggregate their replicas.
+
+    Args:
+        evaluator (Evaluator): the evaluator of the search, it encodes the configurations.
+        top_k (int): number of best configurations which can be replicated.
+        max_replicas (int): maximum number of evaluations of a configuration.
+        budget (float): maximum fraction of the evaluations which are replicas.
+    """
+
+    def __init__(self, evaluator, top_k=3, max_replicas=3, budget=0.25):
+        self.evaluator = evaluator
+        self.top_k = top_k
+        self.max_replicas = max_replicas
+        self.budget = budget
+        self.stats = {}  # key of the base configuration --> [x, n, mean, M2]
+        self.failures = {}  # key --> number of failed evaluations
+        self.pending = set()  # keys with a submitted replica
+        self.num_evals = 0
+        self.num_replicas = 0  # submitted replicas
+
+    def base(self, x):
+        """The configuration without its seed."""
+        return {k: v for k, v in x.items() if k != SEED_KEY}
+
+    def observe(self, results):
+        """Add finished evaluations to the statistics.
+
+        Args:
+            results (list): ``(x, y)`` of the finished evaluations, replicas included.
+
+        Returns:
+            list: ``(x, y)`` for each finished evaluation where ``x`` is the base configuration and ``y`` the mean of its replicas, vectors of objectives are not aggregated.
+        """
+        aggregated = []
+        for x, y in results:
+            self.num_evals += 1
+            x = self.base(x)
+            key = self.evaluator.encode(x)
+            self.pending.discard(key)
+            if isinstance(y, (list, tuple)):
+                aggregated.append((x, y))
+                continue
+            if y >= float_info.max:
+                # failed replicas do not enter the mean
+                self.failures[key] = self.failures.get(key, 0) + 1
+                stats = self.stats.get(key)
+                aggregated.append((x, y if stats is None else stats[2]))
+                continue
+            stats = self.stats.setdefault(key, [x, 0, 0., 0.])
+            # Welford's update of the mean and of the sum of squared deviations
+            stats[1] += 1
+            delta = y - stats[2]
+            stats[2] += delta / stats[1]
+            stats[3] += delta * (y - stats[2])
+            aggregated.append((x, stats[2]))
+        return aggregated
+
+    def pooled_variance(self):
+        """Variance of the replicas pooled over the replicated configurations, ``None`` before the first replica."""
+        m2 = sum(s[3] for s in self.stats.values() if s[1] > 1)
+        dof = sum(s[1] - 1 for s in self.stats.values() if s[1] > 1)
+        return m2 / dof if dof > 0 else None
+
+    def std_error(self, key, pooled=None):
+        """Standard error of the mean objective of a configuration."""
+        _, n, _, m2 = self.stats[key]
+        if pooled is None:
+            pooled = self.pooled_variance()
+        if pooled is None:
+            return math.inf
+        var = (m2 + PRIOR_DOF * pooled) / (n - 1 + PRIOR_DOF)
+        return math.sqrt(var / n)
+
+    def ranking(self):
+        """Keys of the evaluated configurations from the best mean to the worst."""
+        return sorted(self.stats, key=lambda key: self.stats[key][2])
+
+    def num_replicas_left(self):
+        return max(0, math.floor(self.budget * self.num_evals) - self.num_replicas)
+
+    def uncertain(self, ranking, pooled):
+        """Keys of the top configurations whose ranking is uncertain, the most uncertain first."""
+        if len(ranking) < 2:
+            return []
+        candidates = []
+        for i, key in enumerate(ranking[:self.top_k]):
+            if self.stats[key][1] >= self.max_replicas or key in self.pending:
+                continue
+            rival = ranking[1] if i == 0 else ranking[0]
+            gap = abs(self.stats[key][2] - self.stats[rival][2])
+            se = math.hypot(self.std_error(key, pooled), self.std_error(rival, pooled))
+            if gap < Z * se:
+                candidates.append((gap / se if se > 0 else 0., key))
+        return [key for _, key in sorted(candidates)]
+
+    def replicas(self, n):
+        """Create up to ``n`` replicas of the configurations which are worth replicating.
+
+        Returns:
+            list(dict): the configurations to evaluate, with a new seed.
+        """
+        n = min(n, self.num_replicas_left())
+        if n <= 0:
+            return []
+        ranking = self.ranking()
+        pooled = self.pooled_variance()
+        if pooled is None:
+            # the noise is unknown until a configuration is replicated: start with the best one
+            keys = [key for key in ranking[:1] if key not in self.pending
+                    and self.stats[key][1] < self.max_replicas]
+        else:
+            keys = self.uncertain(ranking, pooled)
+        XX = []
+        for key in keys[:n]:
+            x, count, _, _ = self.stats[key]
+            replica = dict(x)
+            replica[SEED_KEY] = count + self.failures.get(key, 0)
+            XX.append(replica)
+            self.pending.add(key)
+        self.num_replicas += len(XX)
+        return XX
+
+    def cancel(self, XX):
+        """Forget replicas which were not submitted."""
+        for x in XX:
+            self.pending.discard(self.evaluator.encode(self.base(x)))
+            self.num_replicas -= 1
+
+    def dump(self, path='replicas.csv'):
+        """Write the mean and the standard deviation of the objective of each configuration."""
+        if not self.stats:
+            return
+        rows = []
+        for key in self.ranking():
+            x, n, mean, m2 = self.stats[key]
+            row = dict(x)
+            row.update(num_replicas=n, objective_mean=mean,
+                       objective_std=math.sqrt(m2 / (n - 1)) if n > 1 else float('nan'))
+            rows.append(row)
+        fieldnames = []
+        for row in rows:
+            fieldnames.extend(k for k in row if k not in fieldnames)
+        with open(path, 'w') as fp:
+            writer = csv.DictWriter(fp, fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
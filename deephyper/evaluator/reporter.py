@@ -0,0 +1,153 @@
+"""
+Intermediate results reporting for run functions.
+
+A run function can report ``(step, objective)`` checkpoints while it is running (for example the validation metric after each epoch of training) by calling :func:`report`:
+
+::
+
+    from deephyper.evaluator.reporter import report
+
+    def run(config):
+        for epoch in range(config['epochs']):
+            ...
+            report(epoch, objective)
+        return objective
+
+The evaluator collects these reports as streaming updates (see ``Evaluator.get_reports``) and the search can stop an evaluation with ``Evaluator.stop_eval``. The objective of a stopped evaluation is the last objective it reported.
+
+When the run function is executed in an external process (``subprocess`` or ``balsam`` evaluators, through ``deephyper.evaluator.runner``) reports are written on the standard output with the ``DH-REPORT:`` tag and parsed by the evaluator. When it is executed in the memory of the evaluator (``threadPool`` or ``processPool`` evaluators) reports are sent through a queue.
+
+A run function can also count events with :func:`record` (e.g. cache hits), the counts of all the evaluations are summed in the ``stats`` of the evaluator.
+"""
+import threading
+
+REPORT_TAG = 'DH-REPORT:'
+STATS_TAG = 'DH-STATS:'
+
+_local = threading.local()
+
+
+class StopEvaluation(Exception):
+    """Raised by :func:`report` when the search has asked to stop the current evaluation."""
+
+
+def stdout_reporter(step, objective):
+    """Default reporter: write the report on the standard output so that it can be parsed from the output of the evaluation."""
+    print(REPORT_TAG, step, objective, flush=True)
+
+
+class QueueReporter:
+    """Reporter used by in-memory evaluators.
+
+    Args:
+        uid (str): uid of the current evaluation.
+        queue (queue.Queue): queue where ``(uid, step, objective)`` tuples are put.
+        stop_flags (dict): shared mapping of uids which have to be stopped.
+    """
+
+    def __init__(self, uid, queue, stop_flags):
+        self.uid = uid
+        self.queue = queue
+        self.stop_flags = stop_flags
+        self.last_objective = None
+
+    def __call__(self, step, objective):
+        self.last_objective = objective
+        self.queue.put((self.uid, step, objective))
+        if self.stop_flags.get(self.uid, False):
+            raise StopEvaluation
+
+    def record(self, name, count):
+        self.queue.put((self.uid, STATS_TAG, (name, count)))
+
+
+def set_reporter(reporter):
+    """Set the reporter used by :func:`report` in the current thread.
+
+    Args:
+        reporter (callable): takes ``(step, objective)``, ``None`` restores the default reporter.
+    """
+    _local.reporter = reporter
+
+
+def get_reporter():
+    return getattr(_local, 'reporter', None) or stdout_reporter
+
+
+def report(step, objective):
+    """Report an intermediate result of the current evaluation.
+
+    Args:
+        step (int): step of the evaluation (e.g. epoch number).
+        objective (float): objective value at this step.
+
+    Raises:
+        StopEvaluation: if the search has asked to stop the current evaluation, the run function can let this exception propagate.
+    """
+    get_reporter()(int(step), float(objective))
+
+
+def record(name, count=1):
+    """Count an event of the current evaluation, the counts are summed in ``Evaluator.stats[name]``.
+
+    Args:
+        name (str): name of the counter.
+        count (int): increment of the counter.
+    """
+    reporter = get_reporter()
+    if hasattr(reporter, 'record'):
+        reporter.record(name, int(count))
+    else:
+        print(STATS_TAG, name, int(count), flush=True)
+
+
+def run_with_reporter(run_function, reporter, x):
+    """Execute ``run_function(x)`` with ``reporter`` as current reporter.
+
+    Returns:
+        the objective returned by ``run_function`` or the last reported objective if the evaluation has been stopped.
+    """
+    set_reporter(reporter)
+    try:
+        return run_function(x)
+    except StopEvaluation:
+        return reporter.last_objective
+    finally:
+        set_reporter(None)
+
+
+def parse_reports(run_stdout):
+    """Parse the ``DH-REPORT:`` lines of the output of an evaluation.
+
+    Args:
+        run_stdout (str): output of the evaluation.
+
+    Returns:
+        list(tuple): list of ``(step, objective)``.
+    """
+    reports = []
+    for line in run_stdout.split('\n'):
+        if REPORT_TAG in line:
+            try:
+                _, step, objective = line.split()[-3:]
+                reports.append((int(step), float(objective)))
+            except ValueError:
+                pass
+    return reports
+
+
+def parse_stats(run_stdout):
+    """Parse the ``DH-STATS:`` lines of the output of an evaluation.
+
+    Returns:
+        list(tuple): list of ``(name, count)``.
+    """
+    stats = []
+    for line in run_stdout.split('\n'):
+        if STATS_TAG in line:
+            try:
+                _, name, count = line.split()[-3:]
+                stats.append((name, int(count)))
+            except ValueError:
+                pass
+    return stats
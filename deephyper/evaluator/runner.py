@@ -6,13 +6,20 @@ Usage: python runner.py <modulePath> <moduleName> <funcName> <args>
 Loads Python module <moduleName> located in the <modulePath> directory.
 The function <funcName> must be a module-level attribute (e.g. not nested
 inside a class), take one dictionary argument, and return a scalar objective
-value. The passed dictionary is obtained by decoding <args>, which should be a
+value or a list/tuple/array of objectives (multi-objective search). The passed dictionary is obtained by decoding <args>, which should be a
 JSON-formatted dictionary escaped by single quotes.
+
+Intermediate results reported by the function with
+``deephyper.evaluator.reporter.report`` are written on the standard output
+as ``DH-REPORT: <step> <objective>`` lines and the final objective as a
+``DH-OUTPUT: <objective>`` line.
 """
 import importlib
 import sys
 import json
 
+import numpy as np
+
 def load_module(name, path):
     try:
         mod = importlib.import_module(name)
@@ -34,4 +41,5 @@ if __name__ == "__main__":
     func = getattr(module, funcName)
 
     retval = func(d)
-    print("DH-OUTPUT:", retval)
+    # scalars, sequences and numpy arrays are printed as space separated floats
+    print("DH-OUTPUT:", *np.ravel(retval).tolist())
@@ -0,0 +1,168 @@
+"""Wall-clock budget of a search.
+
+With ``--time-budget`` a search stops submitting evaluations which are predicted not to finish before the deadline and returns (after writing its results) a little before the deadline. Durations are predicted by a random forest fitted on the configurations and the durations of the evaluations already finished (see ``Evaluator.duration``); until ``MIN_SAMPLES`` evaluations are finished the longest observed duration is used for every configuration.
+"""
+import itertools
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.feature_extraction import DictVectorizer
+
+from deephyper.search import util
+
+logger = util.conf_logger('deephyper.search.budget')
+
+MIN_SAMPLES = 5
+SAFETY_FACTOR = 1.2  # predicted durations are increased by this factor
+CHECKPOINT_MARGIN = 60  # seconds kept at the end of the budget to write the results
+
+
+def features(x):
+    """Flatten a configuration for the predictor: lists (e.g. ``arch_seq``) give one feature per element, non scalar values are ignored."""
+    feats = {}
+    for k, v in x.items():
+        if isinstance(v, (list, tuple)):
+            for i, vi in enumerate(v):
+                if isinstance(vi, (int, float, str)):
+                    feats[f'{k}_{i}'] = vi
+        elif isinstance(v, (int, float, str)):
+            feats[k] = v
+    return feats
+
+
+class TimeBudget:
+    """Deadline of a search and predictor of the durations of its evaluations.
+
+    Args:
+        evaluator (Evaluator): the evaluator of the search, its finished evaluations are the training data of the predictor.
+        minutes (float): the budget in minutes, ``None`` for no budget.
+    """
+
+    def __init__(self, evaluator, minutes=None):
+        self.evaluator = evaluator
+        self.start = time.time()
+        self.budget = None if minutes is None else minutes * 60.
+        self._model = None
+        self._vectorizer = None
+        self._max_duration = None
+        self._num_samples = 0
+        # training data, updated with the evals finished since the last fit
+        self._xs, self._ys = [], []
+        self._num_keys = 0  # entries of key_uid_map already read
+        self._uids = set()
+        self._waiting = {}  # uid --> configuration of the evals which are not finished
+        if self.budget is not None:
+            # short budgets keep 5% of the budget to write the results
+            self.margin = min(CHECKPOINT_MARGIN, 0.05 * self.budget)
+            logger.info(f"Time budget of {minutes} minutes")
+
+    @property
+    def max_minutes(self):
+        """Duration of the main loop of the search in minutes, for ``DelayTimer``."""
+        if self.budget is None:
+            return None
+        return (self.budget - self.margin) / 60.
+
+    def time_left(self):
+        """Seconds left before the end of the main loop of the search."""
+        if self.budget is None:
+            return float('inf')
+        return self.start + self.budget - self.margin - time.time()
+
+    @property
+    def expired(self):
+        return self.time_left() <= 0
+
+    def _update_samples(self):
+        """Add the durations of the evals finished since the last call to the training data."""
+        evaluator = self.evaluator
+        key_uid_map = evaluator.key_uid_map
+        # keys are only added to key_uid_map
+        new_keys = itertools.islice(key_uid_map.items(), self._num_keys, None)
+        for key, uid in new_keys:
+            if uid not in self._uids:
+                self._uids.add(uid)
+                self._waiting[uid] = evaluator.decode(key)
+        self._num_keys = len(key_uid_map)
+        finished = [uid for uid in self._waiting if uid in evaluator.finished_evals]
+        for uid in finished:
+            x = self._waiting.pop(uid)
+            duration = evaluator.duration(x)
+            # unknown for evals loaded by prime_cache
+            if duration is not None:
+                self._xs.append(features(x))
+                self._ys.append(duration)
+
+    def _fit(self):
+        self._update_samples()
+        xs, ys = self._xs, self._ys
+        if len(ys) == self._num_samples:
+            return
+        self._num_samples = len(ys)
+        self._max_duration = max(ys)
+        if len(ys) >= MIN_SAMPLES:
+            self._vectorizer = DictVectorizer(sparse=False)
+            X = self._vectorizer.fit_transform(xs)
+            self._model = RandomForestRegressor(n_estimators=50, random_state=0)
+            self._model.fit(X, np.log(np.maximum(ys, 1e-3)))
+
+    def predict(self, XX):
+        """Predict the durations of evaluations.
+
+        Args:
+            XX (list(dict)): the configurations.
+
+        Returns:
+            list(float): the predicted durations in seconds, ``0`` when no evaluation is finished yet.
+        """
+        self._fit()
+        if self._max_duration is None:
+            return [0.] * len(XX)
+        if self._model is None:
+            return [self._max_duration] * len(XX)
+        X = self._vectorizer.transform([features(x) for x in XX])
+        return np.exp(self._model.predict(X)).tolist()
+
+    def feasible_mask(self, XX):
+        """Check which configurations are predicted to finish before the deadline.
+
+        Returns:
+            list(bool): True for the configurations which can be submitted.
+        """
+        if self.budget is None or not XX:
+            return [True] * len(XX)
+        time_left = self.time_left()
+        mask = [d * SAFETY_FACTOR <= time_left for d in self.predict(XX)]
+        if not all(mask):
+            logger.info(f"{mask.count(False)} evaluations are not submitted: "
+                        f"predicted not to finish in the {time_left:.0f} seconds left")
+        return mask
+
+    def feasible(self, XX):
+        """Keep the configurations which are predicted to finish before the deadline."""
+        return [x for x, ok in zip(XX, self.feasible_mask(XX)) if ok]
+
+    def fill(self, sample, n, max_tries=10):
+        """Draw up to ``n`` configurations predicted to finish before the deadline.
+
+        The slots of configurations predicted to be too long are filled with new configurations, possibly shorter.
+
+        Args:
+            sample (callable): ``sample(k)`` returns a list of ``k`` configurations.
+            n (int): number of configurations.
+            max_tries (int): maximum number of calls to ``sample``.
+
+        Returns:
+            tuple: the configurations to submit and the rejected configurations.
+        """
+        batch, rejected = [], []
+        for _ in range(max_tries):
+            if len(batch) >= n or self.expired:
+                break
+            XX = sample(n - len(batch))
+            for x, ok in zip(XX, self.feasible_mask(XX)):
+                (batch if ok else rejected).append(x)
+            if self.budget is None:
+                break
+        return batch, rejected
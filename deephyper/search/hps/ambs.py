@@ -21,12 +21,34 @@ Arguments of AMBS :
     * ``EI`` :
     * ``PI`` :
     * ``gp_hedge`` : (default)
+    * ``EIps`` : expected improvement per second, a second model learns the runtime of evaluations from the durations measured by the evaluator
+    * ``PIps`` : probability of improvement per second
+
+* ``initial-design`` : design of the first ``num_workers`` points
+
+    * ``random`` : (default)
+    * ``sobol`` : scrambled Sobol sequence
+    * ``lhs`` : Latin hypercube
+    * ``maximin`` : Latin hypercube maximizing the distance between its closest points
+
+* ``replication-top-k`` : number of best configurations which can be evaluated again with other seeds when their ranking is uncertain, ``0`` (default) to disable the replication. The run function receives the seed with the ``seed`` key of its configuration and the model is fitted on the mean objective of the replicas (see ``deephyper.evaluator.replication``).
+* ``max-replicas`` : maximum number of evaluations of a configuration
+* ``replication-budget`` : maximum fraction of the evaluations which are replicas
+
+* ``warm-start`` : path to a ``results.csv`` or ``results.json`` file of a previous search on the same problem. Its evaluations are told to the surrogate model before the first points are drawn and they are never evaluated again.
+
+When the run function returns a vector of objectives, for example ``(loss, train_seconds, inference_ms)``, the surrogate model is fitted on a random scalarization of the objectives drawn again after each batch of results (see ``deephyper.search.hps.optimizer.pareto``) and the Pareto set of the evaluated configurations is written in ``pareto.csv``.
 """
 
 
+import csv
+import json
 import signal
+from math import isnan
 
+from deephyper.evaluator.replication import Replicator
 from deephyper.search.hps.optimizer import Optimizer
+from deephyper.search.hps.optimizer.pareto import ParetoFront
 from deephyper.search import Search
 from deephyper.search import util
 
@@ -40,11 +62,99 @@ def on_exit(signum, stack):
     global EXIT_FLAG
     EXIT_FLAG = True
 
+def _parse_value(value, dim):
+    """Convert a value read from a results file to the type of the dimension, raise ValueError if the value is not in the dimension."""
+    if isinstance(dim, list):
+        for choice in dim:
+            if choice == value or str(choice) == str(value):
+                return choice
+        raise ValueError(f'{value} is not in {dim}')
+    low, high = dim[0], dim[1]
+    if isinstance(low, int) and isinstance(high, int):
+        value = int(float(value))
+    else:
+        value = float(value)
+    if not low <= value <= high:
+        raise ValueError(f'{value} is not in {dim}')
+    return value
+
+
+def _parse_objective(row):
+    """Objective of a row of results, a list for the ``objective_0..objective_k`` columns of a multi-objective search."""
+    columns = sorted((k for k in row if k.startswith('objective_')),
+                     key=lambda k: int(k[len('objective_'):]))
+    values = [row[k] for k in columns if row[k] not in ('', None)]
+    if values:
+        return [float(v) for v in values]
+    y = row['objective']
+    if isinstance(y, (list, tuple)):
+        return [float(v) for v in y]
+    return float(y)
+
+
+def load_results(path, space):
+    """Load the evaluations of a previous search.
+
+    The objectives of a multi-objective search (``objective_0..objective_k`` columns or lists in ``results.json``) are loaded as lists.
+
+    Args:
+        path (str): path to a ``results.csv`` or ``results.json`` file.
+        space (dict): space of the problem, evaluations which are not valid points of this space are ignored.
+
+    Returns:
+        tuple: ``(xy_data, elapsed_times)`` where ``xy_data`` is a list of ``(x, y)``.
+    """
+    if path.endswith('.json'):
+        with open(path, 'r') as fp:
+            results = json.load(fp)
+        rows = []
+        for key, y in results.items():
+            row = json.loads(key)
+            row['objective'] = y
+            rows.append(row)
+    else:
+        with open(path, 'r') as fp:
+            rows = list(csv.DictReader(fp))
+
+    xy_data, elapsed_times = [], []
+    for row in rows:
+        try:
+            x = {k: _parse_value(row[k], dim) for k, dim in space.items()}
+            y = _parse_objective(row)
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning(f'Ignoring evaluation {row} from {path}: {e}')
+            continue
+        if any(isnan(v) for v in (y if isinstance(y, list) else [y])):
+            logger.warning(f'Ignoring evaluation {row} from {path}: objective is nan')
+            continue
+        xy_data.append((x, y))
+        elapsed_times.append(float(row.get('elapsed_sec', 0.)))
+    logger.info(f'Loaded {len(xy_data)} evaluations out of {len(rows)} from {path}')
+    return xy_data, elapsed_times
+
+
 class AMBS(Search):
     def __init__(self, problem, run, evaluator, **kwargs):
         super().__init__(problem, run, evaluator, **kwargs)
         logger.info("Initializing AMBS")
-        self.optimizer = Optimizer(self.problem, self.num_workers, self.args)
+        self.optimizer = self._create_optimizer()
+        self.warm_started = False
+        if self.args.warm_start is not None:
+            xy_data, elapsed_times = load_results(self.args.warm_start,
+                                                  self.problem.space)
+            self.optimizer.warm_start(xy_data)
+            self.evaluator.prime_cache(xy_data, elapsed_times)
+            self.warm_started = len(xy_data) > 0
+        self.pareto = ParetoFront()
+        self.replicator = None
+        if self.args.replication_top_k > 0:
+            self.replicator = Replicator(self.evaluator,
+                                         top_k=self.args.replication_top_k,
+                                         max_replicas=self.args.max_replicas,
+                                         budget=self.args.replication_budget)
+
+    def _create_optimizer(self):
+        return Optimizer(self.problem, self.num_workers, self.args)
 
     @staticmethod
     def _extend_parser(parser):
@@ -60,19 +170,44 @@ class AMBS(Search):
         )
         parser.add_argument('--acq-func',
             default="gp_hedge",
-            choices=["LCB", "EI", "PI","gp_hedge"],
+            choices=["LCB", "EI", "PI","gp_hedge", "EIps", "PIps"],
             help='Acquisition function type'
         )
+        parser.add_argument('--initial-design',
+            default='random',
+            choices=['random', 'sobol', 'lhs', 'maximin'],
+            help='design of the first num_workers points'
+        )
+        parser.add_argument('--replication-top-k',
+            type=int, default=0,
+            help='number of best configurations which can be evaluated again with other seeds, 0 to disable'
+        )
+        parser.add_argument('--max-replicas',
+            type=int, default=3,
+            help='maximum number of evaluations of a configuration'
+        )
+        parser.add_argument('--replication-budget',
+            type=float, default=0.25,
+            help='maximum fraction of the evaluations which are replicas'
+        )
+        parser.add_argument('--warm-start',
+            default=None,
+            help='path to the results.csv or results.json of a previous search on the same problem'
+        )
         return parser
 
     def main(self):
-        timer = util.DelayTimer(max_minutes=None, period=SERVICE_PERIOD)
+        timer = util.DelayTimer(max_minutes=self.time_budget.max_minutes, period=SERVICE_PERIOD)
         chkpoint_counter = 0
         num_evals = 0
 
-        logger.info(f"Generating {self.num_workers} initial points...")
-        XX = self.optimizer.ask_initial(n_points=self.num_workers)
-        self.evaluator.add_eval_batch(XX)
+        if self.warm_started:
+            logger.info(f"Drawing {self.num_workers} points from the warm started model...")
+            self.submit(self.num_workers)
+        else:
+            logger.info(f"Generating {self.num_workers} initial points...")
+            XX = self.optimizer.ask_initial(n_points=self.num_workers)
+            self.evaluator.add_eval_batch(XX)
 
         # MAIN LOOP
         for elapsed_str in timer:
@@ -80,20 +215,55 @@ class AMBS(Search):
             results = list(self.evaluator.get_finished_evals())
             num_evals += len(results)
             chkpoint_counter += len(results)
-            if EXIT_FLAG or num_evals >= self.args.max_evals:
+            if EXIT_FLAG or num_evals >= self.args.max_evals or self.time_budget.expired:
                 break
             if results:
                 logger.info(f"Refitting model with batch of {len(results)} evals")
-                self.optimizer.tell(results)
-                logger.info(f"Drawing {len(results)} points with strategy {self.optimizer.strategy}")
-                for batch in self.optimizer.ask(n_points=len(results)):
-                    self.evaluator.add_eval_batch(batch)
+                durations = [self.evaluator.duration(x) for x, _ in results]
+                if self.replicator is not None:
+                    results = self.replicator.observe(results)
+                self.optimizer.tell(results, durations)
+                # the slots left empty by the time budget are filled again, the predicted durations changed
+                num_free = self.evaluator.num_free_workers()
+                logger.info(f"Drawing {num_free} points with strategy {self.optimizer.strategy}")
+                self.submit(num_free)
             if chkpoint_counter >= CHECKPOINT_INTERVAL:
-                self.evaluator.dump_evals()
+                self.dump_evals()
                 chkpoint_counter = 0
 
         logger.info('Hyperopt driver finishing')
+        self.dump_evals()
+
+    def submit(self, n_points):
+        """Submit replicas of the best configurations and points drawn from the optimizer.
+
+        With a time budget, the points predicted not to finish before the deadline are discarded and replaced by new points (see ``deephyper.search.budget``).
+        """
+        if self.replicator is not None:
+            replicas = self.replicator.replicas(n_points)
+            mask = self.time_budget.feasible_mask(replicas)
+            self.replicator.cancel([x for x, ok in zip(replicas, mask) if not ok])
+            replicas = [x for x, ok in zip(replicas, mask) if ok]
+            if replicas:
+                logger.info(f"Replicating {len(replicas)} evals")
+                self.evaluator.add_eval_batch(replicas)
+            n_points -= len(replicas)
+        sample = lambda n: [x for batch in self.optimizer.ask(n_points=n) for x in batch]
+        XX, rejected = self.time_budget.fill(sample, n_points)
+        # a rejected point can also be an accepted or a pending point drawn again
+        accepted = set(map(self.evaluator.encode, XX))
+        self.optimizer.discard([x for x in rejected
+                                if self.evaluator.encode(x) not in accepted
+                                and self.evaluator._gen_uid(x) not in self.evaluator.pending_evals])
+        if XX:
+            self.evaluator.add_eval_batch(XX)
+
+    def dump_evals(self):
         self.evaluator.dump_evals()
+        if self.optimizer.multi_objective:
+            self.pareto.dump(self.evaluator)
+        if self.replicator is not None:
+            self.replicator.dump()
 
 if __name__ == "__main__":
     args = AMBS.parse_args()
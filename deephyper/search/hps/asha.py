@@ -0,0 +1,181 @@
+"""Asynchronous Successive Halving Algorithm.
+
+Configurations are sampled at random from the problem and evaluated with the maximum budget. The run function reports its intermediate objective after each unit of budget (e.g. epoch) with ``deephyper.evaluator.reporter.report``. When an evaluation reaches a rung (a budget of ``min_budget * reduction_factor**k``) its objective is compared to the objectives of all the evaluations which have already reached this rung: only the best ``1/reduction_factor`` of them continue to the next rung, the others are stopped. Decisions are taken as soon as a report arrives so workers never wait for a rung to be filled.
+
+Arguments of ASHA :
+* ``budget-name`` : name of the dimension of the problem (or key of the configuration) which sets the budget of an evaluation (``epochs`` by default)
+* ``min-budget`` : budget of the first rung
+* ``max-budget`` : maximum budget of an evaluation, the upper bound of the ``budget-name`` dimension by default
+* ``reduction-factor`` : only ``1/reduction_factor`` of the evaluations are promoted to the next rung
+"""
+
+
+import signal
+
+import numpy as np
+from skopt.space import Space
+
+from deephyper.search import Search
+from deephyper.search import util
+
+logger = util.conf_logger('deephyper.search.hps.asha')
+
+SERVICE_PERIOD = 2          # Delay (seconds) between main loop iterations
+CHECKPOINT_INTERVAL = 1    # How many jobs to complete between optimizer checkpoints
+MAX_REJECTIONS = 1000       # Forbidden batches drawn before giving up
+EXIT_FLAG = False
+
+def on_exit(signum, stack):
+    global EXIT_FLAG
+    EXIT_FLAG = True
+
+class ASHA(Search):
+    SEED = 12345
+
+    def __init__(self, problem, run, evaluator, **kwargs):
+        super().__init__(problem, run, evaluator, **kwargs)
+        logger.info("Initializing ASHA")
+
+        space = self.problem.space
+        self.budget_name = self.args.budget_name
+        self.max_budget = self.args.max_budget
+        if self.max_budget is None:
+            assert self.budget_name in space, f'--max-budget is required when "{self.budget_name}" is not a dimension of the problem'
+            self.max_budget = max(space[self.budget_name])
+        self.min_budget = self.args.min_budget
+        self.eta = self.args.reduction_factor
+        assert 0 < self.min_budget <= self.max_budget, f'where min_budget=={self.min_budget} and max_budget=={self.max_budget}'
+        assert self.eta > 1, f'reduction_factor must be > 1, got {self.eta}'
+
+        # the budget is set by the search, it is not a searched dimension
+        self.dims = [k for k in space if k != self.budget_name]
+        self.space = Space([space[k] for k in self.dims])
+        self._random_state = np.random.RandomState(self.SEED)
+
+        self.rungs = []
+        budget = self.min_budget
+        while budget < self.max_budget:
+            self.rungs.append(budget)
+            budget *= self.eta
+        self.rung_results = [[] for _ in self.rungs]  # objectives per rung
+        self.next_rung = {}  # json key of x --> index of its next rung
+        self.stopped = set()  # json keys of stopped evaluations
+        logger.info(f"ASHA rungs: {self.rungs} with max_budget {self.max_budget}")
+
+    @staticmethod
+    def _extend_parser(parser):
+        parser.add_argument('--budget-name',
+            default='epochs',
+            help='name of the dimension of the problem which sets the budget of an evaluation'
+        )
+        parser.add_argument('--min-budget',
+            type=int, default=1,
+            help='budget of the first rung'
+        )
+        parser.add_argument('--max-budget',
+            type=int, default=None,
+            help='maximum budget of an evaluation, upper bound of the budget dimension by default'
+        )
+        parser.add_argument('--reduction-factor',
+            type=int, default=3,
+            help='only 1/reduction_factor of the evaluations are promoted to the next rung'
+        )
+        return parser
+
+    def sample(self, n_points):
+        """Sample configurations at random, forbidden configurations are rejected and inactive dimensions collapsed."""
+        batch = []
+        for _ in range(MAX_REJECTIONS):
+            if len(batch) >= n_points:
+                break
+            XX = self.space.rvs(n_samples=n_points-len(batch), random_state=self._random_state)
+            for x in XX:
+                cfg = {k: v for k, v in zip(self.dims, x)}
+                cfg[self.budget_name] = self.max_budget
+                cfg = self.problem.canonicalize(cfg)
+                if cfg is not None:
+                    batch.append(cfg)
+        if len(batch) < n_points:
+            raise RuntimeError(f'No feasible configuration found after {MAX_REJECTIONS} tries, check the forbidden clauses of the problem')
+        return batch
+
+    def promotable(self, rung, objective):
+        """Record the objective reached at a rung and decide if the evaluation can continue.
+
+        Args:
+            rung (int): index of the rung.
+            objective (float): objective of the evaluation at this rung (lower is better).
+
+        Returns:
+            bool: True if the objective is among the best ``1/reduction_factor`` of the rung.
+        """
+        results = self.rung_results[rung]
+        results.append(objective)
+        k = len(results) // self.eta
+        if k == 0:
+            # not enough evaluations at this rung to take a decision
+            return True
+        cutoff = np.partition(results, k-1)[k-1]
+        return objective <= cutoff
+
+    def on_report(self, x, step, objective):
+        """Continue or stop an evaluation given its new intermediate result.
+
+        Returns:
+            bool: False if the evaluation has been stopped.
+        """
+        key = self.evaluator.encode(x)
+        if key in self.stopped:
+            # reports received after the stop request
+            return False
+        rung = self.next_rung.get(key, 0)
+        budget = step + 1
+        if rung >= len(self.rungs) or budget < self.rungs[rung]:
+            return True
+        self.next_rung[key] = rung + 1
+        if self.promotable(rung, objective):
+            logger.debug(f"Promoting {x} to rung {rung+1} with objective {objective}")
+            return True
+        logger.info(f"Stopping {x} at rung {rung} (budget {budget}) with objective {objective}")
+        self.stopped.add(key)
+        self.evaluator.stop_eval(x)
+        return False
+
+    def main(self):
+        timer = util.DelayTimer(max_minutes=self.time_budget.max_minutes, period=SERVICE_PERIOD)
+        chkpoint_counter = 0
+        num_evals = 0
+
+        logger.info(f"Generating {self.num_workers} initial points...")
+        self.evaluator.add_eval_batch(self.sample(self.num_workers))
+
+        # MAIN LOOP
+        for elapsed_str in timer:
+            logger.info(f"Elapsed time: {elapsed_str}")
+            for x, step, objective in self.evaluator.get_reports():
+                self.on_report(x, step, objective)
+
+            results = list(self.evaluator.get_finished_evals())
+            num_evals += len(results)
+            chkpoint_counter += len(results)
+            if EXIT_FLAG or num_evals >= self.args.max_evals or self.time_budget.expired:
+                break
+            num_free = self.evaluator.num_free_workers()
+            if num_free > 0:
+                logger.info(f"Sampling {num_free} new points")
+                XX, _ = self.time_budget.fill(self.sample, num_free)
+                if XX:
+                    self.evaluator.add_eval_batch(XX)
+            if chkpoint_counter >= CHECKPOINT_INTERVAL:
+                self.evaluator.dump_evals()
+                chkpoint_counter = 0
+
+        logger.info('Hyperopt driver finishing')
+        self.evaluator.dump_evals()
+
+if __name__ == "__main__":
+    args = ASHA.parse_args()
+    search = ASHA(**vars(args))
+    signal.signal(signal.SIGINT, on_exit)
+    signal.signal(signal.SIGTERM, on_exit)
+    search.main()
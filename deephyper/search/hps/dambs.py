@@ -0,0 +1,207 @@
+"""Distributed Asynchronous Model-Based Search.
+
+Several AMBS masters run in parallel, one per MPI rank, each with its own optimizer and its own evaluator (with the ``balsam`` evaluator the workers are divided between the ranks). There is no central master: the ranks share their new ``(x, y)`` results with nonblocking MPI allgathers and each rank refits its model on the union of all the results. The results received from the other ranks (and the results of a warm start) are never sent again, also when the optimizer of the rank asks for them again. For diversity each rank uses its own random seed and its own ``kappa`` for the ``LCB`` acquisition function, spread geometrically between ``kappa/4`` and ``4*kappa``.
+
+With ``--replication-top-k`` each rank replicates the best configurations of its own evaluations and shares the mean objectives of its replicated configurations.
+
+Only the rank 0 writes ``results.csv`` which contains the evaluations of all the ranks.
+
+Arguments of DAMBS : the arguments of AMBS.
+
+::
+
+    mpirun -n 16 python -m deephyper.search.hps.dambs --problem deephyper.benchmark.hps.polynome2.Problem --run deephyper.benchmark.hps.polynome2.run --evaluator threadPool
+"""
+
+import pickle
+import signal
+
+import numpy as np
+
+from deephyper.search.hps.ambs import AMBS
+from deephyper.search.hps.optimizer import Optimizer
+from deephyper.search import util
+
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+logger = util.conf_logger('deephyper.search.hps.dambs')
+
+SERVICE_PERIOD = 2          # Delay (seconds) between main loop iterations
+CHECKPOINT_INTERVAL = 1    # How many jobs to complete between optimizer checkpoints
+EXIT_FLAG = False
+
+def on_exit(signum, stack):
+    global EXIT_FLAG
+    EXIT_FLAG = True
+
+
+class ResultsExchange:
+    """Nonblocking exchange of python objects between all the ranks of a communicator.
+
+    An exchange round is an ``Iallgather`` of the sizes of the pickled messages followed by an ``Iallgatherv`` of the messages. ``progress`` never blocks: it starts a new round or advances the current one. All the ranks complete the same rounds with the same data.
+
+    Args:
+        comm (MPI.Comm): the communicator.
+    """
+
+    def __init__(self, comm):
+        self.comm = comm
+        self.size = comm.Get_size()
+        self.outbox = []
+        self._round = None
+
+    def put(self, items):
+        """Add items to the message of the next round."""
+        self.outbox.extend(items)
+
+    def progress(self, stop=False):
+        """Start or advance an exchange round.
+
+        Args:
+            stop (bool): stop request sent with the next round.
+
+        Returns:
+            tuple: ``(items, stop)`` when a round is completed, where ``items`` is the list of the items sent by each rank and ``stop`` is True if a rank requested to stop; ``None`` otherwise.
+        """
+        if self._round is None:
+            data = np.frombuffer(pickle.dumps((self.outbox, stop)), dtype=np.uint8)
+            self.outbox = []
+            sizes = np.zeros(self.size, dtype=np.int64)
+            req = self.comm.Iallgather(np.array([len(data)], dtype=np.int64), sizes)
+            self._round = ['sizes', req, data, sizes, None]
+        step, req, data, sizes, recvbuf = self._round
+        if not req.Test():
+            return None
+        if step == 'sizes':
+            recvbuf = np.empty(sizes.sum(), dtype=np.uint8)
+            displs = np.zeros(self.size, dtype=np.int64)
+            displs[1:] = np.cumsum(sizes)[:-1]
+            req = self.comm.Iallgatherv(data, [recvbuf, sizes, displs, MPI.BYTE])
+            self._round = ['data', req, data, sizes, recvbuf]
+            return None
+        self._round = None
+        items, stops = [], []
+        offset = 0
+        for size in sizes:
+            rank_items, rank_stop = pickle.loads(recvbuf[offset:offset+size].tobytes())
+            items.append(rank_items)
+            stops.append(rank_stop)
+            offset += size
+        return items, any(stops)
+
+
+class DAMBS(AMBS):
+    def __init__(self, problem, run, evaluator, **kwargs):
+        if MPI is None:
+            raise RuntimeError('DAMBS requires mpi4py!')
+        self.comm = MPI.COMM_WORLD
+        self.rank = self.comm.Get_rank()
+        self.size = self.comm.Get_size()
+        super().__init__(problem, run, evaluator, **kwargs)
+        self.exchange = ResultsExchange(self.comm)
+        # uids of the evals primed from a warm start or from the other ranks
+        self.primed = set(self.evaluator.finished_evals)
+
+    def _create_optimizer(self):
+        if self.args.evaluator == 'balsam':
+            # the ranks share the workers of the balsam launcher
+            self.num_workers = max(1, self.num_workers // self.size)
+            self.evaluator.num_workers = self.num_workers
+        kappa = Optimizer.KAPPA
+        if self.size > 1:
+            kappa *= 4 ** (2 * self.rank / (self.size - 1) - 1)
+        logger.info(f"Initializing DAMBS rank {self.rank} out of {self.size} with kappa={kappa:.3f}")
+        return Optimizer(self.problem, self.num_workers, self.args,
+                         seed=Optimizer.SEED + self.rank, kappa=kappa)
+
+    def prime(self, remote):
+        """Register the results of the other ranks in the evaluator.
+
+        Args:
+            remote (list): ``(x, y, elapsed_time, duration)`` of the other ranks.
+
+        Returns:
+            list: the ``(x, y)`` of the results.
+        """
+        xy_data = [(x, y) for x, y, _, _ in remote]
+        evaluator = self.evaluator
+        for x, _ in xy_data:
+            uid = evaluator._gen_uid(x)
+            if uid not in evaluator.pending_evals and uid not in evaluator.finished_evals:
+                self.primed.add(uid)
+        evaluator.prime_cache(xy_data, [t for _, _, t, _ in remote])
+        return xy_data
+
+    def local_results(self):
+        """New results of the evaluator which are not primed, the cache hits on primed evals are already known by all the ranks."""
+        return [(x, y) for x, y in self.evaluator.get_finished_evals()
+                if self.evaluator._gen_uid(x) not in self.primed]
+
+    def main(self):
+        timer = util.DelayTimer(max_minutes=None, period=SERVICE_PERIOD)
+        chkpoint_counter = 0
+        num_evals = 0  # number of evals of all the ranks, the same on all the ranks
+
+        if self.warm_started:
+            self.submit(self.num_workers)
+        else:
+            logger.info(f"Generating {self.num_workers} initial points...")
+            XX = self.optimizer.ask_initial(n_points=self.num_workers)
+            self.evaluator.add_eval_batch(XX)
+
+        # MAIN LOOP
+        for elapsed_str in timer:
+            logger.info(f"Elapsed time: {elapsed_str}")
+            results = self.local_results()
+            durations = [self.evaluator.duration(x) for x, _ in results]
+            elapsed_times = [self.evaluator.elapsed_times[self.evaluator._gen_uid(x)]
+                             for x, _ in results]
+            if self.replicator is not None:
+                results = self.replicator.observe(results)
+            self.exchange.put([(x, y, t, d) for (x, y), t, d
+                               in zip(results, elapsed_times, durations)])
+
+            stop = False
+            # the ranks stop together at the end of the time budget
+            exchanged = self.exchange.progress(stop=EXIT_FLAG or self.time_budget.expired)
+            if exchanged is not None:
+                items, stop = exchanged
+                num_evals += sum(map(len, items))
+                chkpoint_counter += sum(map(len, items))
+                remote = [item for rank, rank_items in enumerate(items)
+                          if rank != self.rank for item in rank_items]
+                if remote:
+                    logger.info(f"Received {len(remote)} evals of the other ranks")
+                    xy_data = self.prime(remote)
+                    results = results + xy_data
+                    durations = durations + [d for _, _, _, d in remote]
+            if stop or num_evals >= self.args.max_evals:
+                break
+
+            if results:
+                # a single refit for the local and the remote results
+                logger.info(f"Refitting model with batch of {len(results)} evals")
+                self.optimizer.tell(results, durations, external=True)
+            num_free = self.evaluator.num_free_workers()
+            if num_free > 0:
+                logger.info(f"Drawing {num_free} points with strategy {self.optimizer.strategy}")
+                self.submit(num_free)
+            if self.rank == 0 and chkpoint_counter >= CHECKPOINT_INTERVAL:
+                self.dump_evals()
+                chkpoint_counter = 0
+
+        logger.info(f'Hyperopt driver finishing on rank {self.rank}: {num_evals} evals exchanged')
+        if self.rank == 0:
+            self.dump_evals()
+        self.comm.Barrier()
+
+
+if __name__ == "__main__":
+    args = DAMBS.parse_args()
+    search = DAMBS(**vars(args))
+    signal.signal(signal.SIGINT, on_exit)
+    signal.signal(signal.SIGTERM, on_exit)
+    search.main()
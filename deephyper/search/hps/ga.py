@@ -1,7 +1,11 @@
 import signal
 import random
+import time
+from collections import deque
 
 from deephyper.search.hps.optimizer import GAOptimizer
+from deephyper.search.hps.optimizer.ga_optimizer import SEED
+from deephyper.search.hps.optimizer.pareto import ParetoFront
 from deephyper.search import Search
 from deephyper.search import util
 
@@ -9,6 +13,7 @@ logger = util.conf_logger('deephyper.search.hps.ga')
 
 SERVICE_PERIOD = 2          # Delay (seconds) between main loop iterations
 CHECKPOINT_INTERVAL = 10    # How many jobs to complete between optimizer checkpoints
+MAX_REJECTIONS = 1000       # Forbidden individuals drawn before giving up
 EXIT_FLAG = False
 
 def on_exit(signum, stack):
@@ -16,10 +21,13 @@ def on_exit(signum, stack):
     EXIT_FLAG = True
 
 class GA(Search):
-    def __init__(self, problem, run, evaluator, **kwargs):
+    def __init__(self, problem, run, evaluator, seed=SEED, **kwargs):
         super().__init__(problem, run, evaluator, **kwargs)
         logger.info("Initializing GA")
-        self.optimizer = GAOptimizer(self.problem, self.num_workers, self.args)
+        self.optimizer = GAOptimizer(self.problem, self.num_workers, self.args,
+                                     seed=seed)
+        self.logbook_path = 'ga_logbook.log'
+        self.pareto = ParetoFront()
 
     @staticmethod
     def _extend_parser(parser):
@@ -32,9 +40,30 @@ class GA(Search):
             default=5,
             type=int,
             help='number of individuals per worker')
+        parser.add_argument('--ga_mode',
+            default='generational',
+            choices=['generational', 'steady_state'],
+            help='generational: each generation waits for all its individuals to be evaluated, steady_state: a new individual is bred as soon as a worker is free'
+        )
+        parser.add_argument('--ga_surrogate',
+            default='none',
+            choices=['none', 'RF', 'ET'],
+            help='surrogate model fitted on the evaluated individuals to pre-screen the offspring, none to evaluate all the offspring'
+        )
+        parser.add_argument('--ga_oversampling',
+            default=4.0,
+            type=float,
+            help='with a surrogate, ga_oversampling times more offspring are bred than evaluated, only the best predicted are evaluated'
+        )
         return parser
 
     def run(self):
+        if self.args.ga_mode == 'steady_state':
+            self.run_steady_state()
+        else:
+            self.run_generational()
+
+    def run_generational(self):
         # opt = GAOptimizer(cfg)
         # evaluator = evaluate.create_evaluator(cfg)
         logger.info(f"Starting new run")
@@ -54,18 +83,20 @@ class GA(Search):
             self.optimizer.pop = self.optimizer.toolbox.population(n=self.optimizer.INIT_POP_SIZE)
             individuals = self.optimizer.pop
             self.evaluate_fitnesses(individuals, self.optimizer, self.evaluator, self.args.eval_timeout_minutes)
-            self.optimizer.record_generation(num_evals=len(self.optimizer.pop))
-
-            with open('ga_logbook.log', 'w') as fp:
-                fp.write(str(self.optimizer.logbook))
-            print("best:", self.optimizer.halloffame[0])
+            self.optimizer.record_generation(num_evals=len(self.optimizer.pop),
+                utilization=self.evaluator.worker_utilization())
+            self.end_generation(self.optimizer.pop)
 
         while self.optimizer.current_gen < self.optimizer.NGEN:
+            if self.time_budget.expired:
+                logger.info("Time budget expired")
+                break
             self.optimizer.current_gen += 1
             logger.info(f"Generation {self.optimizer.current_gen} out of {self.optimizer.NGEN}")
             logger.info(f"Elapsed time: {elapsed_str}")
 
             # Select the next generation individuals
+            self.optimizer.new_scalarization(self.optimizer.pop)
             offspring = self.optimizer.toolbox.select(self.optimizer.pop, len(self.optimizer.pop))
             # Clone the selected individuals
             offspring = list(map(self.optimizer.toolbox.clone, offspring))
@@ -84,6 +115,8 @@ class GA(Search):
 
             # Evaluate the individuals with an invalid fitness
             invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+            if self.optimizer.screening and invalid_ind:
+                invalid_ind = self.prescreen(offspring, invalid_ind)
             logger.info(f"Evaluating {len(invalid_ind)} invalid individuals")
             self.evaluate_fitnesses(invalid_ind, self.optimizer, self.evaluator,
                     self.args.eval_timeout_minutes)
@@ -91,22 +124,176 @@ class GA(Search):
             # The population is entirely replaced by the offspring
             self.optimizer.pop[:] = offspring
 
-            self.optimizer.record_generation(num_evals=len(invalid_ind))
+            self.optimizer.record_generation(num_evals=len(invalid_ind),
+                utilization=self.evaluator.worker_utilization())
+            self.end_generation(self.optimizer.pop)
+
+    def run_steady_state(self):
+        """Asynchronous GA without generation barriers.
+
+        Each time a worker is free a new individual is bred by tournament selection over the pool of the last ``INIT_POP_SIZE`` evaluated individuals (the oldest individual leaves the pool when a new one enters it). The first ``INIT_POP_SIZE`` individuals are random. To keep the logbook comparable with the generational mode a record is written every ``INIT_POP_SIZE`` evaluations and the search stops after ``INIT_POP_SIZE * (NGEN+1)`` evaluations.
+
+        Evaluations running longer than ``eval_timeout_minutes`` are stopped (see ``Evaluator.stop_eval``), their individuals get the worst fitness.
+        """
+        logger.info(f"Starting new steady state run")
+        opt = self.optimizer
+        pop_size = opt.INIT_POP_SIZE
+        max_evals = pop_size * (opt.NGEN + 1)
+        pool = deque(maxlen=pop_size)
+        submitted = {}  # json key of the decoded point --> individuals
+        deadlines = {}  # json key of the decoded point --> time when its eval is stopped
+        timeout = self.args.eval_timeout_minutes * 60
+        num_submitted, num_evals = 0, 0
+
+        def submit(n):
+            nonlocal num_submitted
+            n = min(n, max_evals - num_submitted)
+            if n <= 0:
+                return
+            if len(pool) < pop_size:
+                make = lambda: opt.toolbox.Individual()
+            else:
+                parents = list(pool)
+                opt.new_scalarization(parents)
+                make = lambda: opt.breed(parents)
+            candidates, candidate_points = self.feasible_individuals(make, opt.num_candidates(n))
+            individuals = opt.screen(candidates, n)
+            point_of = {id(ind): x for ind, x in zip(candidates, candidate_points)}
+            points = [point_of[id(ind)] for ind in individuals]
+            # individuals predicted not to finish before the end of the time budget are dropped
+            mask = self.time_budget.feasible_mask(points)
+            points = [x for x, ok in zip(points, mask) if ok]
+            individuals = [ind for ind, ok in zip(individuals, mask) if ok]
+            for ind, x in zip(individuals, points):
+                key = self.evaluator.encode(x)
+                submitted.setdefault(key, []).append(ind)
+                deadlines.setdefault(key, time.time() + timeout)
+            if points:
+                self.evaluator.add_eval_batch(points)
+            num_submitted += len(points)
+
+        def evaluated(individuals, fit, elapsed_str):
+            nonlocal num_evals
+            opt.set_objectives(individuals, [fit] * len(individuals))
+            opt.tell(individuals)
+            for ind in individuals:
+                pool.append(ind)
+                num_evals += 1
+                if num_evals % pop_size == 0:
+                    opt.pop = list(pool)
+                    opt.record_generation(num_evals=pop_size,
+                        utilization=self.evaluator.worker_utilization())
+                    self.end_generation(pool)
+                    opt.current_gen += 1
+                    logger.info(f"Generation {opt.current_gen} out of {opt.NGEN}")
+                    logger.info(f"Elapsed time: {elapsed_str}")
+
+        timer = util.DelayTimer(max_minutes=self.time_budget.max_minutes, period=SERVICE_PERIOD)
+        submit(self.num_workers)
+        for elapsed_str in timer:
+            for x, fit in self.evaluator.get_finished_evals():
+                key = self.evaluator.encode(x)
+                if not submitted.get(key):
+                    # eval stopped after its timeout, its individuals are already evaluated
+                    continue
+                evaluated([submitted[key].pop()], fit, elapsed_str)
+                if not submitted[key]:
+                    del submitted[key]
+                    del deadlines[key]
+            now = time.time()
+            for key in [k for k, t in deadlines.items() if t <= now]:
+                logger.info(f"Stopping eval {key} after {self.args.eval_timeout_minutes} minutes")
+                self.evaluator.stop_eval(self.evaluator.decode(key))
+                del deadlines[key]
+                evaluated(submitted.pop(key), self.evaluator.FAIL_RETURN_VALUE, elapsed_str)
+            if EXIT_FLAG or num_evals >= max_evals or self.time_budget.expired:
+                break
+            submit(self.evaluator.num_free_workers())
+
+    def end_generation(self, population):
+        """Called after each recorded generation.
+
+        Args:
+            population (list): the current population (the pool of evaluated individuals in steady state mode), it can be modified in place.
+        """
+        with open(self.logbook_path, 'w') as fp:
+            fp.write(str(self.optimizer.logbook))
+        print("best:", self.optimizer.halloffame[0])
+        if self.optimizer.multi_objective:
+            self.pareto.dump(self.evaluator)
+
+    def prescreen(self, offspring, invalid_ind):
+        """Replace the individuals to evaluate by the most promising ones of a larger pool.
+
+        ``ga_oversampling`` times more candidates than ``invalid_ind`` are considered: ``invalid_ind`` and new individuals bred from the current population. The surrogate keeps the best predicted ones, which take the places of ``invalid_ind`` in ``offspring``.
+
+        Returns:
+            list: the individuals to evaluate.
+        """
+        opt = self.optimizer
+        n = len(invalid_ind)
+        candidates = invalid_ind + [opt.breed(opt.pop)
+                                    for _ in range(opt.num_candidates(n) - n)]
+        selected = opt.screen(candidates, n)
+        positions = [i for i, ind in enumerate(offspring) if not ind.fitness.valid]
+        for i, ind in zip(positions, selected):
+            offspring[i] = ind
+        logger.info(f"Surrogate kept {n} out of {len(candidates)} candidate offspring")
+        return selected
+
+    def feasible_individuals(self, make, n):
+        """Create ``n`` individuals which are not forbidden by the problem.
+
+        Args:
+            make (callable): returns a new individual.
+            n (int): number of individuals.
+
+        Returns:
+            tuple: the individuals and their decoded points.
+        """
+        individuals, points = [], []
+        for _ in range(MAX_REJECTIONS):
+            missing = n - len(individuals)
+            if missing <= 0:
+                break
+            candidates = [make() for _ in range(missing)]
+            for ind, x in zip(candidates, self.decode(candidates)):
+                if x is not None:
+                    individuals.append(ind)
+                    points.append(x)
+        if len(individuals) < n:
+            raise RuntimeError(f'No feasible individual found after {MAX_REJECTIONS} tries, check the forbidden clauses of the problem')
+        return individuals, points
+
+    def decode(self, individuals):
+        """Decode individuals into configurations, inactive dimensions are collapsed.
 
-            with open('ga_logbook.log', 'w') as fp:
-                fp.write(str(self.optimizer.logbook))
-            print("best:", self.optimizer.halloffame[0])
+        Returns:
+            list(dict): the configurations, ``None`` for individuals forbidden by the problem.
+        """
+        points = self.optimizer.space_encoder.decode_points(individuals)
+        return [self.problem.canonicalize({key:x for key,x in zip(self.problem.space.keys(), point)})
+                for point in points]
 
     def evaluate_fitnesses(self, individuals, opt, evaluator, timeout_minutes):
-        points = map(opt.space_encoder.decode_point, individuals)
-        points = [{key:x for key,x in zip(self.problem.space.keys(), point)}
-                  for point in points]
+        points = self.decode(individuals)
+        valid = [x is not None for x in points]
+        if len(individuals) > sum(valid):
+            logger.info(f"{len(individuals)-sum(valid)} forbidden individuals are not evaluated")
+        # individuals predicted not to finish before the end of the time budget are not evaluated
+        in_time = iter(self.time_budget.feasible_mask([x for x in points if x is not None]))
+        valid = [ok and next(in_time) for ok in valid]
+        feasible = [ind for ind, ok in zip(individuals, valid) if ok]
+        forbidden = [ind for ind, ok in zip(individuals, valid) if not ok]
+        # they get the worst fitness
+        opt.set_objectives(forbidden, [evaluator.FAIL_RETURN_VALUE] * len(forbidden))
+        points = [x for x, ok in zip(points, valid) if ok]
         evaluator.add_eval_batch(points)
         logger.info(f"Waiting on {len(points)} individual fitness evaluations")
         results = evaluator.await_evals(points, timeout=timeout_minutes*60)
 
-        for ind, (x,fit) in zip(individuals, results):
-            ind.fitness.values = (fit,)
+        opt.set_objectives(feasible, [fit for x, fit in results])
+        opt.tell(feasible)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+"""Island model Genetic Algorithm.
+
+Each MPI rank runs its own ``GA`` (population, ``GAOptimizer`` and evaluator). The islands are connected in a ring: every ``ga_migration_interval`` generations each rank sends copies of its ``ga_num_migrants`` best individuals to the next rank with nonblocking messages, and the immigrants received from the previous rank replace its worst individuals. There is no master, the throughput scales with the number of ranks.
+
+It works with both ``ga_mode`` of ``GA``, for example on one machine:
+
+::
+
+    mpirun -n 4 python -m deephyper.search.hps.island_ga --problem deephyper.benchmark.hps.polynome2.Problem --run deephyper.benchmark.hps.polynome2.run --evaluator threadPool
+"""
+
+from deap import creator
+
+from deephyper.search.hps.ga import GA
+from deephyper.search.hps.optimizer.ga_optimizer import SEED
+from deephyper.search import util
+
+try:
+    from mpi4py import MPI
+except ImportError:
+    MPI = None
+
+logger = util.conf_logger('deephyper.search.hps.island_ga')
+
+MIGRATION_TAG = 31
+COUNT_TAG = 32
+
+
+class IslandGA(GA):
+    def __init__(self, problem, run, evaluator, **kwargs):
+        if MPI is None:
+            raise RuntimeError('IslandGA requires mpi4py!')
+        self.comm = MPI.COMM_WORLD
+        self.rank = self.comm.Get_rank()
+        self.size = self.comm.Get_size()
+        self.left = (self.rank - 1) % self.size
+        self.right = (self.rank + 1) % self.size
+        logger.info(f"Initializing island {self.rank} out of {self.size}")
+
+        # each island explores from a different initial population
+        super().__init__(problem, run, evaluator, seed=SEED+self.rank, **kwargs)
+        self.logbook_path = f'ga_logbook_{self.rank}.log'
+
+        self._send_requests = []
+        self.num_sent = 0
+        self.num_received = 0
+
+    @staticmethod
+    def _extend_parser(parser):
+        GA._extend_parser(parser)
+        parser.add_argument('--ga_migration_interval',
+            default=5,
+            type=int,
+            help='number of generations between two migrations'
+        )
+        parser.add_argument('--ga_num_migrants',
+            default=2,
+            type=int,
+            help='number of best individuals sent to the next island at each migration'
+        )
+        return parser
+
+    def run(self):
+        super().run()
+        self.finalize()
+
+    def end_generation(self, population):
+        gen = self.optimizer.current_gen
+        if self.size > 1 and gen > 0 and gen % self.args.ga_migration_interval == 0:
+            self.send_migrants(population)
+        for migrants in self.receive_migrants():
+            self.integrate(population, migrants)
+        super().end_generation(population)
+
+    def send_migrants(self, population):
+        best = sorted(population, key=lambda ind: ind.fitness, reverse=True)
+        migrants = [(list(ind), ind.fitness.values, getattr(ind, 'objectives', None))
+                    for ind in best[:self.args.ga_num_migrants]]
+        logger.info(f"Island {self.rank} sends {len(migrants)} migrants to island {self.right}")
+        self._send_requests.append(
+            self.comm.isend(migrants, dest=self.right, tag=MIGRATION_TAG))
+        self.num_sent += 1
+        # free completed sends
+        self._send_requests = [req for req in self._send_requests
+                               if not req.Test()]
+
+    def receive_migrants(self):
+        """Nonblocking reception of all the migrants arrived from the previous island."""
+        while self.comm.Iprobe(source=self.left, tag=MIGRATION_TAG):
+            yield self._recv()
+
+    def _recv(self):
+        migrants = self.comm.recv(source=self.left, tag=MIGRATION_TAG)
+        self.num_received += 1
+        logger.info(f"Island {self.rank} receives {len(migrants)} migrants from island {self.left}")
+        return migrants
+
+    def integrate(self, population, migrants):
+        """Replace the worst individuals of the population by the migrants."""
+        worst = sorted(range(len(population)),
+                       key=lambda i: population[i].fitness)
+        for i, (genes, values, objectives) in zip(worst, migrants):
+            ind = creator.Individual(genes)
+            ind.fitness.values = values
+            if objectives is not None:
+                ind.objectives = objectives
+                # the fitness of the other island used other scalarization weights
+                self.optimizer.set_objectives([ind], [objectives])
+            population[i] = ind
+
+    def finalize(self):
+        """Complete pending messages and gather the best individual of each island on rank 0."""
+        num_to_receive = self.comm.sendrecv(self.num_sent, dest=self.right,
+                                            sendtag=COUNT_TAG,
+                                            source=self.left,
+                                            recvtag=COUNT_TAG)
+        while self.num_received < num_to_receive:
+            self._recv()
+        MPI.Request.Waitall(self._send_requests)
+        self._send_requests = []
+
+        best = self.optimizer.halloffame[0]
+        islands_best = self.comm.gather((list(best), best.fitness.values), root=0)
+        if self.rank == 0:
+            genes, values = min(islands_best, key=lambda b: b[1])
+            logger.info(f"Best individual of all islands: {genes} with fitness {values}")
+
+
+if __name__ == "__main__":
+    args = IslandGA.parse_args()
+    search = IslandGA(**vars(args))
+    search.run()
@@ -1,13 +1,24 @@
 import random
+import math
+from sys import float_info
+
 import numpy as np
 from copy import copy
 
 from deap import base, creator, tools
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.preprocessing import LabelEncoder
 
+from deephyper.search.hps.optimizer.pareto import Scalarizer, as_vector, is_vector
+
 SEED = 12345
 
+SURROGATES = {
+    'RF': RandomForestRegressor,
+    'ET': ExtraTreesRegressor,
+}
+
 class GAOptimizer:
 
     def __init__(self, problem, num_workers, args, seed=SEED, CXPB=0.5, MUTPB=0.2):
@@ -20,6 +31,7 @@ class GAOptimizer:
         self.INIT_POP_SIZE = pop_size
         self.IND_SIZE = len(problem.space)
 
+        self.problem = problem
         self.toolbox = None
         self.space_encoder = SpaceEncoder(problem.space.values())
 
@@ -30,6 +42,18 @@ class GAOptimizer:
         self.halloffame = tools.HallOfFame(maxsize=1)
         self.logbook = tools.Logbook()
 
+        self.surrogate = getattr(args, 'ga_surrogate', 'none')
+        self.oversampling = getattr(args, 'ga_oversampling', 1.0)
+        assert self.surrogate in ['none'] + list(SURROGATES), f"Unknown surrogate: {self.surrogate}"
+        assert self.oversampling >= 1, f"oversampling factor must be >= 1, got {self.oversampling}"
+        self.archive_X = []  # genes of every evaluated individual
+        self.archive_y = []  # their objective
+        self.num_screened = 0  # candidates rejected by the surrogate
+
+        self.multi_objective = False
+        self.num_objectives = 1
+        self.scalarizer = Scalarizer(seed=seed)
+
     def _check_bounds(self, min, max):
         def decorator(func):
             def wrapper(*args, **kargs):
@@ -67,11 +91,133 @@ class GAOptimizer:
         self.stats.register("avg", np.mean)
         self.stats.register("min", np.min)
 
-    def record_generation(self, num_evals):
+    def record_generation(self, num_evals, utilization=None):
         self.halloffame.update(self.pop)
         record = self.stats.compile(self.pop)
+        if utilization is not None:
+            record['utilization'] = utilization
         self.logbook.record(gen=self.current_gen, evals=num_evals, **record)
 
+    def breed(self, pool):
+        """Create one new individual from a pool of evaluated individuals.
+
+        Two parents are chosen by tournament selection, the child is the first offspring of their crossover (with probability ``CXPB``) and is mutated with probability ``MUTPB``.
+
+        Args:
+            pool (list): evaluated individuals.
+
+        Returns:
+            Individual: the new individual, its fitness is invalid.
+        """
+        parents = self.toolbox.select(pool, 2)
+        child1, child2 = map(self.toolbox.clone, parents)
+        if random.random() < self.CXPB:
+            child1, child2 = self.toolbox.mate(child1, child2)
+        if random.random() < self.MUTPB:
+            child1, = self.toolbox.mutate(child1)
+        del child1.fitness.values
+        return child1
+
+    def features(self, individuals):
+        """Genes seen by the surrogate, genes of inactive dimensions are collapsed to the encoding of their inactive value."""
+        if not getattr(self.problem, 'conditional', False):
+            return [list(ind) for ind in individuals]
+        keys = list(self.problem.space.keys())
+        points = []
+        for point in self.space_encoder.decode_points(individuals):
+            x = self.problem.collapse(dict(zip(keys, point)))
+            points.append([x[k] for k in keys])
+        return self.space_encoder.encode_points(points).tolist()
+
+    def set_objectives(self, individuals, objectives):
+        """Set the fitness of individuals from the objectives returned by the run function.
+
+        When the objectives are vectors they are kept in the ``objectives`` attribute of the individuals and the fitness is their scalarization with the current weights.
+
+        Args:
+            individuals (list): evaluated individuals.
+            objectives (list): their objective, a float or a vector of floats.
+        """
+        vectors = [y for y in objectives if is_vector(y)]
+        if vectors:
+            self.multi_objective = True
+            self.num_objectives = max(self.num_objectives, max(map(len, vectors)))
+        if not self.multi_objective:
+            for ind, y in zip(individuals, objectives):
+                ind.fitness.values = (y,)
+            return
+        for ind, y in zip(individuals, objectives):
+            ind.objectives = as_vector(y, self.num_objectives)
+        self.scalarizer.observe([ind.objectives for ind in individuals])
+        self.scalarize(individuals)
+
+    def _objectives(self, ind):
+        if hasattr(ind, 'objectives'):
+            return ind.objectives
+        return as_vector(ind.fitness.values[0], self.num_objectives)
+
+    def scalarize(self, individuals):
+        Y = [self._objectives(ind) for ind in individuals]
+        for ind, s in zip(individuals, self.scalarizer(Y)):
+            ind.fitness.values = (s,)
+
+    def new_scalarization(self, population):
+        """Draw new scalarization weights and update the fitness of the population, only for multi-objective problems."""
+        if not self.multi_objective or not population:
+            return
+        self.scalarizer.sample_weights(self.num_objectives)
+        self.scalarize(population)
+
+    def tell(self, individuals):
+        """Add evaluated individuals to the training data of the surrogate."""
+        self.archive_X.extend(self.features(individuals))
+        if self.multi_objective:
+            self.archive_y.extend(self._objectives(ind) for ind in individuals)
+        else:
+            self.archive_y.extend(ind.fitness.values[0] for ind in individuals)
+
+    @property
+    def screening(self):
+        return self.surrogate != 'none' and self.oversampling > 1
+
+    def num_candidates(self, n):
+        """Number of candidates to breed for ``n`` evaluations."""
+        return int(math.ceil(n * self.oversampling)) if self.screening else n
+
+    def screen(self, candidates, n):
+        """Keep the ``n`` most promising candidates according to the surrogate.
+
+        The surrogate is fitted on all the evaluated individuals, failed evaluations are given the worst finite objective. Candidates identical to an evaluated individual (e.g. parents cloned without variation) come last.
+
+        Args:
+            candidates (list): individuals with an invalid fitness.
+            n (int): number of candidates to keep.
+
+        Returns:
+            list: the ``n`` candidates with the lowest predicted objective.
+        """
+        if not self.screening or len(candidates) <= n or len(self.archive_y) < 2:
+            return candidates[:n]
+        if self.multi_objective:
+            # the surrogate learns the current scalarization
+            y = np.array(self.scalarizer(
+                [as_vector(v, self.num_objectives) for v in self.archive_y]))
+        else:
+            y = np.array(self.archive_y, dtype=float)
+        finite = np.isfinite(y) & (y < float_info.max)
+        if not finite.any():
+            return candidates[:n]
+        y[~finite] = y[finite].max()
+        model = SURROGATES[self.surrogate](n_estimators=100, random_state=self.SEED)
+        model.fit(np.array(self.archive_X), y)
+        X = self.features(candidates)
+        pred = model.predict(np.array(X))
+        evaluated = set(map(tuple, self.archive_X))
+        known = [tuple(x) in evaluated for x in X]
+        best = np.lexsort((pred, known))[:n]
+        self.num_screened += len(candidates) - n
+        return [candidates[i] for i in best]
+
     def __getstate__(self):
         d = copy(self.__dict__)
         d['toolbox'] = None
@@ -83,10 +229,18 @@ class GAOptimizer:
         self._setup()
 
 class SpaceEncoder:
+    """Encode points of a space in [0, 1]^n and decode them back.
+
+    A whole population is decoded with one array operation per dimension, bins of categorical dimensions are computed once.
+
+    Args:
+        space (list): dimensions of the space, ``tuple`` for integer or real ranges and ``list`` for categorical values.
+    """
     def __init__(self, space):
         self.space = space
         self.encoders = []
         self.ttypes = []
+        self.bins = []
         self.encode_space()
 
     def encode_space(self):
@@ -94,6 +248,10 @@ class SpaceEncoder:
             enc, ttype = self.encode(p)
             self.encoders.append(enc)
             self.ttypes.append(ttype)
+            if ttype == 'c':
+                self.bins.append(np.linspace(0.0, 1.0, num=1+len(enc.classes_)))
+            else:
+                self.bins.append(None)
 
     def encode(self, val):
         ttype = 'i'
@@ -108,24 +266,51 @@ class SpaceEncoder:
                 ttype = 'f'
         return encoder, ttype
 
+    def encode_points(self, points):
+        """Encode points of the space in [0, 1]^n, categorical values are encoded at the center of their bin.
+
+        Args:
+            points (list(list)): points of the space.
+
+        Returns:
+            np.ndarray: array of shape ``(len(points), n)``.
+        """
+        columns = []
+        for i, (encoder, ttype) in enumerate(zip(self.encoders, self.ttypes)):
+            col = [point[i] for point in points]
+            if ttype == 'c':
+                idx = encoder.transform(col)
+                enc = (idx + 0.5) / len(encoder.classes_)
+            else:
+                enc = encoder.transform(np.asarray(col, dtype=float).reshape(-1, 1)).ravel()
+            columns.append(enc)
+        return np.array(columns, dtype=float).T.reshape(len(points), len(self.encoders))
+
+    def decode_points(self, points):
+        """Decode a population of points of [0, 1]^n.
+
+        Args:
+            points (list(list)): encoded points, e.g. individuals of a population.
+
+        Returns:
+            list(list): decoded points.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, len(self.encoders))
+        columns = []
+        for i, (encoder, ttype) in enumerate(zip(self.encoders, self.ttypes)):
+            col = points[:, i]
+            if ttype == 'c':
+                idx = np.maximum(0, np.digitize(col, self.bins[i], right=True) - 1)
+                dec = encoder.classes_[idx]
+            else:
+                dec = encoder.inverse_transform(col.reshape(-1, 1)).ravel()
+                if ttype == 'i':
+                    dec = np.rint(dec).astype(int)
+            columns.append(dec.tolist())
+        return [list(point) for point in zip(*columns)]
+
     def decode_point(self, point):
-        try:
-            result = [ self.decode(point[i], self.encoders[i]) for i in range(len(point)) ]
-        except ValueError:
-            print("GOT VALUE ERROR WHEN TRYING TO DECODE", point)
-            raise
-        for i in range(len(point)):
-            if self.ttypes[i] == 'i':
-                result[i] = int(round(result[i]))
-        return result
-
-    def decode(self, enc_val, encoder):
-        dec_val = enc_val
-        if hasattr(encoder, 'classes_'):
-            bins = np.linspace(0.0, 1.0, num=1+len(list(encoder.classes_)))
-            dec_val = max(0, np.digitize(enc_val, bins, right=True) - 1)
-        dec_val = encoder.inverse_transform(np.array([dec_val]).reshape(1, -1))
-        return np.asscalar(dec_val)
+        return self.decode_points([point])[0]
 
 def uniform(lower_list, upper_list, dimensions):
     """Fill array """
@@ -0,0 +1,104 @@
+"""Space-filling initial designs.
+
+Points are generated in the unit hypercube and mapped to the dimensions of a ``HpProblem`` space, one array operation per dimension:
+
+* ``sobol`` : scrambled Sobol sequence.
+* ``lhs`` : Latin hypercube, each dimension is divided in ``n`` strata which are sampled once.
+* ``maximin`` : the Latin hypercube with the largest distance between its two closest points out of ``MAXIMIN_CANDIDATES`` random ones.
+
+Real ``(low, high)`` dimensions are sampled uniformly (log-uniformly with a ``'log-uniform'`` prior), integer dimensions and categorical dimensions are divided in equal bins.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+SEED = 12345
+DESIGNS = ['random', 'sobol', 'lhs', 'maximin']
+MAXIMIN_CANDIDATES = 10
+
+
+def random_unit(n, d, random_state):
+    return random_state.uniform(size=(n, d))
+
+
+def lhs_unit(n, d, random_state):
+    # argsort of uniform values gives one random permutation of the strata per dimension
+    strata = np.argsort(random_state.uniform(size=(n, d)), axis=0)
+    return (strata + random_state.uniform(size=(n, d))) / n
+
+
+def maximin_unit(n, d, random_state):
+    best, best_dist = None, -1.
+    for _ in range(MAXIMIN_CANDIDATES):
+        points = lhs_unit(n, d, random_state)
+        if n < 2:
+            return points
+        # distance of each point to its nearest neighbor
+        dist, _ = cKDTree(points).query(points, k=2)
+        min_dist = dist[:, 1].min()
+        if min_dist > best_dist:
+            best, best_dist = points, min_dist
+    return best
+
+
+def sobol_unit(n, d, random_state):
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        from skopt.sampler import Sobol
+        return np.array(Sobol().generate([(0., 1.)] * d, n,
+                                         random_state=random_state))
+    sampler = qmc.Sobol(d=d, scramble=True,
+                        seed=random_state.randint(np.iinfo(np.int32).max))
+    m = int(np.ceil(np.log2(max(n, 1))))
+    return sampler.random_base2(m)[:n]
+
+
+UNIT_DESIGNS = {
+    'random': random_unit,
+    'sobol': sobol_unit,
+    'lhs': lhs_unit,
+    'maximin': maximin_unit,
+}
+
+
+def map_dimension(u, dim):
+    """Map values of [0, 1) to a dimension of a ``HpProblem``.
+
+    Args:
+        u (np.ndarray): values in [0, 1).
+        dim (tuple|list): the dimension, ``(low, high)``, ``(low, high, prior)`` or a list of categories.
+
+    Returns:
+        list: the values of the dimension.
+    """
+    if isinstance(dim, list):
+        idx = np.minimum((u * len(dim)).astype(int), len(dim) - 1)
+        return [dim[i] for i in idx]
+    low, high = dim[0], dim[1]
+    if isinstance(low, int) and isinstance(high, int):
+        values = np.minimum(np.floor(low + u * (high - low + 1)), high)
+        return values.astype(int).tolist()
+    if len(dim) > 2 and dim[2] == 'log-uniform':
+        return np.exp(np.log(low) + u * (np.log(high) - np.log(low))).tolist()
+    return (low + u * (high - low)).tolist()
+
+
+def initial_design(dims, n_points, method='lhs', random_state=SEED):
+    """Generate a space-filling design.
+
+    Args:
+        dims (list): dimensions of a ``HpProblem`` space, e.g. ``problem.space.values()``.
+        n_points (int): number of points.
+        method (str): one of ``DESIGNS``.
+        random_state (int|np.random.RandomState): seed or random state.
+
+    Returns:
+        list(list): the points, the values of each point are in the order of ``dims``.
+    """
+    assert method in DESIGNS, f'Unknown initial design: {method}'
+    if not isinstance(random_state, np.random.RandomState):
+        random_state = np.random.RandomState(random_state)
+    dims = list(dims)
+    U = UNIT_DESIGNS[method](n_points, len(dims), random_state)
+    columns = [map_dimension(U[:, i], dim) for i, dim in enumerate(dims)]
+    return [list(point) for point in zip(*columns)]
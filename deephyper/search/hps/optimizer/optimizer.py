@@ -1,17 +1,25 @@
 from sys import float_info
+import numpy as np
 from skopt import Optimizer as SkOptimizer
+from skopt.acquisition import gaussian_ei, gaussian_lcb, gaussian_pi
 from numpy import inf
 from deephyper.search import util
+from deephyper.search.hps.optimizer.pareto import Scalarizer, as_vector, is_vector
+from deephyper.search.hps.optimizer.initial_design import initial_design
 
 logger = util.conf_logger('deephyper.search.hps.optimizer.optimizer')
 
 class Optimizer:
     SEED = 12345
     KAPPA = 1.96
+    MAX_REJECTIONS = 1000  # forbidden points drawn before giving up
+    NUM_CANDIDATES = 100  # random points drawn at once to replace a forbidden point
+    MIN_DURATION = 1e-3  # seconds, the runtime model learns log(duration)
 
-    def __init__(self, problem, num_workers, args):
+    def __init__(self, problem, num_workers, args, seed=None, kappa=None):
         assert args.learner in ["RF", "ET", "GBRT", "GP", "DUMMY"], f"Unknown scikit-optimize base_estimator: {args.learner}"
 
+        self.problem = problem
         self.space = problem.space
         n_init = inf if args.learner=='DUMMY' else num_workers
         self._optimizer = SkOptimizer(
@@ -19,8 +27,8 @@ class Optimizer:
             base_estimator=args.learner,
             acq_optimizer='sampling',
             acq_func=args.acq_func,
-            acq_func_kwargs={'kappa':self.KAPPA},
-            random_state=self.SEED,
+            acq_func_kwargs={'kappa':self.KAPPA if kappa is None else kappa},
+            random_state=self.SEED if seed is None else seed,
             n_initial_points=n_init
         )
 
@@ -28,35 +36,147 @@ class Optimizer:
         self.strategy = args.liar_strategy
         self.evals = {}
         self.counter = 0
+        self.infeasible = set()  # keys of the forbidden points told to the model
+        self.lies = set()  # keys of the asked points which are not evaluated yet
+        self.objectives = {}  # key --> evaluated objective, a float or a vector
+        self._vectors = False  # True once a vector of objectives has been told
+        self.scalarizer = Scalarizer(seed=self.SEED)
+        self.initial_design = getattr(args, 'initial_design', 'random')
+        self.cost_aware = args.acq_func in ['EIps', 'PIps']
+        self.times = {}  # key --> runtime (seconds) of the evaluation
         logger.info("Using skopt.Optimizer with %s base_estimator" % args.learner)
 
+    def _objective_values(self):
+        """Objectives told to the model (without the runtimes of a cost aware acquisition)."""
+        if self.cost_aware:
+            return [y[0] for y in self._optimizer.yi]
+        return list(self._optimizer.yi)
+
     def _get_lie(self):
+        yi = self._objective_values()
         if self.strategy == "cl_min":
-            return min(self._optimizer.yi) if self._optimizer.yi else 0.0
+            return min(yi) if yi else 0.0
         elif self.strategy == "cl_mean":
-            return self._optimizer.yi.mean() if self._optimizer.yi else 0.0
+            return sum(yi) / len(yi) if yi else 0.0
         else:
-            return  max(self._optimizer.yi) if self._optimizer.yi else 0.0
+            return  max(yi) if yi else 0.0
+
+    def _get_time_lie(self):
+        """Runtime told for points without a measured runtime: the mean measured runtime."""
+        if not self.times:
+            return 1.0
+        return sum(self.times.values()) / len(self.times)
 
     def _xy_from_dict(self):
         XX = list(self.evals.keys())
         YY = [self.evals[x] for x in XX]
+        if self.cost_aware:
+            time_lie = self._get_time_lie()
+            YY = [[y, self.times.get(x, time_lie)] for x, y in zip(XX, YY)]
         return XX, YY
 
     def to_dict(self, x):
         return {k:v for k,v in zip(self.space, x)}
 
+    def _canonicalize(self, x):
+        """Collapse the inactive dimensions of a point of the space.
+
+        Returns:
+            list: the collapsed point, ``None`` if it is forbidden.
+        """
+        cfg = self.problem.canonicalize(self.to_dict(x))
+        return None if cfg is None else [cfg[k] for k in self.space]
+
+    def _add_infeasible(self, x):
+        """Penalize a forbidden point so that the model moves away from it, it is told to the model by the caller.
+
+        Returns:
+            list: ``[(x, y)]`` to tell, empty if the point is already known.
+        """
+        key = tuple(x)
+        if key in self.evals:
+            return []
+        self.counter += 1
+        yi = self._objective_values()
+        y = max(yi) if yi else 0.0
+        self.evals[key] = y
+        self.infeasible.add(key)
+        logger.debug(f'_ask: forbidden point {x}')
+        return [(x, y)]
+
+    def _tell_points(self, xy):
+        """Tell several points to the model with a single fit."""
+        if not xy:
+            return
+        XX = [x for x, _ in xy]
+        if self.cost_aware:
+            YY = [[y, self.times.get(tuple(x), self._get_time_lie())] for x, y in xy]
+        else:
+            YY = [y for _, y in xy]
+        self._optimizer.tell(XX, YY)
+
+    def _replace_forbidden(self):
+        """Draw random points by batches of ``NUM_CANDIDATES`` until some are not forbidden, the one with the best acquisition value is kept (the first one while the model is not fitted).
+
+        Returns:
+            list: the collapsed point.
+        """
+        opt = self._optimizer
+        for _ in range(max(1, self.MAX_REJECTIONS // self.NUM_CANDIDATES)):
+            candidates = opt.space.rvs(n_samples=self.NUM_CANDIDATES, random_state=opt.rng)
+            canonical = [self._canonicalize(x) for x in candidates]
+            feasible = [i for i, x in enumerate(canonical) if x is not None]
+            if feasible:
+                break
+        else:
+            raise RuntimeError(f'No feasible point found after {self.MAX_REJECTIONS} tries, check the forbidden clauses of the problem')
+        if not opt.models:
+            return canonical[feasible[0]]
+        values = self._acquisition(opt.space.transform([candidates[i] for i in feasible]))
+        return canonical[feasible[int(np.argmax(values))]]
+
+    def _acquisition(self, X):
+        """Acquisition values of transformed points for the last model, higher is better (``EI`` for ``gp_hedge``).
+
+        With a cost aware acquisition the values are divided by the runtimes predicted by the model of the runtime, which learns ``log(duration)``.
+        """
+        opt = self._optimizer
+        kwargs = opt.acq_func_kwargs or {}
+        model = opt.models[-1]
+        if self.cost_aware:
+            model, time_model = model.estimators_
+        acq_func = opt.acq_func
+        if acq_func == 'LCB':
+            return -gaussian_lcb(X, model, kwargs.get('kappa', 1.96))
+        y_opt = np.min(self._objective_values())
+        if acq_func in ['PI', 'PIps']:
+            values = gaussian_pi(X, model, y_opt, kwargs.get('xi', 0.01))
+        else:
+            values = gaussian_ei(X, model, y_opt, kwargs.get('xi', 0.01))
+        if self.cost_aware:
+            values = values / np.exp(time_model.predict(X))
+        return values
+
     def _ask(self):
         x = self._optimizer.ask()
+        x_canonical = self._canonicalize(x)
+        # the forbidden point and the lie are told with a single fit
+        told = []
+        if x_canonical is None:
+            told = self._add_infeasible(x)
+            x_canonical = self._replace_forbidden()
+        x = x_canonical
         y = self._get_lie()
         key = tuple(x)
         if key not in self.evals:
             self.counter += 1
-            self._optimizer.tell(x,y)
+            told.append((x, y))
             self.evals[key] = y
+            self.lies.add(key)
             logger.debug(f'_ask: {x} lie: {y}')
         else:
             logger.debug(f'Duplicate _ask: {x} lie: {y}')
+        self._tell_points(told)
         return self.to_dict(x)
 
     def ask(self, n_points=None, batch_size=20):
@@ -73,24 +193,136 @@ class Optimizer:
                 yield batch
 
     def ask_initial(self, n_points):
-        XX = self._optimizer.ask(n_points=n_points)
-        for x in XX:
+        """Draw the initial points, they are all told to the model with a single call.
+
+        The points are drawn by scikit-optimize with the ``random`` initial design, or generated by ``deephyper.search.hps.optimizer.initial_design`` otherwise.
+        """
+        if self.initial_design == 'random':
+            points = self._optimizer.ask(n_points=n_points)
+        else:
+            points = initial_design(self.space.values(), n_points,
+                                    method=self.initial_design,
+                                    random_state=self._optimizer.rng)
+        XX, new_XX, new_keys, infeasible = [], [], set(), []
+        for x in points:
+            x_canonical = self._canonicalize(x)
+            if x_canonical is None:
+                infeasible.extend(self._add_infeasible(x))
+                continue
+            XX.append(x_canonical)
+            key = tuple(x_canonical)
+            if key not in self.evals and key not in new_keys:
+                new_XX.append(x_canonical)
+                new_keys.add(key)
+        if new_XX:
             y = self._get_lie()
-            key = tuple(x)
+            self.counter += len(new_XX)
+            for key in new_keys:
+                self.evals[key] = y
+            self.lies.update(new_keys)
+        self._tell_points(infeasible + [(x, self.evals[tuple(x)]) for x in new_XX])
+        batch = [self.to_dict(x) for x in XX]
+        # replace the forbidden initial points
+        batch.extend(self._ask() for _ in range(n_points - len(batch)))
+        return batch
+
+    def discard(self, XX):
+        """Forget asked points which will not be evaluated (e.g. they were predicted to exceed the time budget of the search).
+
+        Their lies are removed from the data of the model at the next refit.
+
+        Args:
+            XX (list(dict)): the points.
+        """
+        for x in XX:
+            key = tuple(x[k] for k in self.space)
+            if key in self.lies:
+                self.lies.remove(key)
+                del self.evals[key]
+                self.counter -= 1
+
+    def warm_start(self, xy_data):
+        """Tell the results of previous evaluations to the optimizer with a single fit.
+
+        Args:
+            xy_data (list): list of ``(x, y)`` where ``x`` is a dict.
+        """
+        assert isinstance(xy_data, list), f"where type(xy_data)=={type(xy_data)}"
+        if not xy_data:
+            return
+        finite = [y for _, y in xy_data if y < float_info.max]
+        maxval = max(finite) if finite else 0.0
+        for x, y in xy_data:
+            key = tuple(x[k] for k in self.space)
             if key not in self.evals:
                 self.counter += 1
-                self._optimizer.tell(x,y)
-                self.evals[key] = y
-        return [self.to_dict(x) for x in XX]
+            self.evals[key] = (y if y < float_info.max else maxval)
 
-    def tell(self, xy_data):
+        self._optimizer.Xi = []
+        self._optimizer.yi = []
+        XX, YY = self._xy_from_dict()
+        self._optimizer.tell(XX, YY)
+        logger.info(f"Warm start with {len(xy_data)} evaluations")
+
+    @property
+    def multi_objective(self):
+        return self._vectors
+
+    def _scalarize(self):
+        """Draw a new random scalarization of the objective vectors and use it as objective of the evaluated points.
+
+        A scalar objective (including the ones told before the first vector) is the objective of a failed evaluation, it gets the worst scalarization.
+        """
+        keys = list(self.objectives.keys())
+        num_objectives = max(len(y) for y in self.objectives.values() if is_vector(y))
+        failed = [float_info.max] * num_objectives
+        Y = [as_vector(y, num_objectives) if is_vector(y) else failed
+             for y in map(self.objectives.get, keys)]
+        self.scalarizer.observe(Y)
+        self.scalarizer.sample_weights(num_objectives)
+        for key, s in zip(keys, self.scalarizer(Y)):
+            self.evals[key] = s
+        logger.info(f"Scalarization weights of the objectives: {self.scalarizer.weights}")
+
+    def _update_infeasible(self):
+        """Forbidden points get the worst objective of the other points."""
+        if self.infeasible:
+            values = [y for key, y in self.evals.items() if key not in self.infeasible]
+            penalty = max(values) if values else 0.0
+            for key in self.infeasible:
+                self.evals[key] = penalty
+
+    def tell(self, xy_data, durations=None, external=False):
+        """Tell the results of evaluations and refit the model.
+
+        Args:
+            xy_data (list): list of ``(x, y)`` where ``x`` is a dict.
+            durations (list, optional): runtimes in seconds of the evaluations, learned by the model of the runtime with a cost aware acquisition function (``EIps``, ``PIps``). ``None`` for unknown runtimes.
+            external (bool, optional): if True the points may not have been asked to this optimizer (e.g. they were evaluated for an other optimizer), new points are added to the data of the model.
+        """
         assert isinstance(xy_data, list), f"where type(xy_data)=={type(xy_data)}"
-        maxval = max(self._optimizer.yi) if self._optimizer.yi else 0.0
-        for x,y in xy_data:
+        yi = self._objective_values()
+        maxval = max(yi) if yi else 0.0
+        if durations is None:
+            durations = [None] * len(xy_data)
+        for (x,y), duration in zip(xy_data, durations):
             key = tuple(x[k] for k in self.space)
+            if external and key not in self.evals:
+                self.counter += 1
+                self.evals[key] = maxval
             assert key in self.evals, f"where key=={key} and self.evals=={self.evals}"
+            self.lies.discard(key)
             logger.debug(f'tell: {x} --> {key}: evaluated objective: {y}')
-            self.evals[key] = (y if y < float_info.max else maxval)
+            if duration is not None:
+                self.times[key] = max(duration, self.MIN_DURATION)
+            self.objectives[key] = y
+            if is_vector(y):
+                self._vectors = True
+            elif not self.multi_objective:
+                self.evals[key] = (y if y < float_info.max else maxval)
+        if self.multi_objective:
+            self._scalarize()
+        self._update_infeasible()
 
         self._optimizer.Xi = []
         self._optimizer.yi = []
@@ -0,0 +1,183 @@
+"""Tools for multi-objective searches.
+
+A run function can return a vector of objectives to minimize, for example ``(loss, train_seconds, inference_ms)``. The searches then optimize random augmented Chebyshev scalarizations of the objectives (ParEGO): the weights of the scalarization are drawn again each time the model is updated so that the whole Pareto front is explored, and the Pareto set of the evaluated configurations is written in ``pareto.csv`` (see ``ParetoFront``).
+"""
+import csv
+from sys import float_info
+
+import numpy as np
+
+SEED = 12345
+
+
+def is_vector(y):
+    """True if ``y`` is a vector of objectives."""
+    return isinstance(y, (list, tuple, np.ndarray))
+
+
+def as_vector(y, num_objectives):
+    """Convert an objective to a vector, a scalar (e.g. the objective of a failed evaluation) is repeated for each objective."""
+    if is_vector(y):
+        return [float(v) for v in y]
+    return [float(y)] * num_objectives
+
+
+def pareto_mask(Y):
+    """Find the non-dominated points of a set of objective vectors (all objectives are minimized).
+
+    Args:
+        Y (array): array of shape ``(n, num_objectives)``.
+
+    Returns:
+        np.ndarray: boolean array of shape ``(n,)``, True for the points of the Pareto front.
+    """
+    Y = np.asarray(Y, dtype=float)
+    if len(Y) == 0:
+        return np.zeros(0, dtype=bool)
+    # dominated[i, j] is True if point j dominates point i
+    le = np.all(Y[None, :, :] <= Y[:, None, :], axis=2)
+    lt = np.any(Y[None, :, :] < Y[:, None, :], axis=2)
+    return ~np.any(le & lt, axis=1)
+
+
+class Scalarizer:
+    """Random augmented Chebyshev scalarizations of objective vectors.
+
+    Objectives are normalized in [0, 1] with the bounds of all the observed (non failed) vectors, the scalarization of a normalized vector ``z`` is ``max(w * z) + rho * sum(w * z)`` with weights ``w`` drawn uniformly on the simplex.
+
+    Args:
+        seed (int): seed of the random weights.
+        rho (float): weight of the linear term.
+    """
+
+    def __init__(self, seed=SEED, rho=0.05):
+        self.rho = rho
+        self.weights = None
+        self.low = None
+        self.high = None
+        self._random_state = np.random.RandomState(seed)
+
+    def sample_weights(self, num_objectives):
+        self.weights = self._random_state.dirichlet(np.ones(num_objectives))
+        return self.weights
+
+    def observe(self, Y):
+        """Update the normalization bounds with new objective vectors."""
+        if len(Y) == 0:
+            return
+        Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+        Y = Y[np.all(Y < float_info.max, axis=1)]
+        if len(Y) == 0:
+            return
+        low, high = Y.min(axis=0), Y.max(axis=0)
+        if self.low is None:
+            self.low, self.high = low, high
+        else:
+            self.low = np.minimum(self.low, low)
+            self.high = np.maximum(self.high, high)
+
+    def __call__(self, Y):
+        """Scalarize objective vectors with the current weights.
+
+        Failed vectors (with a ``sys.float_info.max`` objective) get the worst scalarization of the others.
+
+        Args:
+            Y (array): array of shape ``(n, num_objectives)``.
+
+        Returns:
+            list(float): the scalarizations.
+        """
+        if len(Y) == 0:
+            return []
+        Y = np.asarray(Y, dtype=float).reshape(len(Y), -1)
+        if self.weights is None or len(self.weights) != Y.shape[1]:
+            self.sample_weights(Y.shape[1])
+        failed = np.any(Y >= float_info.max, axis=1)
+        if self.low is None:
+            return [float_info.max if f else 0.0 for f in failed]
+        scale = np.where(self.high > self.low, self.high - self.low, 1.0)
+        Z = self.weights * (Y - self.low) / scale
+        s = Z.max(axis=1) + self.rho * Z.sum(axis=1)
+        s[failed] = s[~failed].max() if (~failed).any() else 0.0
+        return s.tolist()
+
+
+def dominates(y1, y2):
+    """True if the objective vector ``y1`` dominates ``y2`` (all objectives are minimized)."""
+    return all(a <= b for a, b in zip(y1, y2)) and any(a < b for a, b in zip(y1, y2))
+
+
+class ParetoFront:
+    """Pareto set of the finished evaluations of an evaluator, updated incrementally.
+
+    Each new objective vector is only compared to the current front, the csv file is written again only when the front changed.
+
+    Args:
+        path (str): path of the csv file.
+    """
+
+    def __init__(self, path='pareto.csv'):
+        self.path = path
+        self.front = []  # (x, y) of the non-dominated configurations
+        self._seen = set()  # uids of the finished evaluations already added
+        self._changed = False
+
+    def add(self, x, y):
+        """Add an evaluated configuration.
+
+        Returns:
+            bool: True if the configuration enters the front.
+        """
+        if any(dominates(y_front, y) for _, y_front in self.front):
+            return False
+        self.front = [(x_front, y_front) for x_front, y_front in self.front
+                      if not dominates(y, y_front)]
+        self.front.append((x, y))
+        self._changed = True
+        return True
+
+    def update(self, evaluator):
+        """Add the new vector objectives of the finished evaluations of ``evaluator``."""
+        finished = evaluator.finished_evals
+        for key, uid in evaluator.key_uid_map.items():
+            if uid in self._seen or uid not in finished:
+                continue
+            self._seen.add(uid)
+            y = finished[uid]
+            if is_vector(y):
+                self.add(evaluator.decode(key), [float(v) for v in y])
+
+    def dump(self, evaluator):
+        """Update the front with ``evaluator`` and write it if it changed.
+
+        Returns:
+            list: ``(x, y)`` for each configuration of the Pareto set.
+        """
+        self.update(evaluator)
+        if self._changed:
+            rows = []
+            for x, y in self.front:
+                row = dict(x)
+                row.update({f'objective_{i}': v for i, v in enumerate(y)})
+                rows.append(row)
+            with open(self.path, 'w') as fp:
+                writer = csv.DictWriter(fp, rows[0].keys())
+                writer.writeheader()
+                writer.writerows(rows)
+            self._changed = False
+        return self.front
+
+
+def dump_pareto(evaluator, path='pareto.csv'):
+    """Write the Pareto set of the finished evaluations of an evaluator.
+
+    Searches writing the front regularly keep a ``ParetoFront`` instead, which does not compare all the evaluations again.
+
+    Args:
+        evaluator (Evaluator): the evaluator of the search.
+        path (str): path of the csv file.
+
+    Returns:
+        list: ``(x, y)`` for each configuration of the Pareto set.
+    """
+    return ParetoFront(path).dump(evaluator)
@@ -29,7 +29,7 @@ def constfn(val):
 def learn(*, network, env, total_timesteps, eval_env=None, seed=None, nsteps=128, ent_coef=0.0, lr=3e-4,
           vf_coef=0.5, max_grad_norm=0.5, gamma=0.99, lam=0.95,
           log_interval=10, nminibatches=1, noptepochs=4, cliprange=0.2,
-          save_interval=10, load_path=None, model_fn=None, **network_kwargs):
+          save_interval=10, load_path=None, model_fn=None, stop=None, **network_kwargs):
     """
     Learn policy using PPO algorithm (https://arxiv.org/abs/1707.06347)
 
@@ -78,6 +78,8 @@ def learn(*, network, env, total_timesteps, eval_env=None, seed=None, nsteps=128
 
     load_path: str                    path to load the model from
 
+    stop: callable or None            the training stops before an update when stop() returns True (e.g. at the end of the time budget of the search)
+
     **network_kwargs:                 keyword arguments to the policy / network builder. See baselines.common/policies.py/build_policy and arguments to a particular type of network
                                       For instance, 'mlp' network architecture has arguments num_hidden and num_layers.
     """
@@ -143,6 +145,9 @@ def learn(*, network, env, total_timesteps, eval_env=None, seed=None, nsteps=128
     while True:
         if not math.isnan(nupdates) and update >= nupdates:
             break
+        if stop is not None and stop():
+            logger.info(f'Training stopped before update {update}')
+            break
         assert nbatch % nminibatches == 0
         # Start timer
         tstart = time.perf_counter()
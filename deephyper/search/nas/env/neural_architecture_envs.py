@@ -23,12 +23,13 @@ class NeuralArchitectureVecEnv(VecEnv):
     One environment corresponds to one deep neural network architecture.
     """
 
-    def __init__(self, num_envs, space, evaluator, structure):
+    def __init__(self, num_envs, space, evaluator, structure, arch_filter=None):
         assert num_envs >= 1
 
         self.space = space
         self.structure = structure
         self.evaluator = evaluator
+        self.arch_filter = arch_filter
 
         observation_space = spaces.Box(
             low=0,
@@ -63,6 +64,11 @@ class NeuralArchitectureVecEnv(VecEnv):
 
             self.stats['batch_computation'] = time.time()
 
+            if self.arch_filter is not None:
+                # rejected architectures get a penalty without being executed
+                _, rejected = self.arch_filter.split(self.eval_uids)
+                self.arch_filter.reject(self.evaluator, rejected)
+
             self.evaluator.add_eval_batch(self.eval_uids)
 
     def step_wait(self):
@@ -83,6 +89,9 @@ class NeuralArchitectureVecEnv(VecEnv):
             self.stats['batch_computation'] = time.time() - \
                 self.stats['batch_computation']
             self.stats['num_cache_used'] = self.evaluator.stats['num_cache_used']
+            self.stats['dedupe_rate'] = self.evaluator.dedupe_rate
+            if self.arch_filter is not None:
+                self.stats['num_rejected'] = self.arch_filter.num_rejected
             self.stats['rank'] = MPI.COMM_WORLD.Get_rank(
             ) if MPI is not None else 0
 
@@ -108,6 +117,6 @@ class NeuralArchitectureVecEnv(VecEnv):
 
     def reset(self):
         self.__init__(self.num_envs, self.space,
-                      self.evaluator, self.structure)
+                      self.evaluator, self.structure, self.arch_filter)
         self._states = np.stack([np.array([1.]) for _ in range(self.num_envs)])
         return self._states
@@ -1,13 +1,19 @@
 import os
 from random import random
 
-from deephyper.search import Search
+from deephyper.search import Search, util
+from deephyper.search.nas.utils.arch_filter import ArchitectureFilter
+from deephyper.search.nas.utils.arch_key import key
 
 try:
     from mpi4py import MPI
 except ImportError:
     MPI = None
 
+dhlogger = util.conf_logger('deephyper.search.nas.full_random')
+
+MAX_TRIES = 10  # samples of a rejected architecture before submitting it with a penalty
+
 
 class Random(Search):
     """Search class to run a full random neural architecture search. The search is filling every available nodes as soon as they are detected. The master job is using only 1 MPI rank.
@@ -15,7 +21,7 @@ class Random(Search):
     Args:
         problem (str): Module path to the Problem instance you want to use for the search (e.g. deephyper.benchmark.nas.linearReg.Problem).
         run (str): Module path to the run function you want to use for the search (e.g. deephyper.search.nas.model.run.quick).
-        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool'].
+        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool', 'shared'].
     """
 
     def __init__(self, problem, run, evaluator, **kwargs):
@@ -35,7 +41,9 @@ class Random(Search):
             else:
                 self.free_workers = 1
 
-        super().__init__(problem, run, evaluator, **kwargs)
+        super().__init__(problem, run, evaluator, cache_key=key, **kwargs)
+
+        self.arch_filter = ArchitectureFilter(self.problem.space, **kwargs)
 
     @staticmethod
     def _extend_parser(parser):
@@ -49,6 +57,7 @@ class Random(Search):
                             )
         parser.add_argument('--max-evals', type=int, default=1e10,
                             help='maximum number of evaluations.')
+        ArchitectureFilter._extend_parser(parser)
         return parser
 
     def main(self):
@@ -75,11 +84,22 @@ class Random(Search):
                 batch.append(cfg)
             return batch
 
+        def gen_accepted_batch(size):
+            batch, rejected = self.arch_filter.split(gen_batch(size))
+            for _ in range(MAX_TRIES):
+                if not rejected:
+                    break
+                accepted, rejected = self.arch_filter.split(
+                    gen_batch(len(rejected)))
+                batch.extend(accepted)
+            self.arch_filter.reject(self.evaluator, rejected)
+            return batch + rejected
+
         # Filling available nodes at start
-        self.evaluator.add_eval_batch(gen_batch(size=available_workers))
+        self.evaluator.add_eval_batch(gen_accepted_batch(size=available_workers))
 
         # Main loop
-        while num_evals_done < self.args.max_evals:
+        while num_evals_done < self.args.max_evals and not self.time_budget.expired:
             results = self.evaluator.get_finished_evals()
 
             num_received = num_evals_done
@@ -89,7 +109,13 @@ class Random(Search):
 
             # Filling available nodes
             if num_received > 0:
-                self.evaluator.add_eval_batch(gen_batch(size=num_received))
+                batch, _ = self.time_budget.fill(gen_accepted_batch, num_received)
+                if batch:
+                    self.evaluator.add_eval_batch(batch)
+
+        dhlogger.info(f'dedupe rate: {self.evaluator.dedupe_rate:.3f}')
+        dhlogger.info(f'rejected architectures: {self.arch_filter.num_rejected}')
+        self.evaluator.dump_evals()
 
 
 if __name__ == "__main__":
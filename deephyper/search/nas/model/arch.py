@@ -31,6 +31,9 @@ loss_metric = 'loss_metric'
 metrics = 'metrics'
 test_metric = 'test_metric'
 text_input = 'text_input'
+fine_tune_epochs = 'fine_tune_epochs'
+supernet_epochs = 'supernet_epochs'
+supernet_paths = 'supernet_paths'
 
 
 # data
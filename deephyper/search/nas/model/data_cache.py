@@ -0,0 +1,84 @@
+"""Worker level cache of the datasets of the NAS run functions.
+
+``run.alpha`` loads the data and the trainers preprocess them for each evaluation. Loaded and preprocessed datasets are kept in the memory of the worker, keyed by ``(load_data function, kwargs, preprocessing function)``, so that the workers which execute several evaluations (``threadPool``, ``processPool`` and ``shared`` evaluators) load and preprocess a dataset once. With the ``subprocess`` and ``balsam`` evaluators each evaluation is a new process and the cache is always empty.
+
+Cached datasets are shared by the evaluations and must not be modified in place. The hits and misses are counted in ``Evaluator.stats['data_cache_hits']`` and ``Evaluator.stats['data_cache_misses']`` (see ``deephyper.evaluator.reporter.record``).
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from deephyper.evaluator.evaluate import Encoder
+from deephyper.evaluator.reporter import record
+
+MAX_ENTRIES = 4  # datasets kept in memory, the least recently used one is removed first
+
+_cache = OrderedDict()
+_lock = threading.RLock()  # protects _cache and _key_locks, it is never held during a computation
+_key_locks = {}  # key --> lock held while the dataset is computed
+
+
+def _name(func):
+    if func is None:
+        return None
+    if callable(func):
+        return f'{func.__module__}.{func.__qualname__}'
+    return str(func)
+
+
+def make_key(load_data, kwargs=None, preprocessing=None):
+    """Key of a dataset.
+
+    Args:
+        load_data (callable|str): the function loading the data.
+        kwargs (dict): the arguments of ``load_data``.
+        preprocessing (callable|str): the function creating the preprocessor, ``None`` for the loaded data.
+
+    Returns:
+        tuple: the key.
+    """
+    try:
+        kwargs = json.dumps(kwargs, cls=Encoder, sort_keys=True)
+    except TypeError:
+        kwargs = repr(kwargs)
+    return (_name(load_data), kwargs, _name(preprocessing))
+
+
+def cached(key, compute):
+    """Get a dataset from the cache or compute it.
+
+    Concurrent evaluations of the same worker process wait for the dataset instead of computing it again, datasets with different keys are computed in parallel.
+
+    Args:
+        key (tuple): the key of the dataset, see ``make_key``.
+        compute (callable): computes the dataset on a miss.
+    """
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            record('data_cache_hits')
+            return _cache[key]
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        with _lock:
+            # computed by an other evaluation while waiting
+            if key in _cache:
+                _cache.move_to_end(key)
+                record('data_cache_hits')
+                return _cache[key]
+        record('data_cache_misses')
+        try:
+            value = compute()
+            with _lock:
+                _cache[key] = value
+                while len(_cache) > MAX_ENTRIES:
+                    _cache.popitem(last=False)
+        finally:
+            with _lock:
+                _key_locks.pop(key, None)
+        return value
+
+
+def clear():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def data_shapes(data):
+    """Shapes of the data returned by a ``load_data`` function.
+
+    Returns:
+        tuple: ``(input_shape, output_shape, data)`` where ``data`` is the dict expected by the trainers.
+    """
+    if type(data) is tuple:
+        if len(data) != 2:
+            raise RuntimeError(
+                f'Loaded data are tuple, should ((training_input, training_output), (validation_input, validation_output)) but length=={len(data)}')
+        (t_X, t_y), (v_X, v_y) = data
+        if type(t_X) is np.ndarray and type(t_y) is np.ndarray and \
+                type(v_X) is np.ndarray and type(v_y) is np.ndarray:
+            input_shape = np.shape(t_X)[1:]
+        elif type(t_X) is list and type(t_y) is np.ndarray and \
+                type(v_X) is list and type(v_y) is np.ndarray:
+            # interested in shape of data not in length
+            input_shape = [np.shape(itX)[1:] for itX in t_X]
+        else:
+            raise RuntimeError(
+                f'Data returned by load_data function are of a wrong type: type(t_X)=={type(t_X)},  type(t_y)=={type(t_y)}, type(v_X)=={type(v_X)}, type(v_y)=={type(v_y)}')
+        output_shape = np.shape(t_y)[1:]
+        data = {
+            'train_X': t_X,
+            'train_Y': t_y,
+            'valid_X': v_X,
+            'valid_Y': v_y
+        }
+    elif type(data) is dict:
+        input_shape = [data['shapes'][0][f'input_{i}']
+                       for i in range(len(data['shapes'][0]))]
+        output_shape = data['shapes'][1]
+    else:
+        raise RuntimeError(
+            f'Data returned by load_data function are of an unsupported type: {type(data)}')
+    return input_shape, output_shape, data
@@ -1,10 +1,16 @@
-from random import random
+import random
 import traceback
 
 import numpy as np
+import tensorflow as tf
 from tensorflow import keras
 
 from deephyper.search import util
+from deephyper.search.nas.model import arch as a
+from deephyper.search.nas.model import data_cache
+from deephyper.search.nas.model.data_utils import data_shapes
+from deephyper.search.nas.model.space.template import get_template
+from deephyper.search.nas.model.weights_store import get_store
 from deephyper.search.nas.model.trainer.classifier_train_valid import \
     TrainerClassifierTrainValid
 from deephyper.search.nas.model.trainer.regressor_train_valid import \
@@ -13,53 +19,76 @@ from deephyper.search.nas.model.trainer.regressor_train_valid import \
 logger = util.conf_logger('deephyper.search.nas.run')
 
 
+def set_seed(seed):
+    """Seed the random generators used by the training, replicas of a configuration (see ``deephyper.evaluator.replication``) are evaluated with different seeds."""
+    random.seed(seed)
+    np.random.seed(seed)
+    tf.set_random_seed(seed)
+
+
 def run(config):
+    if config.get('seed') is not None:
+        set_seed(config['seed'])
+
+    input_shape, output_shape = setup_data(config)
+
+    # the structure is created once per worker thread
+    structure = get_template(config['create_structure'], input_shape, output_shape)
+
+    arch_seq = config['arch_seq']
+
+    logger.info(f'actions list: {arch_seq}')
+
+    structure.set_ops(arch_seq)
+
+    setup_preprocessing(config)
+
+    weights_store = get_store(config)
+
+    trainer = create_trainer(config, structure, weights_store)
+
+    if trainer is not None:
+        num_epochs = None
+        if structure.num_inherited > 0:
+            # warm start with weights of trained architectures
+            num_epochs = config[a.hyperparameters].get(a.fine_tune_epochs)
+            logger.info(f'{structure.num_inherited} layers inherited weights')
+        result = trainer.train(num_epochs=num_epochs)
+        if weights_store is not None:
+            weights_store.save(structure)
+    else:
+        # penalising actions if model cannot be created
+        result = -1
+    return result
+
+
+def setup_data(config):
+    """Load the data of ``config['load_data']`` in ``config['data']``, once per worker.
+
+    Returns:
+        tuple: ``(input_shape, output_shape)`` of the data.
+    """
     # load functions
     load_data = util.load_attr_from(config['load_data']['func'])
     config['load_data']['func'] = load_data
     config['create_structure']['func'] = util.load_attr_from(
         config['create_structure']['func'])
 
-    # Loading data
+    # Loading data, once per worker
     kwargs = config['load_data'].get('kwargs')
-    data = load_data() if kwargs is None else load_data(**kwargs)
+    data = data_cache.cached(data_cache.make_key(load_data, kwargs),
+                             lambda: load_data() if kwargs is None else load_data(**kwargs))
     logger.info(f'Data loaded with kwargs: {kwargs}')
 
-    # Set data shape
-    if type(data) is tuple:
-        if len(data) != 2:
-            raise RuntimeError(
-                f'Loaded data are tuple, should ((training_input, training_output), (validation_input, validation_output)) but length=={len(data)}')
-        (t_X, t_y), (v_X, v_y) = data
-        if type(t_X) is np.ndarray and type(t_y) is np.ndarray and \
-                type(v_X) is np.ndarray and type(v_y) is np.ndarray:
-            input_shape = np.shape(t_X)[1:]
-        elif type(t_X) is list and type(t_y) is np.ndarray and \
-                type(v_X) is list and type(v_y) is np.ndarray:
-            # interested in shape of data not in length
-            input_shape = [np.shape(itX)[1:] for itX in t_X]
-        else:
-            raise RuntimeError(
-                f'Data returned by load_data function are of a wrong type: type(t_X)=={type(t_X)},  type(t_y)=={type(t_y)}, type(v_X)=={type(v_X)}, type(v_y)=={type(v_y)}')
-        output_shape = np.shape(t_y)[1:]
-        config['data'] = {
-            'train_X': t_X,
-            'train_Y': t_y,
-            'valid_X': v_X,
-            'valid_Y': v_y
-        }
-    elif type(data) is dict:
-        config['data'] = data
-        input_shape = [data['shapes'][0][f'input_{i}']
-                       for i in range(len(data['shapes'][0]))]
-        output_shape = data['shapes'][1]
-    else:
-        raise RuntimeError(
-            f'Data returned by load_data function are of an unsupported type: {type(data)}')
+    input_shape, output_shape, config['data'] = data_shapes(data)
 
     logger.info(f'input_shape: {input_shape}')
     logger.info(f'output_shape: {output_shape}')
+    return input_shape, output_shape
+
 
+def create_structure(config, input_shape, output_shape):
+    """Create a new structure with ``config['create_structure']``, its operations are not set."""
     cs_kwargs = config['create_structure'].get('kwargs')
     if cs_kwargs is None:
         structure = config['create_structure']['func'](
@@ -67,44 +96,38 @@ def run(config):
     else:
         structure = config['create_structure']['func'](
             input_shape, output_shape, **cs_kwargs)
+    return structure
 
-    arch_seq = config['arch_seq']
-
-    logger.info(f'actions list: {arch_seq}')
-
-    structure.set_ops(arch_seq)
 
+def setup_preprocessing(config):
     if config.get('preprocessing') is not None:
         preprocessing = util.load_attr_from(config['preprocessing']['func'])
         config['preprocessing']['func'] = preprocessing
     else:
         config['preprocessing'] = None
 
-    model_created = False
+
+def create_trainer(config, structure, weights_store=None):
+    """Create the model of a structure whose operations are set and its trainer.
+
+    Args:
+        weights_store (WeightsStore): layers of the model inherit trained weights from this store (see ``deephyper.search.nas.model.weights_store``).
+
+    Returns:
+        the trainer, ``None`` if the model cannot be created.
+    """
+    try:
+        if config['regression']:
+            model = structure.create_model(weights_store=weights_store)
+        else:
+            model = structure.create_model(activation='softmax',
+                                           weights_store=weights_store)
+    except:
+        logger.info('Error: Model creation failed...')
+        logger.info(traceback.format_exc())
+        return None
+
     if config['regression']:
-        try:
-            model = structure.create_model()
-            model_created = True
-        except:
-            model_created = False
-            logger.info('Error: Model creation failed...')
-            logger.info(traceback.format_exc())
-        if model_created:
-            trainer = TrainerRegressorTrainValid(config=config, model=model)
+        return TrainerRegressorTrainValid(config=config, model=model)
     else:
-        try:
-            model = structure.create_model(activation='softmax')
-            model_created = True
-        except:
-            model_created = False
-            logger.info('Error: Model creation failed...')
-            logger.info(traceback.format_exc())
-        if model_created:
-            trainer = TrainerClassifierTrainValid(config=config, model=model)
-
-    if model_created:
-        result = trainer.train()
-    else:
-        # penalising actions if model cannot be created
-        result = -1
-    return result
+        return TrainerClassifierTrainValid(config=config, model=model)
@@ -0,0 +1,128 @@
+"""One-shot evaluation of architectures with weight sharing.
+
+``supernet.run`` can replace ``alpha.run`` as run function of a NAS problem. Each worker keeps a supernet: the weights of every candidate operation of every node of the structure. The first evaluation of a worker trains the supernet during ``supernet_epochs`` epochs, each epoch trains ``supernet_paths`` random architectures (paths of the supernet) on a part of the training data with the shared weights. Then each architecture inherits the shared weights of its operations, is fine-tuned during ``fine_tune_epochs`` epochs (``0`` only evaluates it) and its validation objective is returned. Fine-tuned weights are not written back to the supernet.
+
+The hyperparameters of the problem can set ``supernet_epochs`` (default ``1``), ``supernet_paths`` (default ``10``) and ``fine_tune_epochs`` (default ``0``).
+
+The number of layers which inherited shared weights is counted in ``Evaluator.stats['supernet_inherited_layers']``.
+
+With the ``subprocess`` and ``balsam`` evaluators each evaluation is a new process and trains its own supernet.
+"""
+import random
+import threading
+
+from deephyper.evaluator.reporter import record
+from deephyper.search import util
+from deephyper.search.nas.model import arch as a
+from deephyper.search.nas.model import data_cache
+from deephyper.search.nas.model.run.alpha import (create_trainer, set_seed,
+                                                  setup_data,
+                                                  setup_preprocessing)
+from deephyper.search.nas.model.space.template import get_template
+
+logger = util.conf_logger('deephyper.search.nas.run.supernet')
+
+SUPERNET_EPOCHS = 1
+SUPERNET_PATHS = 10
+FINE_TUNE_EPOCHS = 0
+
+_supernets = {}  # (create_structure, load_data) --> Supernet
+_lock = threading.RLock()
+
+
+class Supernet:
+    """Shared weights of the candidate operations of a structure, keyed as ``KerasStructure.get_layers``."""
+
+    def __init__(self):
+        self.weights = {}
+        self.trained = False
+
+    def load(self, structure):
+        """Set the weights of the layers of the model of ``structure`` which have the same shapes as the shared weights.
+
+        Returns:
+            int: number of layers which inherited weights.
+        """
+        num_loaded = 0
+        for key, layer in structure.get_layers().items():
+            weights = self.weights.get(key)
+            if weights is not None and \
+                    [w.shape for w in weights] == [w.shape for w in layer.get_weights()]:
+                layer.set_weights(weights)
+                num_loaded += 1
+        return num_loaded
+
+    def save(self, structure):
+        for key, layer in structure.get_layers().items():
+            self.weights[key] = layer.get_weights()
+
+
+def get_supernet(config):
+    key = data_cache.make_key(config['create_structure']['func'],
+                              dict(create_structure=config['create_structure'].get('kwargs'),
+                                   load_data=config['load_data'].get('kwargs')),
+                              config['load_data']['func'])
+    with _lock:
+        if key not in _supernets:
+            _supernets[key] = Supernet()
+        return _supernets[key]
+
+
+def train_supernet(config, supernet, input_shape, output_shape):
+    hp = config[a.hyperparameters]
+    num_epochs = hp.get(a.supernet_epochs, SUPERNET_EPOCHS)
+    num_paths = hp.get(a.supernet_paths, SUPERNET_PATHS)
+
+    for epoch in range(num_epochs):
+        for _ in range(num_paths):
+            structure = get_template(config['create_structure'],
+                                     input_shape, output_shape)
+            structure.set_ops([random.random()
+                               for _ in range(structure.num_nodes)])
+            trainer = create_trainer(config, structure)
+            if trainer is None:
+                continue
+            supernet.load(structure)
+            # the paths of one epoch of the supernet share one pass over the training data
+            steps = max(1, trainer.train_steps_per_epoch // num_paths)
+            trainer.model.fit(trainer.dataset_train,
+                              epochs=1, steps_per_epoch=steps)
+            supernet.save(structure)
+        logger.info(f'supernet epoch {epoch} done')
+    supernet.trained = True
+
+
+def run(config):
+    if config.get('seed') is not None:
+        set_seed(config['seed'])
+
+    input_shape, output_shape = setup_data(config)
+    setup_preprocessing(config)
+
+    supernet = get_supernet(config)
+
+    arch_seq = config['arch_seq']
+
+    logger.info(f'actions list: {arch_seq}')
+
+    # one evaluation of the worker trains the supernet, the others wait for it
+    with _lock:
+        if not supernet.trained:
+            train_supernet(config, supernet, input_shape, output_shape)
+        # the template of the training paths: the layers have the same keys
+        structure = get_template(config['create_structure'],
+                                 input_shape, output_shape)
+        structure.set_ops(arch_seq)
+        trainer = create_trainer(config, structure)
+        if trainer is not None:
+            num_loaded = supernet.load(structure)
+            logger.info(f'{num_loaded} layers inherited shared weights')
+            record('supernet_inherited_layers', num_loaded)
+
+    if trainer is not None:
+        result = trainer.train(
+            num_epochs=config[a.hyperparameters].get(a.fine_tune_epochs, FINE_TUNE_EPOCHS))
+    else:
+        # penalising actions if model cannot be created
+        result = -1
+    return result
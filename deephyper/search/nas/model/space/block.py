@@ -1,5 +1,6 @@
 import networkx as nx
 
+from deephyper.search.nas.model.space.dag import creates_cycle
 from deephyper.search.nas.model.space.node import Node, VariableNode
 
 
@@ -31,6 +32,25 @@ class Block:
 
         return filter(lambda n: isinstance(n, VariableNode), self.nodes)
 
+    @property
+    def ordered_action_nodes(self):
+        """Return the list of VariableNodes in the order used by ``set_ops``: inputs, then nodes which are not inputs neither outputs, then outputs.
+
+        Returns:
+            list(VariableNode): list of VariableNodes of the current Block.
+        """
+
+        # nodes which are not inputs neither outputs
+        io_nodes = set(self.inputs) | set(self.outputs)
+        variable_mnodes = [n for n in self.nodes
+                           if n not in io_nodes and isinstance(n, VariableNode)]
+
+        variable_inputs = list(filter(lambda n: isinstance(n, VariableNode), self.inputs))
+        set_inputs = set(variable_inputs)
+        variable_ouputs = list(filter(lambda n: isinstance(n, VariableNode) and not n in set_inputs, self.outputs))
+
+        return variable_inputs + variable_mnodes + variable_ouputs
+
     @property
     def size(self):
         s = 0
@@ -64,39 +84,17 @@ class Block:
         """
 
 
-        # nodes which are not inputs neither outputs
-        mnodes = self.nodes
-        for n in self.outputs:
-            mnodes.remove(n)
-        for n in self.inputs:
-            if n in mnodes:
-                mnodes.remove(n)
-        variable_mnodes = list(filter(lambda n: isinstance(n, VariableNode),
-            mnodes))
-
-        variable_inputs = list(filter(lambda n: isinstance(n, VariableNode), self.inputs))
-        variable_ouputs = list(filter(lambda n: isinstance(n, VariableNode), self.outputs))
+        ordered_nodes = self.ordered_action_nodes
 
         # number of VariableNodes in current Block
-        nvariable_nodes =len(list(filter(lambda n: isinstance(n, VariableNode), self.nodes)))
+        nvariable_nodes = len(ordered_nodes)
 
         if len(indexes) != nvariable_nodes:
-            print(variable_inputs)
-            print(variable_mnodes)
-            print(variable_ouputs)
+            print(ordered_nodes)
             raise RuntimeError(f'len(indexes) == {len(indexes)} when it should be {nvariable_nodes}')
 
-        cursor = 0
-        for n in variable_inputs:
-            n.set_op(indexes[cursor])
-            cursor += 1
-        for n in variable_mnodes:
-            n.set_op(indexes[cursor])
-            cursor += 1
-        for n in variable_ouputs:
-            if not n in variable_inputs:
-                n.set_op(indexes[cursor])
-                cursor += 1
+        for n, index in zip(ordered_nodes, indexes):
+            n.set_op(index)
 
     def add_node(self, node):
         """Add a new node to the current Block.
@@ -111,7 +109,7 @@ class Block:
 
         if not isinstance(node, Node):
             raise RuntimeError(f'node argument should be an instance of Node!')
-        if node in self.nodes:
+        if node in self.graph:
             raise RuntimeError(f'Node: {node} has already been added to the Block!')
 
         self.graph.add_node(node)
@@ -134,12 +132,12 @@ class Block:
         assert isinstance(node1, Node)
         assert isinstance(node2, Node)
 
-        self.graph.add_edge(node1, node2)
-
-        if not(nx.is_directed_acyclic_graph(self.graph)):
-            self.graph.remove_edge(node1, node2)
+        # only the descendants of node2 are visited, not the whole graph
+        if creates_cycle(self.graph, node1, node2):
+            self.graph.add_nodes_from([node1, node2])
             return False
         else:
+            self.graph.add_edge(node1, node2)
             if node1 in self.outputs:
                 self.outputs.remove(node1)
             if node2 in self.inputs:
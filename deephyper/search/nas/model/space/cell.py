@@ -1,6 +1,6 @@
 import networkx as nx
 
-from deephyper.search.nas.model.space.node import Node, ConstantNode
+from deephyper.search.nas.model.space.node import Node, ConstantNode, next_num
 from deephyper.search.nas.model.space.block import Block
 from deephyper.search.nas.model.space.op.op1d import Concatenate
 
@@ -14,13 +14,14 @@ class Cell:
     num = 0
 
     def __init__(self, inputs=None):
-        Cell.num += 1
-        self.num = Cell.num
+        self.num = next_num(Cell)
         self.inputs = inputs if not inputs is None else []
         self.output = None
         self.blocks = []
         self.graph = nx.DiGraph()
         self.graph.add_nodes_from(inputs)
+        self._blocks_merged = False
+        self._static_edges = None  # edges which do not depend on the operations
 
     @property
     def size(self):
@@ -58,6 +59,19 @@ class Cell:
             var_nodes.extend(b.action_nodes)
         return var_nodes
 
+    @property
+    def ordered_action_nodes(self):
+        """Return the list of VariableNodes of current Cell in the order used by ``set_ops``.
+
+        Returns:
+            list(VariableNode): list of VariableNodes of current Cell.
+        """
+
+        var_nodes = []
+        for b in self.blocks:
+            var_nodes.extend(b.ordered_action_nodes)
+        return var_nodes
+
     def set_outputs(self, node=None):
         """Set output node of the current cell.
             node (Node, optional): Defaults to None will create a Concatenation node for the last axis.
@@ -104,11 +118,27 @@ class Cell:
         return max(map(lambda b: b.max_num_ops(), self.blocks))
 
     def set_ops(self, indexes):
+        if self._static_edges is None:
+            self._static_edges = set(self.graph.edges())
         cursor = 0
         for b in self.blocks:
             num_nodes = b.num_nodes()
             b.set_ops(indexes[cursor:cursor+num_nodes])
             cursor += num_nodes
 
-            self.graph.add_nodes_from(b.graph.nodes())
-            self.graph.add_edges_from(b.graph.edges())
+            # the graphs of the blocks do not depend on the operations, they are copied once
+            if not self._blocks_merged:
+                self.graph.add_nodes_from(b.graph.nodes())
+                self.graph.add_edges_from(b.graph.edges())
+                self._static_edges.update(b.graph.edges())
+        self._blocks_merged = True
+
+    def reset_ops(self):
+        """Remove the operations set by ``set_ops`` and the edges they created.
+        """
+        for n in self.action_nodes:
+            n._index = None
+        if self._static_edges is not None:
+            self.graph.remove_edges_from(
+                [e for e in self.graph.edges() if e not in self._static_edges])
+
@@ -0,0 +1,231 @@
+"""Static cost model of a configured structure.
+
+The shapes of the tensors are propagated through the graph of a ``KerasStructure`` whose operations are set (see ``KerasStructure.set_ops``), without creating the Keras model, to count the number of parameters, the number of floating point operations of a forward pass (multiply-adds count for 2) and the peak memory of the activations of a forward pass (``float32``). Shapes, FLOPs and memory are per sample, the batch dimension is not included.
+
+Rules are registered by name of operation class for the operations of ``deephyper.search.nas.model.space.op`` which are used by 1D search spaces, a new operation can be supported with :func:`register`. The cost of a structure using an operation without rule cannot be estimated.
+"""
+from functools import reduce
+
+BYTES_PER_VALUE = 4  # float32
+
+RULES = {}  # name of Operation class --> rule
+
+
+class ShapeError(ValueError):
+    """Raised when the inputs of an operation have incompatible shapes."""
+
+
+class UnknownOperationError(ValueError):
+    """Raised when an operation has no rule."""
+
+
+def register(name):
+    """Register the rule of an operation class.
+
+    A rule takes ``(op, input_shapes)``, where ``input_shapes`` is a list of tuples, and returns ``(output_shape, params, flops)``.
+
+    Args:
+        name (str): name of the operation class.
+    """
+    def decorator(rule):
+        RULES[name] = rule
+        return rule
+    return decorator
+
+
+def size(shape):
+    return reduce(lambda a, b: a * b, shape, 1)
+
+
+def _single_input(op, input_shapes):
+    if len(input_shapes) != 1:
+        raise ShapeError(
+            f'{type(op).__name__} has {len(input_shapes)} inputs when 1 is required.')
+    return input_shapes[0]
+
+
+def _as_sequence(shape):
+    # 1D operations reshape (n,) inputs to (n, 1)
+    if len(shape) > 2:
+        raise ShapeError(
+            f'1D operations take 2D or 3D tensors only when a {len(shape)+1}D is passed!')
+    return (shape[0], 1) if len(shape) == 1 else shape
+
+
+def _pooled_length(length, window, strides, padding):
+    if padding.lower() == 'same':
+        return -(-length // strides)
+    out = -(-(length - window + 1) // strides)
+    if out <= 0:
+        raise ShapeError(
+            f'window of size {window} is larger than the input of length {length}.')
+    return out
+
+
+@register('Identity')
+@register('Dropout')
+def _identity(op, input_shapes):
+    return _single_input(op, input_shapes), 0, 0
+
+
+@register('Activation')
+def _activation(op, input_shapes):
+    shape = _single_input(op, input_shapes)
+    return shape, 0, size(shape)
+
+
+@register('Dense')
+def _dense(op, input_shapes):
+    shape = _single_input(op, input_shapes)
+    use_bias = op.kwargs.get('use_bias', True)
+    params = shape[-1] * op.units + (op.units if use_bias else 0)
+    flops = 2 * size(shape) * op.units
+    if op.activation is not None:
+        flops += size(shape[:-1]) * op.units
+    return (*shape[:-1], op.units), params, flops
+
+
+@register('Conv1D')
+def _conv1d(op, input_shapes):
+    length, channels = _as_sequence(_single_input(op, input_shapes))
+    out_length = _pooled_length(length, op.filter_size, op.strides, op.padding)
+    params = op.filter_size * channels * op.num_filters + op.num_filters
+    flops = 2 * op.filter_size * channels * op.num_filters * out_length
+    return (out_length, op.num_filters), params, flops
+
+
+@register('MaxPooling1D')
+def _max_pooling1d(op, input_shapes):
+    length, channels = _as_sequence(_single_input(op, input_shapes))
+    out_length = _pooled_length(length, op.pool_size, op.strides, op.padding)
+    return (out_length, channels), 0, op.pool_size * channels * out_length
+
+
+@register('Flatten')
+def _flatten(op, input_shapes):
+    return (size(_single_input(op, input_shapes)),), 0, 0
+
+
+@register('Concatenate')
+def _concatenate(op, input_shapes):
+    if len(input_shapes) == 1:
+        return input_shapes[0], 0, 0
+    ndim = max(len(shp) for shp in input_shapes)
+    if ndim > 2:
+        raise ShapeError(
+            f'This concatenation is for 2D or 3D tensors only when a {ndim+1}D is passed!')
+    if not all(len(shp) in (ndim, ndim-1) for shp in input_shapes):
+        raise ShapeError(
+            f'All inputs of concatenation operation should have same shape length: {input_shapes}')
+    # 2D tensors are expanded when mixed with 3D tensors, then padded along the first dimension
+    shapes = [shp if len(shp) == ndim else (*shp, 1) for shp in input_shapes]
+    out_shape = (*tuple(max(shp[i] for shp in shapes) for i in range(ndim-1)),
+                 sum(shp[-1] for shp in shapes))
+    return out_shape, 0, 0
+
+
+@register('AddByPadding')
+def _add_by_padding(op, input_shapes):
+    if len(input_shapes) == 1:
+        return input_shapes[0], 0, 0
+    ndim = max(len(shp) for shp in input_shapes)
+    shapes = [(*shp, *(1 for _ in range(ndim - len(shp))))
+              for shp in input_shapes]
+    out_shape = tuple(max(shp[i] for shp in shapes) for i in range(ndim))
+    return out_shape, 0, size(out_shape) * (len(shapes) - 1)
+
+
+def get_rule(op):
+    for cls in type(op).__mro__:
+        if cls.__name__ in RULES:
+            return RULES[cls.__name__]
+    raise UnknownOperationError(
+        f'no cost rule for operation {type(op).__name__}')
+
+
+def estimate(structure):
+    """Estimate the cost of a structure whose operations are set.
+
+    Args:
+        structure (KerasStructure): the structure.
+
+    Returns:
+        dict: ``params``, ``flops``, ``activation_memory`` (peak, in bytes), ``output_shape`` and ``ops``, the list of ``(node name, operation, output_shape, params, flops)`` in execution order.
+
+    Raises:
+        ShapeError: if the inputs of an operation have incompatible shapes, or if an operation has no input.
+        UnknownOperationError: if an operation has no rule.
+    """
+    output_node = structure.output_node
+    if output_node is None:
+        raise RuntimeError(
+            "Can't estimate the cost of a structure before setting the operations with set_ops.")
+    input_shapes = {n: tuple(shp) for n, shp in
+                    zip(structure.input_nodes, structure.input_shapes)}
+
+    # only the ancestors of the output node are created by create_model
+    table = structure.node_table
+    order = [n for n, _ in table]
+
+    shapes = {}  # node --> shapes of the tensors returned by the node
+    owners = {}  # node --> nodes which created the tensors returned by the node
+    last_use = {}  # node --> index in order of the last node using its tensor
+    layers = set()
+    params = flops = 0
+    ops = []
+    for i, (n, preds) in enumerate(table):
+        in_shapes = [shp for p in preds for shp in shapes[p]]
+        in_owners = [o for p in preds for o in owners[p]]
+        for o in in_owners:
+            last_use[o] = i
+        op = n.op
+        type_name = type(op).__name__
+        if n in input_shapes:
+            shapes[n], owners[n] = [input_shapes[n]], [n]
+            continue
+        if type_name == 'Connect':
+            shapes[n], owners[n] = in_shapes, in_owners
+            continue
+        if not in_shapes:
+            raise ShapeError(f'{n.name} has no input.')
+        out_shape, n_params, n_flops = get_rule(op)(op, in_shapes)
+        out_shape = tuple(out_shape)
+        shapes[n] = [out_shape]
+        if type_name == 'Identity' or (type_name == 'Dropout' and op.rate == 0) or \
+                (len(in_shapes) == 1 and type_name in ('Concatenate', 'AddByPadding')):
+            owners[n] = in_owners  # the input tensor is returned, see KerasStructure.create_model
+        else:
+            owners[n] = [n]
+        # layers reused by MirrorNodes have their parameters once
+        if id(op) not in layers:
+            layers.add(id(op))
+            params += n_params
+        flops += n_flops
+        ops.append((n.name, str(op), out_shape, n_params, n_flops))
+
+    if len(shapes[output_node]) != 1:
+        raise ShapeError('the output node of the structure returns several tensors.')
+    # the output tensors are used by the output layer of create_model
+    for o in owners[output_node]:
+        last_use[o] = len(order)
+
+    memory = peak = 0
+    for i, (n, preds) in enumerate(table):
+        if owners[n] == [n]:
+            memory += size(shapes[n][0]) * BYTES_PER_VALUE
+            peak = max(peak, memory)
+        for p in set(o for q in preds for o in owners[q]):
+            if last_use.get(p) == i:
+                memory -= size(shapes[p][0]) * BYTES_PER_VALUE
+
+    # output layer of create_model
+    num_features = size(shapes[output_node][0])
+    units = structure.output_shape[0]
+    params += num_features * units + units
+    flops += 2 * num_features * units
+    peak = max(peak, memory + units * BYTES_PER_VALUE)
+    ops.append(('Structure_Output_Dense', f'Dense_{units}', (units,),
+                num_features * units + units, 2 * num_features * units))
+
+    return dict(params=params, flops=flops, activation_memory=peak,
+                output_shape=(units,), ops=ops)
@@ -0,0 +1,59 @@
+"""Graph utilities for the directed acyclic graphs of structures.
+
+Checking that an edge ``u -> v`` keeps a graph acyclic only requires to know if ``u`` can be reached from ``v``, which visits the descendants of ``v`` instead of the whole graph. The nodes used to compute a node are compiled once in a table in topological order, which replaces recursive walks of the graph.
+"""
+import networkx as nx
+
+
+def creates_cycle(graph, node1, node2):
+    """Check if the edge ``node1 -> node2`` would create a cycle in an acyclic graph.
+
+    Args:
+        graph (nx.DiGraph): an acyclic graph.
+        node1 (Node): starting node of the edge.
+        node2 (Node): arrival node of the edge.
+
+    Returns:
+        bool: True if the edge would create a cycle.
+    """
+    if node1 is node2:
+        return True
+    if node1 not in graph or node2 not in graph:
+        return False
+    return nx.has_path(graph, node2, node1)
+
+
+def compile_graph(graph, node):
+    """Table of the ancestors of ``node`` in topological order.
+
+    Args:
+        graph (nx.DiGraph): a graph.
+        node (Node): the last node of the table.
+
+    Returns:
+        list(tuple): ``(node, predecessors)`` pairs, where ``predecessors`` is the list of predecessors of the node in the order of ``graph.predecessors``, they come before it in the table.
+
+    Raises:
+        nx.NetworkXUnfeasible: if the ancestors of ``node`` contain a cycle.
+    """
+    table = []
+    done, visiting = set(), {node}
+    stack = [(node, list(graph.predecessors(node)), 0)]
+    while stack:
+        n, preds, i = stack[-1]
+        # next predecessor which is not in the table yet
+        while i < len(preds) and preds[i] in done:
+            i += 1
+        if i < len(preds):
+            p = preds[i]
+            if p in visiting:
+                raise nx.NetworkXUnfeasible(f'the graph contains a cycle through {p}.')
+            stack[-1] = (n, preds, i + 1)
+            visiting.add(p)
+            stack.append((p, list(graph.predecessors(p)), 0))
+        else:
+            stack.pop()
+            visiting.remove(n)
+            done.add(n)
+            table.append((n, preds))
+    return table
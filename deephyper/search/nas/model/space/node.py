@@ -1,3 +1,51 @@
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+_local = threading.local()  # counters of the thread in a local_numbering context
+_num_lock = threading.Lock()
+
+
+@contextmanager
+def local_numbering():
+    """Number the nodes and the cells created in this context by this thread from 1, with counters of the context instead of the global counters ``Node.num`` and ``Cell.num``."""
+    previous = getattr(_local, 'counters', None)
+    _local.counters = {}
+    try:
+        yield
+    finally:
+        _local.counters = previous
+
+
+def next_num(cls):
+    """Next id of the nodes (``cls=Node``) or of the cells (``cls=Cell``)."""
+    counters = getattr(_local, 'counters', None)
+    if counters is not None:
+        counters[cls] = counters.get(cls, 0) + 1
+        return counters[cls]
+    with _num_lock:
+        cls.num += 1
+        return cls.num
+
+
+def op_indexes(indexes, num_ops):
+    """Convert the actions of VariableNodes to the indexes of their operations, vectorized version of ``VariableNode.get_op``.
+
+    Args:
+        indexes (list): one action per node, a float in [0, 1] or an int.
+        num_ops (list(int)): number of operations of each node.
+
+    Returns:
+        list(int): the index of the operation of each node.
+    """
+    is_float = np.array([not isinstance(i, (int, np.integer)) for i in indexes], dtype=bool)
+    values = np.asarray(indexes, dtype=np.float64)
+    num_ops = np.asarray(num_ops, dtype=np.float64)
+    # same arithmetic as VariableNode.get_op for floats
+    from_float = np.floor(np.floor((values * (num_ops - 1) + 0.5) * 10) / 10)
+    return np.where(is_float, from_float, values).astype(int).tolist()
+
 
 class Node:
     """This class represents a node of a graph
@@ -10,8 +58,7 @@ class Node:
     num = 0
 
     def __init__(self, name='', *args, **kwargs):
-        Node.num += 1
-        self._num = Node.num
+        self._num = next_num(Node)
         self._tensor = None
         self.name = name
 
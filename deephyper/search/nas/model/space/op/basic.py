@@ -22,6 +22,12 @@ class Operation:
         """Preprocess the current operation.
         """
 
+    def reset(self):
+        """Forget the layers created by the operation, the next call creates new layers.
+        """
+        if hasattr(self, '_layer'):
+            self._layer = None
+
 
 class Tensor(Operation):
     def __init__(self, tensor, *args, **kwargs):
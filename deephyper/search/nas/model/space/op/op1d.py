@@ -44,6 +44,8 @@ class Concatenate(Operation):
                     max_len = max(map(lambda x: int(x.get_shape()[1]), values))
                     paddings = map(lambda x: max_len - int(x.get_shape()[1]), values)
                     for i, (p, v) in enumerate(zip(paddings, values)):
+                        if p == 0: # no padding layer for tensors of the maximum length
+                            continue
                         lp = p // 2
                         rp = p - lp
                         values[i] = keras.layers.ZeroPadding1D(padding=(lp, rp))(v)
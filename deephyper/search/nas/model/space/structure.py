@@ -1,12 +1,16 @@
+import hashlib
+
 import networkx as nx
 from tensorflow import keras
 from tensorflow.python.keras.utils.vis_utils import model_to_dot
 
+from deephyper.search.nas.model.space import cost
 from deephyper.search.nas.model.space.cell import Cell
 from deephyper.search.nas.model.space.block import Block
-from deephyper.search.nas.model.space.node import Node, ConstantNode
-from deephyper.search.nas.model.space.op.basic import Connect, Tensor
-from deephyper.search.nas.model.space.op.op1d import Concatenate, Identity
+from deephyper.search.nas.model.space.dag import compile_graph
+from deephyper.search.nas.model.space.node import Node, ConstantNode, MirrorNode, VariableNode, op_indexes
+from deephyper.search.nas.model.space.op.basic import AddByPadding, Connect, Tensor
+from deephyper.search.nas.model.space.op.op1d import Concatenate, Dropout, Identity
 
 
 class Structure:
@@ -41,6 +45,7 @@ class KerasStructure(Structure):
             # we have only one input tensor here
             op = Tensor(keras.layers.Input(input_shape, name="input_0"))
             self.input_nodes = [ConstantNode(op=op, name='Input_0')]
+            self.input_shapes = [input_shape]
 
         elif type(input_shape) is list and all(map(lambda x: type(x) is tuple, input_shape)):
             # we have a list of input tensors here
@@ -50,12 +55,15 @@ class KerasStructure(Structure):
                     input_shape[i], name=f"input_{i}"))
                 inode = ConstantNode(op=op, name=f'Input_{i}')
                 self.input_nodes.append(inode)
+            self.input_shapes = list(input_shape)
         else:
             raise RuntimeError(
                 f"input_shape must be either of type 'tuple' or 'list(tuple)' but is of type '{type(input_shape)}'!")
 
         self.__output_shape = output_shape
         self.output_node = None
+        self._structure_output = ConstantNode(name='Structure_Output')
+        self._node_table = None
         self.output_op = Concatenate if output_op is None else output_op
 
         self.struct = []
@@ -63,6 +71,9 @@ class KerasStructure(Structure):
         self.map_sh2int = {}
 
         self._model = None
+        self._output_layer = None
+        self._tensors_created = False  # create_model was called, even if it failed
+        self.num_inherited = 0
 
     def __len__(self):
         """Number of cells of the structure.
@@ -90,6 +101,10 @@ class KerasStructure(Structure):
                     s *= c_s
         return s
 
+    @property
+    def output_shape(self):
+        return self.__output_shape
+
     @property
     def depth(self):
         if self._model is None:
@@ -125,6 +140,31 @@ class KerasStructure(Structure):
 
         return sum([c.num_nodes for c in self.struct] + [0])
 
+    @property
+    def num_ops_per_node(self):
+        """Returns the number of operations of each VariableNode, in the order of ``arch_seq``.
+
+        Returns:
+            list(int): number of operations of each VariableNode of the current Structure.
+        """
+        return [n.num_ops for c in self.struct for n in c.ordered_action_nodes]
+
+    def decode_ops(self, indexes):
+        """Convert an ``arch_seq`` to the indexes of the operations of the VariableNodes without setting them.
+
+        Different ``arch_seq`` (e.g. ``0.31`` and ``0.33`` for a node with 3 operations) set the same operations, they have the same decoded indexes.
+
+        Args:
+            indexes (list): element of list can be float in [0, 1] or int.
+
+        Returns:
+            list(int): the index of the operation of each VariableNode.
+        """
+        num_ops = self.num_ops_per_node
+        if len(indexes) < len(num_ops):
+            raise ValueError(f'arch_seq of length {len(indexes)} for {len(num_ops)} VariableNodes')
+        return op_indexes(indexes[:len(num_ops)], num_ops)
+
     def num_nodes_cell(self, i=None):
         """Returns the number of VariableNodes in Cells.
         Args:
@@ -188,6 +228,9 @@ class KerasStructure(Structure):
             indexes (list): element of list can be float in [0, 1] or int.
             output_node (ConstantNode): the output node of the Structure.
         """
+        if self.output_node is not None:
+            self.reset_ops()
+
         cursor = 0
         for c in self.struct:
             num_nodes = c.num_nodes
@@ -198,37 +241,211 @@ class KerasStructure(Structure):
             self.graph.add_edges_from(c.graph.edges())
 
         output_nodes = get_output_nodes(self.graph)
+        node = self._structure_output
         if len(output_nodes) == 1:
-            node = ConstantNode(op=Identity(), name='Structure_Output')
+            node.set_op(Identity())
             self.graph.add_node(node)
             self.graph.add_edge(output_nodes[0], node)
         else:
-            node = ConstantNode(name='Structure_Output')
             node.set_op(self.output_op(self.graph, node, output_nodes))
         self.output_node = node
+        self._node_table = None
+
+    def reset_ops(self):
+        """Remove the operations set by ``set_ops``, the structure can then be configured with another ``arch_seq`` without creating new nodes.
+
+        The tensors and the layers of a created model are forgotten, also when ``create_model`` failed, a new model does not share them.
+        """
+        for n in self.graph.nodes():
+            n._tensor = None
+            ops = n.ops if isinstance(n, VariableNode) else [n.op]
+            for op in ops:
+                if hasattr(op, 'reset'):
+                    op.reset()
+        if self._tensors_created:
+            for i, inode in enumerate(self.input_nodes):
+                inode.op.tensor = keras.layers.Input(
+                    self.input_shapes[i], name=f'input_{i}')
+            self._tensors_created = False
+        for c in self.struct:
+            c.reset_ops()
+        self.graph.clear()
+        self.output_node = None
+        self._node_table = None
+        self._model = None
+        self._output_layer = None
+        self.num_inherited = 0
+
+    @property
+    def node_table(self):
+        """Nodes computing the output of the network defined by the operations set with ``set_ops``, compiled once per ``set_ops``.
+
+        Returns:
+            list(tuple): ``(node, predecessors)`` pairs in topological order, see ``deephyper.search.nas.model.space.dag.compile_graph``.
+        """
+        if self.output_node is None:
+            raise RuntimeError(
+                "Can't compile the graph before setting the operations with set_ops.")
+        if self._node_table is None:
+            self._node_table = compile_graph(self.graph, self.output_node)
+        return self._node_table
+
+    def functional_graph(self):
+        """Op-labelled graph of the network defined by the operations set with ``set_ops``, without creating the model.
+
+        Nodes which are not ancestors of the output node are pruned. Pass-through nodes (``Connect``, ``Identity``, ``Dropout(0.)`` and merge operations with one input) are removed, their predecessors are connected to their successors. Each node has a ``label`` attribute.
+
+        Returns:
+            nx.DiGraph: the functional graph.
+        """
+        if self.output_node is None:
+            raise RuntimeError(
+                "Can't compute the functional graph before setting the operations with set_ops.")
+
+        order = [n for n, _ in self.node_table]
+        graph = nx.DiGraph(self.graph.subgraph(order))
+
+        for n in graph.nodes:
+            graph.nodes[n]['label'] = node_label(n)
+        graph.nodes[self.output_node]['label'] = 'Structure_Output'
+
+        # removing a node keeps the order topological
+        for n in order:
+            preds = list(graph.predecessors(n))
+            succs = list(graph.successors(n))
+            if n is self.output_node or not passes_input(n, len(preds)):
+                continue
+            # a node receiving twice the same input is not equivalent to a node receiving it once
+            if any(graph.has_edge(p, s) for p in preds for s in succs):
+                graph.nodes[n]['label'] = 'Identity'
+                continue
+            graph.remove_node(n)
+            graph.add_edges_from((p, s) for p in preds for s in succs)
+        return graph
+
+    def fingerprint(self):
+        """Hash of the functional graph (see ``functional_graph``), structures building the same network have the same fingerprint.
+
+        The hash of a node combines its label, its number of successors and the sorted hashes of its predecessors, so the order of the inputs of a node (e.g. ``Concatenate``) is ignored.
+
+        Returns:
+            str: the fingerprint.
+        """
+        return self._node_hashes()[self.output_node]
+
+    def _node_hashes(self):
+        graph = self.functional_graph()
+        hashes = {}
+        for n in (n for n, _ in self.node_table if n in graph):
+            h = hashlib.sha1()
+            h.update(f'{graph.nodes[n]["label"]}|'.encode())
+            h.update(f'{graph.out_degree(n)}|'.encode())
+            for ph in sorted(hashes[p] for p in graph.predecessors(n)):
+                h.update(ph.encode())
+            hashes[n] = h.hexdigest()
+        return hashes
+
+    def estimate_cost(self):
+        """Estimate the number of parameters, FLOPs and peak activation memory of the model without creating it, see ``deephyper.search.nas.model.space.cost.estimate``.
 
-    def create_model(self, activation=None):
+        Returns:
+            dict: the cost.
+        """
+        return cost.estimate(self)
+
+    def create_model(self, activation=None, weights_store=None):
         """Create the tensors corresponding to the structure.
 
+        Only the nodes computing the output are created (see ``node_table``), and the nodes which return their inputs are fused with the nodes creating them (see ``fuse_table``). These nodes do not create Keras layers, so the network computes the same function with fewer layers.
+
         Args:
             train (bool): True if the network is built for training, False if the network is built for validation/testing (for example False will deactivate Dropout).
+            weights_store (WeightsStore): layers of the new model inherit the weights of the layers of trained models with the same signature (see ``get_layer_signatures``), the number of inheriting layers is ``self.num_inherited``.
 
         Returns:
             The output tensor.
         """
 
-        output_tensor = create_tensor_aux(self.graph, self.output_node)
+        table, sources = fuse_table(self.node_table)
+        self._tensors_created = True
+        create_tensors(table)
+        for n, _ in self.node_table:
+            if sources[n] != [n]:
+                tensors = [s._tensor for s in sources[n]]
+                n._tensor = tensors if isinstance(n.op, Connect) else tensors[0]
+        output_tensor = self.output_node._tensor
         if len(output_tensor.get_shape()) > 2:
             output_tensor = keras.layers.Flatten()(output_tensor)
-        output_tensor = keras.layers.Dense(
-            self.__output_shape[0], activation=activation)(output_tensor)
+        self._output_layer = keras.layers.Dense(
+            self.__output_shape[0], activation=activation)
+        output_tensor = self._output_layer(output_tensor)
 
         input_tensors = [inode._tensor for inode in self.input_nodes]
 
         self._model = keras.Model(inputs=input_tensors, outputs=output_tensor)
 
+        if weights_store is not None:
+            self.num_inherited = weights_store.load(self)
+
         return keras.Model(inputs=input_tensors, outputs=output_tensor)
 
+    @property
+    def block_nodes(self):
+        """Nodes of the blocks of the cells, the order does not depend on the operations set.
+
+        Returns:
+            list(Node): the nodes, structures created by the same function with the same arguments have the same order.
+        """
+        return [n for c in self.struct for b in c.blocks for n in b.nodes]
+
+    def _node_layers(self):
+        if self._model is None:
+            raise RuntimeError(
+                "Can't get the layers of the model without creating a model.")
+        node_layers, seen = [], set()
+        # the node which created a layer comes before the nodes which pass its tensor
+        for n, _ in self.node_table:
+            tensor = n._tensor
+            if tensor is None or type(tensor) is list:
+                continue
+            layer = getattr(tensor, '_keras_history', [None])[0]
+            if layer is None or id(layer) in seen:
+                continue
+            seen.add(id(layer))
+            if layer.weights:
+                node_layers.append((n, layer))
+        return node_layers
+
+    def get_layers(self):
+        """Keras layers with weights of the model created by ``create_model``.
+
+        Returns:
+            dict: ``(position, str(op))`` --> layer, where ``position`` is the index of the node in ``block_nodes``, and ``'output'`` --> the last Dense layer.
+        """
+        positions = {n: i for i, n in enumerate(self.block_nodes)}
+        layers = {(positions[n], str(n.op)): layer
+                  for n, layer in self._node_layers() if n in positions}
+        layers['output'] = self._output_layer
+        return layers
+
+    def get_layer_signatures(self):
+        """Keras layers with weights of the model created by ``create_model``, keyed by signature.
+
+        The signature of a layer is the hash of its operation and of the signatures of its inputs, in the order of the input tensors of the layer (e.g. the order of a ``Concatenate``), pass-through nodes are skipped (see ``fuse_table``). Layers of different models with the same signature apply the same operation to the same inputs. Unlike ``fingerprint``, the signatures depend on the order of the inputs: the weights of a layer after ``Concatenate([a, b])`` do not fit ``Concatenate([b, a])``.
+
+        Returns:
+            dict: signature --> layer.
+        """
+        table, sources = fuse_table(self.node_table)
+        hashes = {}
+        for n, inputs in table:
+            hashes[n] = _signature(node_label(n), (hashes[s] for s in inputs))
+        layers = {hashes[n]: layer
+                  for n, layer in self._node_layers() if n in hashes}
+        output = _signature('Structure_Output', (hashes[s] for s in sources[self.output_node]))
+        layers[f'output_{output}'] = self._output_layer
+        return layers
+
     def get_hash(self, node_index, index):
         """Get the hash representation of a given operation for this structure.
 
@@ -268,8 +485,74 @@ def get_output_nodes(graph):
     return output_nodes
 
 
+def _signature(label, input_signatures):
+    h = hashlib.sha1()
+    h.update(f'{label}|'.encode())
+    for sig in input_signatures:
+        h.update(sig.encode())
+    return h.hexdigest()
+
+
+def node_label(node):
+    """Label of a node in a functional graph.
+
+    Args:
+        node (Node): a node with a set operation.
+
+    Returns:
+        str: the label, ``None`` for ``Connect`` nodes and ``'Identity'`` for nodes which return their single input.
+    """
+    op = node.op
+    if isinstance(op, Tensor):
+        return node.name
+    if isinstance(op, Connect):
+        return None
+    if isinstance(op, Identity) or (isinstance(op, Dropout) and op.rate == 0):
+        return 'Identity'
+    if isinstance(node, MirrorNode):
+        return f'Mirror_{op}'
+    return str(op)
+
+
+def passes_input(node, num_inputs):
+    """Check if a node returns its inputs without creating a layer.
+
+    Args:
+        node (Node): a node with a set operation.
+        num_inputs (int): number of inputs of the node.
+
+    Returns:
+        bool: True for ``Connect`` nodes, and for ``Identity``, ``Dropout(0.)`` and merge operations with one input.
+    """
+    if isinstance(node.op, Connect):
+        return True
+    if num_inputs != 1:
+        return False
+    return node_label(node) == 'Identity' or isinstance(node.op, (Concatenate, AddByPadding))
+
+
+def fuse_table(table):
+    """Remove the nodes which return their inputs from a compiled graph.
+
+    Args:
+        table (list(tuple)): ``(node, predecessors)`` pairs in topological order (see ``deephyper.search.nas.model.space.dag.compile_graph``).
+
+    Returns:
+        tuple: the table of the nodes creating tensors, where the predecessors are replaced by the nodes creating their input tensors, and a dict node --> nodes creating the tensors returned by the node.
+    """
+    fused, sources = [], {}
+    for n, pred in table:
+        inputs = [s for p in pred for s in sources[p]]
+        if len(pred) > 0 and passes_input(n, len(inputs)):
+            sources[n] = inputs
+        else:
+            sources[n] = [n]
+            fused.append((n, inputs))
+    return fused, sources
+
+
 def create_tensor_aux(g, n, train=None):
-    """Recursive function to create the tensors from the graph.
+    """Create the tensors from the graph.
 
     Args:
         g (nx.DiGraph): a graph
@@ -279,20 +562,31 @@ def create_tensor_aux(g, n, train=None):
     Return:
         the tensor represented by n.
     """
+    return create_tensors(compile_graph(g, n), train=train)
+
+
+def create_tensors(table, train=None):
+    """Create the tensors of the nodes of a compiled graph, without recursion.
 
-    if n._tensor != None:
-        output_tensor = n._tensor
-    else:
-        pred = list(g.predecessors(n))
+    Args:
+        table (list(tuple)): ``(node, predecessors)`` pairs in topological order (see ``deephyper.search.nas.model.space.dag.compile_graph``).
+        train (bool): True if the network is built for training, False if the network is built for validation/testing (for example False will deactivate Dropout).
+
+    Return:
+        the tensor represented by the last node of the table.
+    """
+    for n, pred in table:
+        if n._tensor is not None:
+            continue
         if len(pred) == 0:
-            output_tensor = n.create_tensor(train=train)
+            n.create_tensor(train=train)
         else:
             tensor_list = list()
             for s_i in pred:
-                tmp = create_tensor_aux(g, s_i, train=train)
+                tmp = s_i._tensor
                 if type(tmp) is list:
                     tensor_list.extend(tmp)
                 else:
                     tensor_list.append(tmp)
-            output_tensor = n.create_tensor(tensor_list, train=train)
-    return output_tensor
+            n.create_tensor(tensor_list, train=train)
+    return table[-1][0]._tensor
@@ -0,0 +1,34 @@
+"""Reusable structures.
+
+Each node and each cell is numbered by the global counters ``Node.num`` and ``Cell.num``, so the ids of the nodes of a new structure (used by ``str(Connect)`` and ``KerasStructure.map_sh2int``) depend on the structures created before in the process. A template is a structure created once per process and thread, its nodes and cells are numbered from 1 by counters of the thread (see ``node.local_numbering``), so a template has the same ids in every process and the structures created at the same time by other threads keep unique ids. ``KerasStructure.set_ops`` resets the operations of a configured structure (see ``KerasStructure.reset_ops``), the template is then configured for another ``arch_seq`` without allocating new nodes.
+
+The templates are used by the master to compute the keys (``deephyper.search.nas.utils.arch_key``) and to validate the architectures (``deephyper.search.nas.utils.arch_filter``), and by the workers executing several evaluations (``run.alpha``).
+"""
+import threading
+
+from deephyper.search import util
+from deephyper.search.nas.model import data_cache
+from deephyper.search.nas.model.space.node import local_numbering
+
+_local = threading.local()  # templates of the thread
+
+
+def get_template(create_structure, *args):
+    """The template of the structure created by ``create_structure['func'](*args, **create_structure['kwargs'])``, it is created on the first call of the thread.
+
+    Args:
+        create_structure (dict): ``{'func': callable, 'kwargs': dict}`` as in ``Problem.space['create_structure']``.
+        args: positional arguments of the function, e.g. ``input_shape`` and ``output_shape``.
+
+    Returns:
+        KerasStructure: the template, it is shared by the calls of the thread with the same arguments.
+    """
+    if not hasattr(_local, 'templates'):
+        _local.templates = {}
+    func = util.load_attr_from(create_structure['func'])
+    kwargs = create_structure.get('kwargs')
+    key = data_cache.make_key(func, dict(args=args, kwargs=kwargs))
+    if key not in _local.templates:
+        with local_numbering():
+            _local.templates[key] = func(*args, **(kwargs or {}))
+    return _local.templates[key]
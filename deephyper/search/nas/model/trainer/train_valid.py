@@ -6,7 +6,9 @@ from sklearn.metrics import mean_squared_error
 
 import deephyper.search.nas.model.arch as a
 import deephyper.search.nas.model.train_utils as U
+from deephyper.evaluator.reporter import report
 from deephyper.search import util
+from deephyper.search.nas.model import data_cache
 from deephyper.search.nas.utils._logging import JsonMessage as jm
 
 logger = util.conf_logger('deephyper.model.trainer')
@@ -157,30 +159,46 @@ class TrainerTrainValid:
         if self.preprocessing_func:
             logger.debug(
                 f'preprocess_data with: {str(self.preprocessing_func)}')
+            load_data = self.config.get('load_data')
+            if load_data is None:
+                preprocessed = self._fit_preprocessor()
+            else:
+                # the preprocessed data of a worker are reused by its next evaluations
+                key = data_cache.make_key(load_data['func'], load_data.get('kwargs'),
+                                          self.preprocessing_func)
+                preprocessed = data_cache.cached(key, self._fit_preprocessor)
+            self.preprocessor, self.train_X, self.train_Y, self.valid_X, self.valid_Y = preprocessed
+        else:
+            logger.debug('no preprocessing function')
 
-            data_train = np.concatenate((*self.train_X, self.train_Y), axis=1)
-            data_valid = np.concatenate((*self.valid_X, self.valid_Y), axis=1)
-            data = np.concatenate((data_train, data_valid), axis=0)
-            self.preprocessor = self.preprocessing_func()
+    def _fit_preprocessor(self):
+        """Fit a new preprocessor on the training and validation data.
 
-            dt_shp = np.shape(data_train)
-            tX_shp = [np.shape(x) for x in self.train_X]
+        Returns:
+            tuple: ``(preprocessor, train_X, train_Y, valid_X, valid_Y)`` with the preprocessed data.
+        """
+        data_train = np.concatenate((*self.train_X, self.train_Y), axis=1)
+        data_valid = np.concatenate((*self.valid_X, self.valid_Y), axis=1)
+        data = np.concatenate((data_train, data_valid), axis=0)
+        preprocessor = self.preprocessing_func()
 
-            preproc_data = self.preprocessor.fit_transform(data)
+        dt_shp = np.shape(data_train)
+        tX_shp = [np.shape(x) for x in self.train_X]
 
-            acc, self.train_X = 0, list()
-            for shp in tX_shp:
-                self.train_X.append(preproc_data[:dt_shp[0], acc:acc+shp[1]])
-                acc += shp[1]
-            self.train_Y = preproc_data[:dt_shp[0], acc:]
+        preproc_data = preprocessor.fit_transform(data)
 
-            acc, self.valid_X = 0, list()
-            for shp in tX_shp:
-                self.valid_X.append(preproc_data[dt_shp[0]:, acc:acc+shp[1]])
-                acc += shp[1]
-            self.valid_Y = preproc_data[dt_shp[0]:, acc:]
-        else:
-            logger.debug('no preprocessing function')
+        acc, train_X = 0, list()
+        for shp in tX_shp:
+            train_X.append(preproc_data[:dt_shp[0], acc:acc+shp[1]])
+            acc += shp[1]
+        train_Y = preproc_data[:dt_shp[0], acc:]
+
+        acc, valid_X = 0, list()
+        for shp in tX_shp:
+            valid_X.append(preproc_data[dt_shp[0]:, acc:acc+shp[1]])
+            acc += shp[1]
+        valid_Y = preproc_data[dt_shp[0]:, acc:]
+        return preprocessor, train_X, train_Y, valid_X, valid_Y
 
     def set_dataset_train(self):
         if self.data_config_type == "ndarray":
@@ -289,6 +307,7 @@ class TrainerTrainValid:
                 max_rmetric = max(max_rmetric, unnormalize_rmetric)
                 logger.info(
                     jm(epoch=i, rmetric=float(unnormalize_rmetric)))
+                report(i, unnormalize_rmetric)
 
             logger.info(jm(type='result', rmetric=float(max_rmetric)))
             return max_rmetric
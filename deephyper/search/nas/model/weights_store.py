@@ -0,0 +1,142 @@
+"""Weight inheritance between the architectures of a NAS.
+
+``run.alpha`` saves the weights of each trained model in a directory, one ``.npz`` file per architecture named by its fingerprint (see ``KerasStructure.fingerprint``). When a new model is created, each of its layers whose signature (operation and signatures of its inputs in order, see ``KerasStructure.get_layer_signatures``) and weight shapes match a layer of a stored model inherits its weights, the most recently trained one first. The training then starts warm and lasts ``fine_tune_epochs`` epochs instead of ``num_epochs``.
+
+The store is enabled by the ``weights_store`` entry of the problem, the path of the directory::
+
+    Problem.add_dim('weights_store', 'weights')
+    Problem.add_dim('hyperparameters', {
+        ...
+        'num_epochs': 20,
+        'fine_tune_epochs': 5,
+    })
+
+The directory can be shared by the workers of all the evaluators. It keeps the ``MAX_FILES`` most recently saved architectures, the older files are removed after each save, so its size is bounded by ``MAX_FILES`` times the size of the weights of a model.
+"""
+import os
+import threading
+
+import numpy as np
+
+from deephyper.evaluator.reporter import record
+
+MAX_FILES = 1000  # number of architectures kept in a directory
+
+_stores = {}  # path --> WeightsStore
+_lock = threading.Lock()
+
+
+class WeightsStore:
+    """Directory of the trained weights of architectures.
+
+    Args:
+        path (str): path of the directory, it is created if it does not exist.
+        max_files (int): number of architectures kept in the directory.
+    """
+
+    def __init__(self, path, max_files=MAX_FILES):
+        self.path = os.path.abspath(path)
+        self.max_files = max_files
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = {}  # signature --> (mtime, file)
+        self._mtimes = {}  # file --> mtime of the indexed version
+
+    def _files(self):
+        return [os.path.join(self.path, fname) for fname in os.listdir(self.path)
+                if fname.endswith('.npz') and not fname.endswith('.tmp.npz')]
+
+    def _refresh(self):
+        files = self._files()
+        # files removed by the bound of the directory
+        removed = set(self._mtimes) - set(files)
+        for fpath in removed:
+            del self._mtimes[fpath]
+        self._index = {sig: entry for sig, entry in self._index.items()
+                       if entry[1] not in removed}
+        for fpath in files:
+            try:
+                mtime = os.path.getmtime(fpath)
+                if self._mtimes.get(fpath) == mtime:
+                    continue
+                with np.load(fpath) as npz:
+                    signatures = {k.rsplit(':', 1)[0] for k in npz.files}
+            except (OSError, ValueError):
+                continue
+            self._mtimes[fpath] = mtime
+            for sig in signatures:
+                if sig not in self._index or self._index[sig][0] <= mtime:
+                    self._index[sig] = (mtime, fpath)
+
+    def load(self, structure):
+        """Set the weights of the layers of the model of ``structure`` which match a stored layer.
+
+        Args:
+            structure (KerasStructure): a structure whose model is created.
+
+        Returns:
+            int: number of layers which inherited weights.
+        """
+        num_inherited = 0
+        with self._lock:
+            self._refresh()
+            for sig, layer in structure.get_layer_signatures().items():
+                if sig not in self._index:
+                    continue
+                try:
+                    with np.load(self._index[sig][1]) as npz:
+                        weights = [npz[f'{sig}:{i}']
+                                   for i in range(len(layer.get_weights()))]
+                except (OSError, KeyError, ValueError):
+                    continue
+                if [w.shape for w in weights] == [w.shape for w in layer.get_weights()]:
+                    layer.set_weights(weights)
+                    num_inherited += 1
+        record('inherited_layers', num_inherited)
+        return num_inherited
+
+    def save(self, structure):
+        """Save the weights of the layers of the model of ``structure``.
+
+        Args:
+            structure (KerasStructure): a structure whose model is trained.
+        """
+        arrays = {}
+        for sig, layer in structure.get_layer_signatures().items():
+            for i, w in enumerate(layer.get_weights()):
+                arrays[f'{sig}:{i}'] = w
+        fpath = os.path.join(self.path, f'{structure.fingerprint()}.npz')
+        tmp_path = f'{fpath}.{os.getpid()}.{threading.get_ident()}.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        # readers never see a partially written file
+        os.replace(tmp_path, fpath)
+        self._prune()
+
+    def _prune(self):
+        mtimes = []
+        for fpath in self._files():
+            try:
+                mtimes.append((os.path.getmtime(fpath), fpath))
+            except OSError:  # removed by another worker
+                continue
+        mtimes.sort()
+        for _, fpath in mtimes[:max(len(mtimes) - self.max_files, 0)]:
+            try:
+                os.remove(fpath)
+            except OSError:
+                continue
+
+
+def get_store(config):
+    """The store of ``config['weights_store']``, one per path and process.
+
+    Returns:
+        WeightsStore: the store, ``None`` if the problem has no ``weights_store``.
+    """
+    path = config.get('weights_store')
+    if path is None:
+        return None
+    with _lock:
+        if path not in _stores:
+            _stores[path] = WeightsStore(path)
+        return _stores[path]
@@ -23,6 +23,8 @@ from deephyper.search.nas.baselines.common.vec_env.vec_video_recorder import \
 from deephyper.search.nas.env.neural_architecture_envs import \
     NeuralArchitectureVecEnv
 from deephyper.search.nas.utils._logging import JsonMessage as jm
+from deephyper.search.nas.utils.arch_filter import ArchitectureFilter
+from deephyper.search.nas.utils.arch_key import key
 
 try:
     from mpi4py import MPI
@@ -33,17 +35,13 @@ except ImportError:
 dhlogger = util.conf_logger('deephyper.search.nas.nas_search')
 
 
-def key(d):
-    return json.dumps(dict(arch_seq=d['arch_seq']))
-
-
 class NeuralArchitectureSearch(Search):
     """Represents different kind of RL algorithms working with NAS.
 
     Args:
         problem (str): Module path to the Problem instance you want to use for the search (e.g. deephyper.benchmark.nas.linearReg.Problem).
         run (str): Module path to the run function you want to use for the search (e.g. deephyper.search.nas.model.run.quick).
-        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool'].
+        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool', 'shared'].
         alg (str): algorithm to use among ['ppo2',].
         network (str/function): policy network.
         num_envs (int): number of environments per agent to run in
@@ -100,6 +98,7 @@ class NeuralArchitectureSearch(Search):
             self.num_evals = math.inf
 
         self.space = self.problem.space
+        self.arch_filter = ArchitectureFilter(self.space, **kwargs)
 
         dhlogger.info(f'evaluator: {type(self.evaluator)}')
         dhlogger.info(f'rank: {self.rank}')
@@ -132,6 +131,7 @@ class NeuralArchitectureSearch(Search):
                             default='ppo_lstm',
                             choices=['ppo_lstm'],
                             help='Policy-Value network.')
+        ArchitectureFilter._extend_parser(parser)
         return parser
 
     def main(self):
@@ -171,11 +171,14 @@ class NeuralArchitectureSearch(Search):
             if k in alg_kwargs:
                 alg_kwargs[k] = self.kwargs[k]
 
-        env = build_env(num_envs, space, evaluator)
+        env = build_env(num_envs, space, evaluator, self.arch_filter)
         total_timesteps = num_evals * env.num_actions_per_env
 
         alg_kwargs['network'] = network
         alg_kwargs['nsteps'] = env.num_actions_per_env
+        if self.time_budget.budget is not None:
+            # no new batch of architectures after the end of the time budget
+            alg_kwargs['stop'] = lambda: self.time_budget.expired
 
         model = learn(
             env=env,
@@ -187,13 +190,14 @@ class NeuralArchitectureSearch(Search):
         return model, env
 
 
-def build_env(num_envs, space, evaluator):
+def build_env(num_envs, space, evaluator, arch_filter=None):
     """Build nas environment.
 
     Args:
         num_envs (int): number of environments to run in parallel (>=1).
         space (dict): space of the search (i.e. params dict)
         evaluator (Evaluator): evaluator object to use.
+        arch_filter (ArchitectureFilter): architectures rejected by the filter are not evaluated.
 
     Returns:
         VecEnv: vectorized environment.
@@ -205,7 +209,7 @@ def build_env(num_envs, space, evaluator):
     else:
         structure = space['create_structure']['func'](**cs_kwargs)
     env = NeuralArchitectureVecEnv(num_envs, space, evaluator,
-                                   structure)
+                                   structure, arch_filter)
     return env
 
 
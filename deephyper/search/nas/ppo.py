@@ -15,7 +15,7 @@ class Ppo(NeuralArchitectureSearch):
     Args:
         problem (str): Module path to the Problem instance you want to use for the search (e.g. deephyper.benchmark.nas.linearReg.Problem).
         run (str): Module path to the run function you want to use for the search (e.g. deephyper.search.nas.model.run.quick).
-        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool'].
+        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool', 'shared'].
         network: (str): policy network for the search, value in [
             'ppo_lstm_128',
             'ppo_lnlstm_128',
@@ -9,6 +9,7 @@ from mpi4py import MPI
 
 from deephyper.search import Search, util
 from deephyper.search.nas.agent import nas_random
+from deephyper.search.nas.utils.arch_key import key
 
 logger = util.conf_logger('deephyper.search.run_nas')
 
@@ -18,10 +19,6 @@ def print_logs(runner):
     logger.debug(' workers = {}'.format(runner.workers))
 
 
-def key(d):
-    return json.dumps(dict(arch_seq=d['arch_seq']))
-
-
 LAUNCHER_NODES = int(os.environ.get('BALSAM_LAUNCHER_NODES', 1))
 WORKERS_PER_NODE = int(os.environ.get('DEEPHYPER_WORKERS_PER_NODE', 1))
 
@@ -40,6 +37,9 @@ class RandomAgents(Search):
         # set in super : self.problem
         # set in super : self.run_func
         # set in super : self.evaluator
+        if self.args.time_budget is not None:
+            # the episodes are run by nas_random.train, which has no stop hook
+            logger.warning('RandomAgents ignores --time-budget, use deephyper.search.nas.full_random to enforce it')
 
         self.num_episodes = kwargs.get('num_episodes')
         if self.num_episodes is None:
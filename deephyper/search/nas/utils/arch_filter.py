@@ -0,0 +1,149 @@
+"""Master side filter of the architectures of a NAS.
+
+An :class:`ArchitectureFilter` validates the architectures before they are submitted to the evaluator: the operations are set on the structure and the shapes of the tensors are propagated through its graph (see ``deephyper.search.nas.model.space.cost``). An architecture whose model cannot be created, for example a concatenation of incompatible tensors or a node without input, gets the penalty of ``run.alpha`` without being executed by a worker. The validation is enabled by default: the master then imports TensorFlow (with the operations of the structure) and loads the whole data of the problem once to get its shapes, it is disabled with ``--no-validation``.
+
+The filter also estimates the cost of an architecture without creating its model (see ``deephyper.search.nas.model.space.cost``) and rejects it when it exceeds a budget: ``--max-params``, ``--max-flops`` (per sample) or ``--max-activation-memory`` (bytes per sample). Without validation, an architecture whose shapes cannot be propagated has an unknown cost and is accepted, its evaluation gets the penalty. The template of the structure (see ``deephyper.search.nas.model.space.template``) is created with the shapes of the data of the problem, which are loaded once by the master.
+"""
+from deephyper.search import util
+from deephyper.search.nas.utils.arch_key import canonical_arch_seq, num_ops_per_node
+
+logger = util.conf_logger('deephyper.search.nas.utils.arch_filter')
+
+PENALTY = -1  # objective of rejected architectures, as for models which cannot be created
+
+
+class ArchitectureFilter:
+    """Reject the invalid architectures and the architectures exceeding a budget.
+
+    Args:
+        space (dict): space of the NAS problem.
+        validation (bool): reject the architectures whose model cannot be created.
+        max_params (int): maximum number of parameters, ``None`` for no limit.
+        max_flops (int): maximum number of floating point operations per sample, ``None`` for no limit.
+        max_activation_memory (int): maximum peak memory of the activations in bytes per sample, ``None`` for no limit.
+    """
+
+    def __init__(self, space, validation=True, max_params=None, max_flops=None, max_activation_memory=None, **kwargs):
+        self.space = space
+        self.validation = validation
+        self.limits = {
+            'params': max_params,
+            'flops': max_flops,
+            'activation_memory': max_activation_memory
+        }
+        self.limits = {k: v for k, v in self.limits.items() if v is not None}
+        self.num_rejected = 0
+        self._shapes = None
+        self._reasons = {}  # canonical arch_seq --> reason of rejection or None
+
+    @property
+    def enabled(self):
+        return self.validation or len(self.limits) > 0
+
+    @staticmethod
+    def _extend_parser(parser):
+        parser.add_argument('--no-validation', action='store_false', dest='validation',
+                            help='architectures are not validated before being evaluated.')
+        parser.add_argument('--max-params', type=int, default=None,
+                            help='architectures with more parameters are not evaluated.')
+        parser.add_argument('--max-flops', type=int, default=None,
+                            help='architectures with more floating point operations per sample are not evaluated.')
+        parser.add_argument('--max-activation-memory', type=int, default=None,
+                            help='architectures with a larger peak memory of activations (bytes per sample) are not evaluated.')
+        return parser
+
+    def shapes(self):
+        """Input and output shapes of the data of the problem, the data are loaded once."""
+        if self._shapes is None:
+            from deephyper.search.nas.model.data_utils import data_shapes
+            load_data = util.load_attr_from(self.space['load_data']['func'])
+            kwargs = self.space['load_data'].get('kwargs')
+            data = load_data() if kwargs is None else load_data(**kwargs)
+            input_shape, output_shape, _ = data_shapes(data)
+            self._shapes = input_shape, output_shape
+        return self._shapes
+
+    def create_structure(self, arch_seq):
+        from deephyper.search.nas.model.space.template import get_template
+        input_shape, output_shape = self.shapes()
+        structure = get_template(self.space['create_structure'],
+                                 input_shape, output_shape)
+        structure.set_ops(arch_seq)
+        return structure
+
+    def check(self, arch_seq):
+        """Check an architecture.
+
+        Args:
+            arch_seq (list): the architecture.
+
+        Returns:
+            str: the reason of the rejection, ``None`` if the architecture is accepted.
+        """
+        if not self.enabled:
+            return None
+        arch_seq = tuple(canonical_arch_seq(
+            arch_seq, num_ops_per_node(self.space['create_structure'])))
+        if arch_seq not in self._reasons:
+            self._reasons[arch_seq] = self._check(list(arch_seq))
+        return self._reasons[arch_seq]
+
+    def _check(self, arch_seq):
+        from deephyper.search.nas.model.space.cost import UnknownOperationError
+        try:
+            self.shapes()
+        except Exception as e:
+            if self.limits:
+                raise
+            # the validation alone does not prevent the search from running
+            logger.warning(f'architectures are not validated, the data cannot be loaded: {e}')
+            self.validation = False
+            return None
+        try:
+            structure = self.create_structure(arch_seq)
+            cost = structure.estimate_cost()
+        except UnknownOperationError as e:
+            logger.warning(f'cost of {arch_seq} cannot be estimated: {e}')
+            return None
+        except Exception as e:
+            # the model of this architecture cannot be created
+            if self.validation:
+                return f'invalid architecture: {e}'
+            logger.warning(f'cost of {arch_seq} cannot be estimated: {e}')
+            return None
+        for name, limit in self.limits.items():
+            if cost[name] > limit:
+                return f'{name}={cost[name]} > {limit}'
+        return None
+
+    def split(self, configs):
+        """Split configurations in accepted and rejected ones.
+
+        Args:
+            configs (list(dict)): configurations with an ``arch_seq``.
+
+        Returns:
+            tuple: ``(accepted, rejected)`` lists of configurations.
+        """
+        if not self.enabled:
+            return configs, []
+        accepted, rejected = [], []
+        for cfg in configs:
+            reason = self.check(cfg['arch_seq'])
+            if reason is None:
+                accepted.append(cfg)
+            else:
+                logger.info(f'rejected arch_seq {cfg["arch_seq"]}: {reason}')
+                rejected.append(cfg)
+        self.num_rejected += len(rejected)
+        return accepted, rejected
+
+    def reject(self, evaluator, configs):
+        """Register the objective of rejected configurations in the evaluator so that they are never executed.
+
+        Args:
+            evaluator (Evaluator): the evaluator of the search.
+            configs (list(dict)): rejected configurations.
+        """
+        if configs:
+            evaluator.prime_cache([(cfg, PENALTY) for cfg in configs])
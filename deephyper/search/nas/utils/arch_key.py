@@ -0,0 +1,95 @@
+"""Canonical keys of neural architectures.
+
+An ``arch_seq`` is decoded by ``VariableNode.get_op``: a float in [0, 1] is rounded to the index of one of the operations of the node, an int is the index itself. Many ``arch_seq`` therefore set the same operations (e.g. ``[0.31, 1]`` and ``[0.33, 1.]`` for a structure whose first node has 3 operations). :func:`canonical_arch_seq` converts the ``arch_seq`` of a configuration to the integer indexes of the operations of the VariableNodes.
+
+Different operations can also build the same network (e.g. ``Connect`` choices which create the same edges, ``Identity`` and ``Dropout(0.)``, operations of nodes which are not connected to the output). :func:`key` returns the fingerprint of the configured structure (see ``KerasStructure.fingerprint``), it is used as ``cache_key`` of the evaluator by the NAS searches so that equivalent architectures are evaluated once (see ``Evaluator.stats['num_cache_used']``).
+"""
+import json
+
+from deephyper.search.nas.utils._logging import Encoder
+from deephyper.search import util
+
+logger = util.conf_logger('deephyper.search.nas.utils.arch_key')
+
+_num_ops = {}  # create_structure (json) --> number of operations of each VariableNode
+_fingerprints = {}  # (create_structure (json), canonical arch_seq) --> fingerprint
+
+
+def _structure_key(create_structure):
+    try:
+        return json.dumps(create_structure, cls=Encoder, sort_keys=True, default=str)
+    except TypeError:
+        return repr(create_structure)
+
+
+def _create_structure(create_structure):
+    from deephyper.search.nas.model.space.template import get_template
+    return get_template(create_structure)
+
+
+def num_ops_per_node(create_structure):
+    """Number of operations of each VariableNode of the structure created by ``create_structure``.
+
+    Args:
+        create_structure (dict): ``{'func': callable, 'kwargs': dict}`` as in ``Problem.space['create_structure']``.
+
+    Returns:
+        list(int): number of operations of each VariableNode.
+    """
+    s_key = _structure_key(create_structure)
+    if s_key not in _num_ops:
+        _num_ops[s_key] = _create_structure(create_structure).num_ops_per_node
+    return _num_ops[s_key]
+
+
+def canonical_arch_seq(arch_seq, num_ops):
+    """Convert ``arch_seq`` to the integer indexes of the operations, the entries after the last VariableNode are ignored.
+
+    Args:
+        arch_seq (list): element of list can be float in [0, 1] or int.
+        num_ops (list(int)): number of operations of each VariableNode.
+
+    Returns:
+        list(int): the index of the operation of each VariableNode.
+    """
+    from deephyper.search.nas.model.space.node import op_indexes
+    if len(arch_seq) < len(num_ops):
+        raise ValueError(f'arch_seq of length {len(arch_seq)} for {len(num_ops)} VariableNodes')
+    return op_indexes(list(arch_seq)[:len(num_ops)], num_ops)
+
+
+def fingerprint(create_structure, arch_seq):
+    """Fingerprint of the network built by ``arch_seq``, the template of the structure (see ``deephyper.search.nas.model.space.template``) is configured for each canonical ``arch_seq``.
+
+    Args:
+        create_structure (dict): ``{'func': callable, 'kwargs': dict}`` as in ``Problem.space['create_structure']``.
+        arch_seq (list): element of list can be float in [0, 1] or int.
+
+    Returns:
+        str: the fingerprint of the configured structure.
+    """
+    s_key = _structure_key(create_structure)
+    arch_seq = canonical_arch_seq(arch_seq, num_ops_per_node(create_structure))
+    f_key = (s_key, tuple(arch_seq))
+    if f_key not in _fingerprints:
+        structure = _create_structure(create_structure)
+        structure.set_ops(arch_seq)
+        _fingerprints[f_key] = structure.fingerprint()
+    return _fingerprints[f_key]
+
+
+def key(d):
+    """Cache key of a NAS configuration.
+
+    Args:
+        d (dict): configuration with ``arch_seq`` and ``create_structure`` entries.
+
+    Returns:
+        str: the JSON of the fingerprint of the architecture, or of the raw ``arch_seq`` if it cannot be decoded.
+    """
+    arch_seq = d['arch_seq']
+    try:
+        return json.dumps(dict(arch=fingerprint(d['create_structure'], arch_seq)))
+    except Exception as e:
+        logger.warning(f'cannot decode arch_seq {arch_seq}: {e}')
+    return json.dumps(dict(arch_seq=arch_seq), cls=Encoder)
@@ -3,6 +3,7 @@ from pprint import pformat
 import logging
 from deephyper.search import util
 from deephyper.evaluator.evaluate import Evaluator
+from deephyper.search.budget import TimeBudget
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,7 @@ class Search:
     Args:
         problem (str): Module path to the Problem instance you want to use for the search (e.g. deephyper.benchmark.hps.polynome2.Problem).
         run (str): Module path to the run function you want to use for the search (e.g. deephyper.benchmark.hps.polynome2.run).
-        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool'].
+        evaluator (str): value in ['balsam', 'subprocess', 'processPool', 'threadPool', 'shared']. With ``'shared'`` the search is a tenant of ``deephyper.evaluator._shared.SharedPool.default()``, a pool of workers shared by several searches running in the same process.
     """
 
     def __init__(self, problem, run, evaluator, **kwargs):
@@ -39,12 +40,20 @@ class Search:
         self.problem = util.generic_loader(problem, 'Problem')
         self.run_func = util.generic_loader(run, 'run')
         logger.info('Evaluator will execute the function: '+run)
+        evaluator_kwargs = {}
+        if evaluator == 'shared':
+            evaluator_kwargs = dict(problem=self.problem,
+                                    weight=self.args.share_weight,
+                                    priority=self.args.share_priority)
         if kwargs.get('cache_key') is None:
-            self.evaluator = Evaluator.create(self.run_func, method=evaluator)
+            self.evaluator = Evaluator.create(self.run_func, method=evaluator,
+                                              **evaluator_kwargs)
         else:
             self.evaluator = Evaluator.create(
-                self.run_func, method=evaluator, cache_key=kwargs['cache_key'])
+                self.run_func, method=evaluator, cache_key=kwargs['cache_key'],
+                **evaluator_kwargs)
         self.num_workers = self.evaluator.num_workers
+        self.time_budget = TimeBudget(self.evaluator, self.args.time_budget)
 
         logger.info(f'Options: '+pformat(self.args.__dict__, indent=4))
         logger.info('Hyperparameter space definition: ' +
@@ -92,10 +101,22 @@ class Search:
                             default=4096,
                             help="Kill evals that take longer than this"
                             )
+        parser.add_argument('--time-budget',
+                            type=float, default=None,
+                            help="Wall-clock budget of the search in minutes, evaluations predicted not to finish before the end of the budget are not submitted"
+                            )
         parser.add_argument('--evaluator',
                             default='subprocess',
                             choices=['balsam', 'subprocess',
-                                     'processPool', 'threadPool'],
+                                     'processPool', 'threadPool', 'shared'],
                             help="The evaluator is an object used to run the model."
                             )
+        parser.add_argument('--share-weight',
+                            type=float, default=1.0,
+                            help="Fair share weight of the search in a shared pool of workers (--evaluator shared)"
+                            )
+        parser.add_argument('--share-priority',
+                            type=int, default=0,
+                            help="Evals of the searches with a higher priority are run first in a shared pool of workers (--evaluator shared)"
+                            )
         return parser
@@ -77,7 +77,7 @@ class DelayTimer:
             now = time.time()
             elapsed = now - start
             if elapsed > self.max_seconds:
-                raise StopIteration
+                return
             else:
                 yield self.pretty_time(elapsed)
             tosleep = nexttime - now
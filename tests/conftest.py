@@ -1,6 +1,30 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
 import pytest
 
 
+#-- Searches log into deephyper.log in a tmp dir, not in the checkout
+def pytest_configure(config):
+    # the file of the logger is opened in the working directory of its first
+    # use, which can be the import of deephyper.search
+    config._deephyper_log_dir = tempfile.mkdtemp(prefix='deephyper-tests-')
+    cwd = os.getcwd()
+    os.chdir(config._deephyper_log_dir)
+    try:
+        from deephyper.search import util
+        util.conf_logger('tests')
+    finally:
+        os.chdir(cwd)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(config._deephyper_log_dir, ignore_errors=True)
+
+
 #-- Control skipping of tests according to command line option
 def pytest_addoption(parser):
     parser.addoption(
@@ -28,4 +52,24 @@ def pytest_runtest_setup(item):
     if "incremental" in item.keywords:
         previousfailed = getattr(item.parent, "_previousfailed", None)
         if previousfailed is not None:
-            pytest.xfail("previous test failed (%s)" % previousfailed.name)
\ No newline at end of file
+            pytest.xfail("previous test failed (%s)" % previousfailed.name)
+#-- Run a python module with mpirun
+@pytest.fixture
+def mpirun():
+    pytest.importorskip('mpi4py.MPI')
+    executable = shutil.which('mpirun')
+    if executable is None:
+        pytest.skip('mpirun is not available')
+    env = dict(os.environ,
+               PYTHONPATH=os.pathsep.join(sys.path),
+               OMPI_ALLOW_RUN_AS_ROOT='1', OMPI_ALLOW_RUN_AS_ROOT_CONFIRM='1',
+               OMPI_MCA_rmaps_base_oversubscribe='1')
+
+    def run(n, module, args, cwd):
+        proc = subprocess.run(
+            [executable, '-n', str(n), sys.executable, '-m', module] + args,
+            cwd=str(cwd), env=env, timeout=300,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        assert proc.returncode == 0, proc.stdout.decode()
+        return proc
+    return run
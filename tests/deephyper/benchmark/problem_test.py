@@ -53,3 +53,89 @@ class TestHpProblem:
         pb = HpProblem()
         with pytest.raises(AssertionError):
             pb.add_dim(0, (-10, 10), 0)
+
+
+def conditional_problem():
+    from deephyper.benchmark.problem import HpProblem
+    pb = HpProblem()
+    pb.add_dim('nunits_l2', (0, 64), 32)
+    pb.add_dim('dropout_l2', (0.0, 0.5))
+    pb.add_dim('activation', ['relu', 'selu'], 'relu')
+    pb.add_dim('optimizer', ['sgd', 'adam'], 'adam')
+    pb.add_condition('dropout_l2', 'nunits_l2', lambda v: v > 0)
+    pb.add_forbidden({'activation': 'selu', 'optimizer': 'sgd'})
+    return pb
+
+
+def test_conditional_dims_are_collapsed():
+    pb = conditional_problem()
+    x = dict(nunits_l2=0, dropout_l2=0.3, activation='relu', optimizer='sgd')
+    assert not pb.is_active('dropout_l2', x)
+    assert pb.canonicalize(x) == dict(x, dropout_l2=0.0)
+    x['nunits_l2'] = 8
+    assert pb.canonicalize(x) == x
+
+
+def test_forbidden_clauses():
+    pb = conditional_problem()
+    x = dict(nunits_l2=8, dropout_l2=0.3, activation='selu', optimizer='sgd')
+    assert pb.canonicalize(x) is None
+    pb.add_forbidden(lambda x: x['nunits_l2'] > 32)
+    assert pb.canonicalize(dict(x, optimizer='adam', nunits_l2=40)) is None
+    assert pb.canonicalize(dict(x, optimizer='adam')) is not None
+
+
+def test_optimizer_respects_constraints():
+    from argparse import Namespace
+    from deephyper.search.hps.optimizer import Optimizer
+    pb = conditional_problem()
+    args = Namespace(learner='RF', acq_func='gp_hedge', liar_strategy='cl_max')
+    opt = Optimizer(pb, 4, args)
+    XX = opt.ask_initial(n_points=8)
+    opt.tell([(x, 1.0) for x in XX])
+    for batch in opt.ask(n_points=8):
+        XX.extend(batch)
+    assert len(XX) == 16
+    for x in XX:
+        assert pb.canonicalize(x) == x
+
+
+def test_optimizer_fits_once_per_ask():
+    from argparse import Namespace
+    from deephyper.search.hps.optimizer import Optimizer
+    pb = conditional_problem()
+    # most of the points proposed by the model are forbidden
+    pb.add_forbidden(lambda x: x['nunits_l2'] > 2)
+    args = Namespace(learner='RF', acq_func='gp_hedge', liar_strategy='cl_max')
+    opt = Optimizer(pb, 2, args)
+    num_fits = []
+    tell = opt._optimizer.tell
+    def counting_tell(*args, **kwargs):
+        num_fits.append(1)
+        return tell(*args, **kwargs)
+    opt._optimizer.tell = counting_tell
+    XX = opt.ask_initial(n_points=4)
+    # the initial points are told at once, then each replaced point is asked
+    assert len(num_fits) <= 1 + 4
+    assert all(pb.canonicalize(x) == x for x in XX)
+    opt.tell([(x, float(x['nunits_l2'])) for x in XX])
+    del num_fits[:]
+    for _ in range(4):
+        x = opt._ask()
+        assert pb.canonicalize(x) == x
+    assert len(num_fits) <= 4
+
+
+@pytest.mark.parametrize('acq_func', ['LCB', 'EI', 'PI', 'EIps', 'PIps'])
+def test_replace_forbidden_acquisition(acq_func):
+    from argparse import Namespace
+    from deephyper.search.hps.optimizer import Optimizer
+    pb = conditional_problem()
+    pb.add_forbidden(lambda x: x['nunits_l2'] > 2)
+    args = Namespace(learner='RF', acq_func=acq_func, liar_strategy='cl_max')
+    opt = Optimizer(pb, 2, args)
+    XX = opt.ask_initial(n_points=4)
+    opt.tell([(x, float(x['nunits_l2'])) for x in XX], [1. + i for i in range(4)])
+    assert opt._optimizer.models
+    x = dict(zip(pb.space, opt._replace_forbidden()))
+    assert pb.canonicalize(x) == x
@@ -0,0 +1,29 @@
+class Encoder:
+    def encode(self, x):
+        return str(sorted(x.items()))
+
+
+def test_replicas_of_uncertain_configurations():
+    from deephyper.evaluator.replication import Replicator
+    rep = Replicator(Encoder(), top_k=2, max_replicas=3, budget=0.5)
+    results = [({'x': i}, float(i)) for i in range(4)]
+    assert rep.observe(results) == results
+    # the noise is unknown: the best configuration is replicated first
+    XX = rep.replicas(4)
+    assert XX == [{'x': 0, 'seed': 1}]
+    assert rep.replicas(4) == []  # a replica is pending
+    assert rep.observe([({'x': 0, 'seed': 1}, 2.0)]) == [({'x': 0}, 1.0)]
+    # noisy objectives: the two best configurations cannot be told apart
+    XX = rep.replicas(4)
+    assert {x['x'] for x in XX} <= {0, 1} and XX
+    # bounded by the budget
+    assert rep.num_replicas <= 0.5 * rep.num_evals
+
+
+def test_no_replicas_of_deterministic_objectives():
+    from deephyper.evaluator.replication import Replicator
+    rep = Replicator(Encoder(), top_k=3, budget=1.0)
+    rep.observe([({'x': i}, float(i)) for i in range(4)])
+    rep.observe([(x, 0.0) for x in rep.replicas(1)])
+    assert rep.pooled_variance() == 0.0
+    assert rep.replicas(4) == []
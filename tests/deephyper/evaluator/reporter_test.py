@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+
+def run_reporting(d):
+    from deephyper.evaluator.reporter import report
+    for step in range(d['steps']):
+        time.sleep(d.get('sleep', 0))
+        report(step, step * d['x'])
+    return -1
+
+
+def test_parse_reports():
+    from deephyper.evaluator.reporter import parse_reports
+    out = 'some log\nDH-REPORT: 0 1.5\nDH-REPORT: 1 2.0\nDH-OUTPUT: 3.0\n'
+    assert parse_reports(out) == [(0, 1.5), (1, 2.0)]
+
+
+@pytest.mark.parametrize('method', ['threadPool', 'processPool', 'subprocess'])
+def test_get_reports(method):
+    from deephyper.evaluator.evaluate import Evaluator
+    ev = Evaluator.create(run_reporting, method=method)
+    x = dict(x=2, steps=3)
+    ev.add_eval(x)
+
+    # reports are streamed while the eval is pending
+    reports = []
+    deadline = time.time() + 60
+    while len(reports) < 3 and time.time() < deadline:
+        reports.extend(ev.get_reports())
+        time.sleep(0.05)
+    results = list(ev.await_evals([x]))
+
+    assert results == [(x, -1)]
+    assert reports == [(x, 0, 0.), (x, 1, 2.), (x, 2, 4.)]
+    assert ev.reports[ev._gen_uid(x)] == [(0, 0.), (1, 2.), (2, 4.)]
+
+
+@pytest.mark.parametrize('method', ['threadPool', 'processPool', 'subprocess'])
+def test_stop_eval(method):
+    from deephyper.evaluator.evaluate import Evaluator
+    ev = Evaluator.create(run_reporting, method=method)
+    x = dict(x=1, steps=100, sleep=0.05)
+    ev.add_eval(x)
+
+    reports = []
+    while len(reports) < 2:
+        reports.extend(ev.get_reports())
+        time.sleep(0.05)
+    ev.stop_eval(x)
+
+    res = []
+    while len(res) < 1:
+        res.extend(ev.get_finished_evals())
+    x_, y = res[0]
+    assert x_ == x
+    assert y == ev.reports[ev._gen_uid(x)][-1][1]
+    assert y < 99
+
+
+def run_recording(d):
+    from deephyper.evaluator.reporter import record
+    record('cache_hits', d['x'])
+    record('cache_hits')
+    return d['x']
+
+
+@pytest.mark.parametrize('method', ['threadPool', 'processPool', 'subprocess'])
+def test_record(method):
+    from deephyper.evaluator.evaluate import Evaluator
+    ev = Evaluator.create(run_recording, method=method)
+    XX = [dict(x=1), dict(x=2)]
+    ev.add_eval_batch(XX)
+    res = []
+    while len(res) < 2:
+        res.extend(ev.get_finished_evals())
+    assert ev.stats['cache_hits'] == 5
@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+
+
+class Problem:
+    space = {'x': (0, 10)}
+
+
+def run(d):
+    time.sleep(d.get('sleep', 0.05))
+    if d.get('fail'):
+        raise RuntimeError('Simulated failure (meant to happen!)')
+    return d['x']
+
+
+GATES = {}  # name --> event releasing the evals of run_gated
+STARTED = queue.Queue()  # names of the started evals of run_gated
+
+
+def run_gated(d):
+    STARTED.put(d['gate'])
+    GATES[d['gate']].wait(30)
+    return d['x']
+
+
+def wait_all(evaluator, n):
+    results = []
+    while len(results) < n:
+        results.extend(evaluator.get_finished_evals())
+    return results
+
+
+def test_fair_share_and_idle_capacity():
+    from deephyper.evaluator._shared import SharedEvaluator, SharedPool
+    pool = SharedPool(num_workers=4)
+    a = SharedEvaluator(run_gated, pool=pool, weight=3.)
+    b = SharedEvaluator(run_gated, pool=pool, weight=1.)
+    GATES.update({f'{t}{i}': threading.Event() for t in 'ab' for i in range(8)})
+    # b is idle: a can use the whole pool
+    assert a.num_free_workers() == 4
+    a.add_eval_batch([{'x': i, 'gate': f'a{i}'} for i in range(8)])
+    assert sorted(STARTED.get(timeout=30) for _ in range(4)) == ['a0', 'a1', 'a2', 'a3']
+    assert a.num_free_workers() == 0
+    assert b.num_free_workers() == 1
+    b.add_eval_batch([{'x': i, 'gate': f'b{i}'} for i in range(4)])
+    for i in range(4):
+        GATES[f'a{i}'].set()
+    # the first evals of a finished: the free workers are shared 3:1
+    started = [STARTED.get(timeout=30) for _ in range(4)]
+    assert sorted(name[0] for name in started) == ['a', 'a', 'a', 'b']
+    assert pool.running[a] == 3 and pool.running[b] == 1
+    for gate in GATES.values():
+        gate.set()
+    assert len(wait_all(a, 8)) == 8 and len(wait_all(b, 4)) == 4
+
+
+def test_shared_evals():
+    from deephyper.evaluator.evaluate import Evaluator
+    from deephyper.evaluator._shared import SharedEvaluator, SharedPool
+    pool = SharedPool(num_workers=2)
+    a = SharedEvaluator(run, pool=pool, problem=Problem)
+    b = SharedEvaluator(run, pool=pool, problem=Problem)
+    c = SharedEvaluator(run, pool=pool)  # evals are not shared without problem
+    a.add_eval_batch([{'x': 1}, {'x': 2, 'fail': True}])
+    b.add_eval_batch([{'x': 1}])
+    c.add_eval_batch([{'x': 1}])
+    assert b.stats['num_shared'] == 1 and c.stats['num_shared'] == 0
+    assert sorted(y for _, y in wait_all(a, 2)) == [1, Evaluator.FAIL_RETURN_VALUE]
+    assert wait_all(b, 1) == [({'x': 1}, 1)]
+    assert wait_all(c, 1) == [({'x': 1}, 1)]
+    # finished evals are not kept by the pool
+    assert pool.shared == {}
+
+
+def run_reporting(d):
+    from deephyper.evaluator.reporter import report
+    # only finishes after 30 sec if it is not stopped
+    for step in range(3000):
+        report(step, float(step))
+        time.sleep(0.01)
+    return -1.
+
+
+def test_stop_shared_eval():
+    from deephyper.evaluator._shared import SharedEvaluator, SharedPool
+    pool = SharedPool(num_workers=2)
+    a = SharedEvaluator(run_reporting, pool=pool, problem=Problem)
+    b = SharedEvaluator(run_reporting, pool=pool, problem=Problem)
+    x = {'x': 1}
+    a.add_eval_batch([x])
+    b.add_eval_batch([x])
+    start = time.time()
+    # the reports go to both tenants
+    while not list(b.get_reports()):
+        assert time.time() - start < 10
+        time.sleep(0.01)
+    assert list(a.get_reports())
+
+    # b still waits for the eval
+    a.stop_eval(x)
+    time.sleep(0.1)
+    assert pool.running[a] == 1
+    # the subscriber stops last: the eval of a is stopped
+    b.stop_eval(x)
+    (_, ya), = wait_all(a, 1)
+    (_, yb), = wait_all(b, 1)
+    assert time.time() - start < 10
+    assert 0 <= ya <= yb
+    assert pool.shared == {}
@@ -0,0 +1,21 @@
+import time
+
+
+def run(d):
+    time.sleep(d['sleep'])
+    return d['sleep']
+
+
+def test_worker_utilization():
+    from deephyper.evaluator.evaluate import Evaluator
+    ev = Evaluator.create(run, method='threadPool')
+    assert ev.worker_utilization() == 0.
+    xs = [{'sleep': 0.2 + 0.01 * i} for i in range(2 * ev.num_workers)]
+    ev.add_eval_batch(xs)
+    results = list(ev.await_evals(xs))
+    assert len(results) == len(xs)
+    # the workers were busy from the first submission to the last completion
+    assert ev.worker_utilization() > 0.8
+    time.sleep(0.5)
+    # then idle during 0.5 sec after about 0.4 sec of work
+    assert 0.3 < ev.worker_utilization() < 0.6
@@ -0,0 +1,65 @@
+class FakeEvaluator:
+    def __init__(self, durations):
+        self.durations = durations  # x --> seconds
+        self.key_uid_map = {str(x): str(x) for x in durations}
+        self.finished_evals = {str(x): 0. for x in durations}
+        self.num_decoded = 0
+
+    def decode(self, key):
+        self.num_decoded += 1
+        return {'x': int(key)}
+
+    def duration(self, x):
+        return self.durations.get(x['x'])
+
+
+def test_time_budget_feasible():
+    from deephyper.search.budget import TimeBudget
+    evaluator = FakeEvaluator({x: 10. * x for x in range(1, 21)})
+    budget = TimeBudget(evaluator, minutes=2)
+    assert 0 < budget.time_left() <= 120
+    durations = budget.predict([{'x': 1}, {'x': 20}])
+    assert durations[0] < durations[1]
+    # 200 seconds do not fit in the budget
+    assert budget.feasible([{'x': 2}, {'x': 20}]) == [{'x': 2}]
+    batch, rejected = budget.fill(lambda n: [{'x': 20}, {'x': 1}][:n], 2)
+    assert {'x': 20} not in batch and {'x': 20} in rejected
+
+
+def test_time_budget_incremental_fit():
+    from deephyper.search.budget import TimeBudget
+    evaluator = FakeEvaluator({x: 10. * x for x in range(1, 6)})
+    budget = TimeBudget(evaluator, minutes=2)
+    budget.predict([{'x': 1}])
+    assert budget._num_samples == 5 and evaluator.num_decoded == 5
+    # a pending eval, then finished
+    evaluator.key_uid_map['6'] = '6'
+    budget.predict([{'x': 1}])
+    assert budget._num_samples == 5 and evaluator.num_decoded == 6
+    evaluator.durations[6] = 60.
+    evaluator.finished_evals['6'] = 0.
+    budget.predict([{'x': 1}])
+    assert budget._num_samples == 6 and evaluator.num_decoded == 6
+
+
+def test_no_time_budget():
+    from deephyper.search.budget import TimeBudget
+    budget = TimeBudget(FakeEvaluator({1: 1e6}))
+    assert budget.max_minutes is None and not budget.expired
+    assert budget.feasible([{'x': 1}]) == [{'x': 1}]
+
+
+def test_optimizer_discard():
+    from argparse import Namespace
+    from deephyper.benchmark import HpProblem
+    from deephyper.search.hps.optimizer import Optimizer
+    pb = HpProblem()
+    pb.add_dim('x', (0.0, 1.0))
+    args = Namespace(learner='RF', acq_func='LCB', liar_strategy='cl_max')
+    opt = Optimizer(pb, 2, args)
+    XX = opt.ask_initial(n_points=2)
+    opt.discard(XX[1:])
+    assert opt.counter == 1 and len(opt.evals) == 1
+    opt.tell([(XX[0], 1.0)])
+    opt.discard(XX[:1])  # evaluated points are kept
+    assert opt.counter == 1
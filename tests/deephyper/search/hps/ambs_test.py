@@ -0,0 +1,64 @@
+def test_load_results_csv(tmpdir):
+    from deephyper.search.hps.ambs import load_results
+    space = {'x': (0, 10), 'lr': (0.0, 1.0), 'act': ['relu', 'tanh']}
+    path = tmpdir.join('results.csv')
+    path.write(
+        'x,lr,act,objective,elapsed_sec\n'
+        '1,0.5,relu,2.0,1.0\n'
+        '11,0.5,relu,2.0,1.0\n'  # out of bounds
+        '2,0.1,selu,3.0,1.0\n'  # unknown category
+        '3,0.2,tanh,nan,1.0\n')  # failed
+    xy_data, elapsed_times = load_results(str(path), space)
+    assert xy_data == [({'x': 1, 'lr': 0.5, 'act': 'relu'}, 2.0)]
+    assert elapsed_times == [1.0]
+
+
+def test_load_results_json(tmpdir):
+    import json
+    from deephyper.search.hps.ambs import load_results
+    space = {'x': (0, 10), 'act': ['relu', 'tanh']}
+    path = tmpdir.join('results.json')
+    path.write(json.dumps({
+        json.dumps({'x': 1, 'act': 'tanh'}): 4.0,
+        json.dumps({'y': 1}): 4.0}))
+    xy_data, _ = load_results(str(path), space)
+    assert xy_data == [({'x': 1, 'act': 'tanh'}, 4.0)]
+
+
+def test_cost_aware_optimizer():
+    from argparse import Namespace
+    from deephyper.benchmark import HpProblem
+    from deephyper.search.hps.optimizer import Optimizer
+    pb = HpProblem()
+    pb.add_dim('x', (0.0, 1.0))
+    args = Namespace(learner='RF', acq_func='EIps', liar_strategy='cl_max')
+    opt = Optimizer(pb, 4, args)
+    XX = opt.ask_initial(n_points=4)
+    opt.tell([(x, x['x']) for x in XX], [10 * x['x'] for x in XX])
+    assert len(opt.times) == 4
+    # unknown durations take the mean runtime
+    for batch in opt.ask(n_points=2):
+        opt.tell([(x, x['x']) for x in batch])
+    assert all(len(y) == 2 for y in opt._optimizer.yi)
+
+
+def run_two_objectives(d):
+    return [d['x'], 10 - d['x']]
+
+
+def test_load_results_multi_objective(tmpdir, monkeypatch):
+    from deephyper.evaluator.evaluate import Evaluator
+    from deephyper.search.hps.ambs import load_results
+    monkeypatch.chdir(tmpdir)
+    space = {'x': (0, 10)}
+    evaluator = Evaluator.create(run_two_objectives, method='threadPool')
+    evaluator.add_eval_batch([{'x': 1}, {'x': 3}])
+    results = []
+    while len(results) < 2:
+        results.extend(evaluator.get_finished_evals())
+    evaluator.dump_evals()
+
+    for fname in ('results.csv', 'results.json'):
+        xy_data, _ = load_results(str(tmpdir.join(fname)), space)
+        assert sorted(xy_data, key=lambda xy: xy[0]['x']) == [
+            ({'x': 1}, [1., 9.]), ({'x': 3}, [3., 7.])]
@@ -0,0 +1,72 @@
+import json
+
+
+class FakeEvaluator:
+    def __init__(self):
+        self.stopped = []
+
+    def encode(self, x):
+        return json.dumps(x, sort_keys=True)
+
+    def stop_eval(self, x):
+        self.stopped.append(x)
+
+
+def create_asha(rungs, eta):
+    from deephyper.search.hps.asha import ASHA
+    asha = ASHA.__new__(ASHA)
+    asha.rungs = rungs
+    asha.eta = eta
+    asha.rung_results = [[] for _ in rungs]
+    asha.next_rung = {}
+    asha.stopped = set()
+    asha.evaluator = FakeEvaluator()
+    return asha
+
+
+def test_promotable_few_results():
+    asha = create_asha([1, 3], eta=3)
+    # fewer than eta results at the rung: every eval is promoted
+    assert asha.promotable(0, 5.)
+    assert asha.promotable(0, 9.)
+
+
+def test_promotable():
+    asha = create_asha([1, 3], eta=3)
+    assert asha.promotable(0, 5.)
+    assert asha.promotable(0, 9.)
+    # best 1/3 of [5, 9, 7] is 5
+    assert not asha.promotable(0, 7.)
+    assert asha.promotable(0, 1.)
+    assert asha.rung_results[0] == [5., 9., 7., 1.]
+    assert asha.rung_results[1] == []
+
+
+def test_on_report():
+    asha = create_asha([1, 3], eta=2)
+    x1, x2 = dict(x=1), dict(x=2)
+
+    # step 0 is a budget of 1: first rung
+    assert asha.on_report(x1, 0, 2.)
+    assert asha.on_report(x1, 1, 1.5)  # between two rungs
+    # best 1/2 of [2, 3] at the first rung
+    assert asha.on_report(x2, 0, 3.) is False
+    assert asha.evaluator.stopped == [x2]
+    assert asha.on_report(x2, 1, 2.5) is False  # reports after the stop request
+
+    # second rung, then no more rungs
+    assert asha.on_report(x1, 2, 1.)
+    assert asha.on_report(x1, 3, 0.5)
+    assert asha.next_rung[asha.evaluator.encode(x1)] == 2
+
+
+def test_sample_last_try(tmpdir, monkeypatch):
+    from deephyper.search.hps import asha
+    monkeypatch.chdir(tmpdir)
+    # the batch is filled at the last try
+    monkeypatch.setattr(asha, 'MAX_REJECTIONS', 1)
+    search = asha.ASHA('deephyper.benchmark.hps.polynome2.Problem',
+                       'deephyper.benchmark.hps.polynome2.run', 'threadPool',
+                       max_budget=3)
+    batch = search.sample(4)
+    assert len(batch) == 4 and all(x['epochs'] == 3 for x in batch)
@@ -0,0 +1,76 @@
+import re
+
+import pytest
+
+
+def test_results_exchange_single_rank():
+    MPI = pytest.importorskip('mpi4py.MPI')
+    from deephyper.search.hps.dambs import ResultsExchange
+    exchange = ResultsExchange(MPI.COMM_SELF)
+    exchange.put([({'x': 1}, 0.5, 1.0, 0.1)])
+    exchanged = None
+    while exchanged is None:
+        exchanged = exchange.progress()
+    items, stop = exchanged
+    assert items == [[({'x': 1}, 0.5, 1.0, 0.1)]]
+    assert not stop
+    assert exchange.outbox == []
+
+
+def run_slow(d):
+    import time
+    time.sleep(0.2)
+    return d['x']
+
+
+def test_prime_cache_skips_known_evals():
+    from deephyper.evaluator.evaluate import Evaluator
+    ev = Evaluator.create(run_slow, method='threadPool')
+    ev.add_eval({'x': 1})
+    # the same point received from an other rank while it is pending
+    assert ev.prime_cache([({'x': 1}, 5.), ({'x': 2}, 6.)]) == 1
+    results = []
+    while len(results) < 1:
+        results.extend(ev.get_finished_evals())
+    assert results == [({'x': 1}, 1)]
+    assert ev.finished_evals[ev._gen_uid({'x': 1})] == 1
+    # already finished
+    assert ev.prime_cache([({'x': 1}, 5.), ({'x': 2}, 7.)]) == 0
+    assert ev.finished_evals[ev._gen_uid({'x': 2})] == 6.
+
+
+def test_primed_results_not_sent():
+    from deephyper.evaluator.evaluate import Evaluator
+    from deephyper.search.hps.dambs import DAMBS
+    search = DAMBS.__new__(DAMBS)
+    search.evaluator = Evaluator.create(run_slow, method='threadPool')
+    search.primed = set()
+    # x=2 is received from an other rank, x=1 is pending
+    search.evaluator.add_eval({'x': 1})
+    assert search.prime([({'x': 2}, 6., 1., 0.2), ({'x': 1}, 5., 1., 0.2)]) == [
+        ({'x': 2}, 6.), ({'x': 1}, 5.)]
+    # the local cache hit on x=2 is not sent back
+    search.evaluator.add_eval({'x': 2})
+    results = []
+    while len(results) < 1:
+        results.extend(search.local_results())
+    assert results == [({'x': 1}, 1)]
+    assert search.evaluator.requested_evals == []
+
+
+@pytest.mark.slow
+def test_two_ranks(tmpdir, mpirun):
+    mpirun(2, 'deephyper.search.hps.dambs',
+           ['--problem', 'deephyper.benchmark.hps.polynome2.Problem',
+            '--run', 'deephyper.benchmark.hps.polynome2.run',
+            '--evaluator', 'threadPool', '--max-evals', '10'], tmpdir)
+    # the rank 0 writes the evals of both ranks
+    num_results = len(tmpdir.join('results.csv').readlines()) - 1
+    assert num_results >= 10
+    log = tmpdir.join('deephyper.log').read()
+    assert 'evals of the other ranks' in log
+    # all the ranks exchanged the same evals, each of them once
+    exchanged = re.findall(r'finishing on rank (\d): (\d+) evals exchanged', log)
+    assert sorted(rank for rank, _ in exchanged) == ['0', '1']
+    assert len({num for _, num in exchanged}) == 1
+    assert 10 <= int(exchanged[0][1]) <= num_results
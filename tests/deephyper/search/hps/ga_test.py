@@ -0,0 +1,62 @@
+import time
+
+
+def slow_run(d):
+    from deephyper.evaluator.reporter import report
+    # evals with e0 > 0 only finish when they are stopped
+    for step in range(1000 if d['e0'] > 0 else 1):
+        report(step, 1.)
+        time.sleep(0.01)
+    return float(d['e0'])
+
+
+def create_ga(run, **kwargs):
+    from deephyper.search.hps.ga import GA
+    return GA('deephyper.benchmark.hps.polynome2.Problem', run, 'threadPool',
+              ga_mode='steady_state', **kwargs)
+
+
+def test_steady_state(tmpdir, monkeypatch):
+    from deephyper.search.hps import ga
+    monkeypatch.chdir(tmpdir)
+    monkeypatch.setattr(ga, 'SERVICE_PERIOD', 0.01)
+    search = create_ga('deephyper.benchmark.hps.polynome2.run',
+                       ga_num_gen=2, individuals_per_worker=3)
+    search.run()
+    pop_size = search.optimizer.INIT_POP_SIZE
+    assert search.evaluator.stats['num_requested'] == pop_size * 3
+    assert search.optimizer.current_gen == 3
+    assert len(search.optimizer.logbook) == 3
+    assert all(0. <= record['utilization'] <= 1.
+               for record in search.optimizer.logbook)
+
+
+def test_steady_state_timeout(tmpdir, monkeypatch):
+    from deephyper.search.hps import ga
+    monkeypatch.chdir(tmpdir)
+    monkeypatch.setattr(ga, 'SERVICE_PERIOD', 0.01)
+    search = create_ga('ga_test.slow_run',
+                       ga_num_gen=1, individuals_per_worker=4,
+                       eval_timeout_minutes=0.5 / 60)
+    start = time.time()
+    search.run()
+    # slow evals are stopped after 0.5 sec instead of 10 sec
+    assert time.time() - start < 8
+    pop_size = search.optimizer.INIT_POP_SIZE
+    assert search.evaluator.stats['num_requested'] == pop_size * 2
+    pop = search.optimizer.pop
+    for ind, x in zip(pop, search.decode(pop)):
+        if x['e0'] > 0:
+            assert ind.fitness.values[0] == search.evaluator.FAIL_RETURN_VALUE
+        else:
+            assert ind.fitness.values[0] == x['e0']
+
+
+def test_feasible_individuals_last_try(tmpdir, monkeypatch):
+    from deephyper.search.hps import ga
+    monkeypatch.chdir(tmpdir)
+    # the individuals are all found at the last try
+    monkeypatch.setattr(ga, 'MAX_REJECTIONS', 1)
+    search = create_ga('deephyper.benchmark.hps.polynome2.run')
+    individuals, points = search.feasible_individuals(search.optimizer.toolbox.Individual, 4)
+    assert len(individuals) == len(points) == 4
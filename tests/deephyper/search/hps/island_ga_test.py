@@ -0,0 +1,30 @@
+import pytest
+
+ARGS = ['--problem', 'deephyper.benchmark.hps.polynome2.Problem',
+        '--run', 'deephyper.benchmark.hps.polynome2.run',
+        '--evaluator', 'threadPool', '--ga_num_gen', '3',
+        '--individuals_per_worker', '2', '--ga_migration_interval', '1']
+
+
+def test_single_island(tmpdir, monkeypatch):
+    pytest.importorskip('mpi4py.MPI')
+    from deephyper.search.hps.island_ga import IslandGA
+    from deephyper.search.hps.optimizer.ga_optimizer import SEED
+    monkeypatch.chdir(tmpdir)
+    args = vars(IslandGA.parse_args(ARGS))
+    search = IslandGA(**args)
+    assert search.optimizer.SEED == SEED + search.rank
+    search.run()
+    assert search.optimizer.current_gen == 3
+    assert search.num_sent == search.num_received == 0
+    assert tmpdir.join(f'ga_logbook_{search.rank}.log').check()
+
+
+def test_two_islands(tmpdir, mpirun):
+    mpirun(2, 'deephyper.search.hps.island_ga', ARGS, tmpdir)
+    assert tmpdir.join('ga_logbook_0.log').check()
+    assert tmpdir.join('ga_logbook_1.log').check()
+    log = tmpdir.join('deephyper.log').read()
+    assert 'Island 0 receives 2 migrants from island 1' in log
+    assert 'Island 1 receives 2 migrants from island 0' in log
+    assert 'Best individual of all islands' in log
@@ -0,0 +1,71 @@
+import numpy as np
+
+SPACE = [(1, 1000), (0.0, 1.0), (-10, 10), ['relu', 'elu', 'selu', 'tanh'], [8, 16, 32]]
+
+
+def legacy_decode_point(space_encoder, point):
+    """Per gene decoding of the previous SpaceEncoder implementation."""
+    result = []
+    for enc_val, encoder in zip(point, space_encoder.encoders):
+        dec_val = enc_val
+        if hasattr(encoder, 'classes_'):
+            bins = np.linspace(0.0, 1.0, num=1+len(list(encoder.classes_)))
+            dec_val = max(0, np.digitize(enc_val, bins, right=True) - 1)
+            dec_val = encoder.inverse_transform(np.array([dec_val]))
+        else:
+            dec_val = encoder.inverse_transform(np.array([dec_val]).reshape(1, -1))
+        result.append(dec_val.ravel()[0].item())
+    for i in range(len(point)):
+        if space_encoder.ttypes[i] == 'i':
+            result[i] = int(round(result[i]))
+    return result
+
+
+def test_decode_points_matches_per_gene_decoding():
+    from deephyper.search.hps.optimizer.ga_optimizer import SpaceEncoder
+    encoder = SpaceEncoder(SPACE)
+    rng = np.random.RandomState(42)
+    population = rng.uniform(size=(1000, len(SPACE))).tolist()
+    population += [[0.0]*len(SPACE), [1.0]*len(SPACE), [0.5]*len(SPACE)]
+
+    decoded = encoder.decode_points(population)
+    expected = [legacy_decode_point(encoder, p) for p in population]
+
+    assert decoded == expected
+    assert all(type(a) is type(b) for p, q in zip(decoded, expected) for a, b in zip(p, q))
+    assert encoder.decode_point(population[0]) == expected[0]
+
+
+def test_encode_decode_round_trip():
+    from deephyper.search.hps.optimizer.ga_optimizer import SpaceEncoder
+    encoder = SpaceEncoder(SPACE)
+    points = [[1, 0.25, -10, 'tanh', 16], [1000, 1.0, 3, 'relu', 8]]
+    encoded = encoder.encode_points(points)
+    assert encoded.shape == (2, len(SPACE))
+    assert encoder.decode_points(encoded) == points
+
+
+def test_screen_keeps_best_predicted_candidates():
+    from argparse import Namespace
+    from deap import creator
+    from deephyper.benchmark import HpProblem
+    from deephyper.search.hps.optimizer import GAOptimizer
+    problem = HpProblem()
+    problem.add_dim('x', (0.0, 1.0))
+    problem.add_dim('y', (0.0, 1.0))
+    args = Namespace(ga_num_gen=1, individuals_per_worker=4,
+                     ga_surrogate='ET', ga_oversampling=4.0)
+    opt = GAOptimizer(problem, 1, args)
+
+    rng = np.random.RandomState(0)
+    evaluated = [creator.Individual(p) for p in rng.uniform(size=(50, 2)).tolist()]
+    for ind in evaluated:
+        ind.fitness.values = (ind[0],)
+    opt.tell(evaluated)
+
+    candidates = [creator.Individual([v, 0.5]) for v in np.linspace(0, 1, 16)]
+    candidates.insert(0, creator.Individual(list(evaluated[0])))
+    assert opt.num_candidates(4) == 16
+    kept = opt.screen(candidates, 4)
+    assert len(kept) == 4
+    assert all(ind[0] < 0.35 for ind in kept)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+DIMS = [(1, 1000), (0.0, 1.0), (1e-5, 1e-1, 'log-uniform'), ['relu', 'elu', 'tanh']]
+
+
+@pytest.mark.parametrize('method', ['random', 'sobol', 'lhs', 'maximin'])
+def test_points_are_in_space(method):
+    from deephyper.search.hps.optimizer.initial_design import initial_design
+    points = initial_design(DIMS, 1000, method=method)
+    assert len(points) == 1000
+    for n, x, lr, act in points:
+        assert type(n) is int and 1 <= n <= 1000
+        assert 0.0 <= x < 1.0
+        assert 1e-5 <= lr <= 1e-1
+        assert act in DIMS[3]
+
+
+def test_lhs_strata():
+    from deephyper.search.hps.optimizer.initial_design import lhs_unit
+    U = lhs_unit(100, 3, np.random.RandomState(0))
+    for col in U.T:
+        assert sorted((col * 100).astype(int)) == list(range(100))
+
+
+def test_ask_initial_with_design():
+    from argparse import Namespace
+    from deephyper.benchmark import HpProblem
+    from deephyper.search.hps.optimizer import Optimizer
+    pb = HpProblem()
+    pb.add_dim('x', (0.0, 1.0))
+    pb.add_dim('act', ['relu', 'tanh'])
+    args = Namespace(learner='RF', acq_func='gp_hedge', liar_strategy='cl_max',
+                     initial_design='sobol')
+    opt = Optimizer(pb, 64, args)
+    XX = opt.ask_initial(n_points=64)
+    assert len(XX) == 64
+    assert len(opt._optimizer.Xi) == opt.counter == 64
@@ -0,0 +1,69 @@
+import sys
+
+
+def test_pareto_mask():
+    from deephyper.search.hps.optimizer.pareto import pareto_mask
+    Y = [[1, 5], [2, 2], [5, 1], [3, 3], [2, 2], [6, 6]]
+    assert pareto_mask(Y).tolist() == [True, True, True, False, True, False]
+
+
+def test_scalarizer_failed_vectors_are_worst():
+    from deephyper.search.hps.optimizer.pareto import Scalarizer
+    Y = [[0.0, 1.0], [1.0, 0.0], [sys.float_info.max] * 2]
+    scalarizer = Scalarizer()
+    scalarizer.observe(Y)
+    scalarizer.sample_weights(2)
+    s = scalarizer(Y)
+    assert s[2] == max(s[:2])
+    assert all(0 <= v <= 1 + scalarizer.rho for v in s)
+
+
+def test_parse_objective_vector():
+    from deephyper.evaluator.evaluate import Evaluator
+    assert Evaluator._parse('DH-OUTPUT: 0.5\n') == 0.5
+    assert Evaluator._parse('log\nDH-OUTPUT: 0.5 2 3e-3\n') == (0.5, 2., 3e-3)
+    assert Evaluator._parse('DH-OUTPUT: 0.5 nan\n') == sys.float_info.max
+
+
+def test_pareto_front_incremental(tmpdir):
+    import numpy as np
+    from deephyper.search.hps.optimizer.pareto import ParetoFront, pareto_mask
+    Y = np.random.RandomState(0).rand(200, 3).tolist()
+    front = ParetoFront(str(tmpdir.join('pareto.csv')))
+    for i, y in enumerate(Y):
+        front.add({'i': i}, y)
+    expected = [i for i, keep in enumerate(pareto_mask(Y)) if keep]
+    assert [x['i'] for x, _ in front.front] == expected
+
+
+def test_scalar_failures_before_vectors():
+    from argparse import Namespace
+    from deephyper.benchmark import HpProblem
+    from deephyper.search.hps.optimizer import Optimizer
+    pb = HpProblem()
+    pb.add_dim('x', (0.0, 1.0))
+    args = Namespace(learner='RF', acq_func='LCB', liar_strategy='cl_max')
+    opt = Optimizer(pb, 4, args)
+    XX = opt.ask_initial(n_points=4)
+    # the first results are failures, then vectors of objectives
+    opt.tell([(XX[0], sys.float_info.max), (XX[1], 1e6)])
+    assert not opt.multi_objective
+    opt.tell([(XX[2], (0., 1.)), (XX[3], (1., 0.))])
+    assert opt.multi_objective
+    values = [opt.evals[(x['x'],)] for x in XX]
+    assert values[0] == values[1] == max(values[2:])
+    assert all(0 <= v <= 1 + opt.scalarizer.rho for v in values)
+
+
+def test_runner_prints_array_objectives(tmpdir):
+    import subprocess
+    from deephyper.evaluator import runner
+    from deephyper.evaluator.evaluate import Evaluator
+    tmpdir.join('array_run.py').write(
+        'import numpy as np\n'
+        'def run(d):\n'
+        '    return np.array([[d["x"], 2.5]])\n')
+    out = subprocess.check_output(
+        [sys.executable, runner.__file__, str(tmpdir), 'array_run', 'run', '{"x": 0.5}'],
+        cwd=str(tmpdir))
+    assert Evaluator._parse(out.decode()) == (0.5, 2.5)
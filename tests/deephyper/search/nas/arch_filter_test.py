@@ -0,0 +1,24 @@
+def create_filter(monkeypatch, **kwargs):
+    from deephyper.search.nas.utils.arch_filter import ArchitectureFilter
+
+    def create_structure(arch_seq):
+        raise ValueError('incompatible shapes')
+
+    space = dict(create_structure=dict(
+        func='deephyper.search.nas.model.baseline.anl_mlp_2.create_structure'))
+    arch_filter = ArchitectureFilter(space, **kwargs)
+    arch_filter._shapes = (5,), (1,)
+    monkeypatch.setattr(arch_filter, 'create_structure', create_structure)
+    return arch_filter
+
+
+def test_invalid_architecture(monkeypatch):
+    arch_filter = create_filter(monkeypatch, max_params=100)
+    assert arch_filter.check([0, 1, 0, 0, 1, 0]).startswith('invalid architecture')
+
+
+def test_no_validation(monkeypatch):
+    # the cost is unknown, the architecture is accepted
+    arch_filter = create_filter(monkeypatch, validation=False, max_params=100)
+    accepted, rejected = arch_filter.split([dict(arch_seq=[0, 1, 0, 0, 1, 0])])
+    assert len(accepted) == 1 and rejected == []
@@ -0,0 +1,11 @@
+def test_op_indexes():
+    from deephyper.search.nas.model.space.node import op_indexes
+    assert op_indexes([0.31, 0.33, 1, 0., 1.], [3, 3, 3, 2, 5]) == [1, 1, 1, 0, 4]
+
+
+def test_canonical_key():
+    from deephyper.search.nas.utils.arch_key import canonical_arch_seq
+    num_ops = [3, 2]
+    a = canonical_arch_seq([0.31, 1, 0.7], num_ops)
+    b = canonical_arch_seq([0.33, 1., 0.1], num_ops)
+    assert a == b == [1, 1]
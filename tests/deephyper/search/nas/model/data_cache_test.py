@@ -0,0 +1,65 @@
+import numpy as np
+
+CALLS = []
+
+
+def load_data(dim=2):
+    CALLS.append(dim)
+    return np.ones((4, dim))
+
+
+def run(config):
+    from deephyper.search.nas.model import data_cache
+    kwargs = config['kwargs']
+    data = data_cache.cached(data_cache.make_key(load_data, kwargs),
+                             lambda: load_data(**kwargs))
+    return float(data.sum())
+
+
+def test_data_cache_telemetry():
+    from deephyper.evaluator._threadPool import ThreadPoolEvaluator
+    from deephyper.search.nas.model import data_cache
+    data_cache.clear()
+    CALLS.clear()
+    evaluator = ThreadPoolEvaluator(run)
+    evaluator.add_eval_batch([{'kwargs': {'dim': dim}, 'id': i}
+                              for i, dim in enumerate([2, 3, 2, 2])])
+    results = list(evaluator.await_evals(
+        [{'kwargs': {'dim': dim}, 'id': i} for i, dim in enumerate([2, 3, 2, 2])]))
+    assert [y for _, y in results] == [8., 12., 8., 8.]
+    list(evaluator.get_finished_evals())
+    assert CALLS == [2, 3]
+    assert evaluator.stats['data_cache_misses'] == 2
+    assert evaluator.stats['data_cache_hits'] == 2
+
+
+def test_make_key():
+    from deephyper.search.nas.model.data_cache import make_key
+    assert make_key(load_data, {'a': 1, 'b': 2}) == make_key(load_data, {'b': 2, 'a': 1})
+    assert make_key(load_data) != make_key(load_data, preprocessing=load_data)
+
+
+def test_data_cache_concurrent_keys():
+    import threading
+    from deephyper.search.nas.model import data_cache
+    data_cache.clear()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(30)
+        return 'slow'
+
+    thread = threading.Thread(target=data_cache.cached, args=(('slow',), slow))
+    thread.start()
+    assert started.wait(30)
+    # an other dataset is computed while the first one is being computed
+    fast = threading.Thread(target=data_cache.cached, args=(('fast',), lambda: 'fast'))
+    fast.start()
+    fast.join(10)
+    computed = not fast.is_alive()
+    release.set()
+    assert computed
+    thread.join()
+    assert data_cache.cached(('slow',), lambda: 'computed again') == 'slow'
@@ -0,0 +1,34 @@
+import copy
+
+import pytest
+
+
+def run(config):
+    from deephyper.search.nas.model.run import supernet
+    return supernet.run(config)
+
+
+@pytest.mark.slow
+def test_supernet_run():
+    from random import random
+    from deephyper.benchmark.nas.linearReg.problem import Problem
+    from deephyper.evaluator._threadPool import ThreadPoolEvaluator
+    from deephyper.search.nas.model.run import supernet
+
+    evaluator = ThreadPoolEvaluator(run)
+    config = copy.deepcopy(Problem.space)
+    config['hyperparameters']['supernet_paths'] = 2
+    config['arch_seq'] = [random() for _ in range(100)]
+    evaluator.add_eval(config)
+    list(evaluator.await_evals([config]))
+    assert len(supernet.get_supernet(config).weights) > 0
+    # the evaluated architecture inherited the weights of the supernet
+    assert evaluator.stats['supernet_inherited_layers'] > 0
+
+    # the supernet is trained once per worker
+    config = copy.deepcopy(Problem.space)
+    config['hyperparameters']['fine_tune_epochs'] = 1
+    config['arch_seq'] = [random() for _ in range(100)]
+    evaluator.add_eval(config)
+    list(evaluator.await_evals([config]))
+    assert len(supernet._supernets) == 1
@@ -0,0 +1,83 @@
+import networkx as nx
+import pytest
+
+
+class Dense:
+    def __init__(self, units, activation=None):
+        self.units = units
+        self.activation = activation
+        self.kwargs = {}
+
+
+class Concatenate:
+    pass
+
+
+class Tensor:
+    pass
+
+
+class Node:
+    def __init__(self, name, op):
+        self.name = name
+        self.op = op
+
+
+class Structure:
+    def __init__(self, input_shapes, output_shape, edges, output_node):
+        self.graph = nx.DiGraph(edges)
+        self.input_nodes = [Node(f'Input_{i}', Tensor()) for i in range(len(input_shapes))]
+        self.input_shapes = input_shapes
+        self.output_shape = output_shape
+        self.output_node = output_node
+
+    @property
+    def node_table(self):
+        from deephyper.search.nas.model.space.dag import compile_graph
+        return compile_graph(self.graph, self.output_node)
+
+
+def test_estimate():
+    from deephyper.search.nas.model.space.cost import estimate
+
+    s = Structure([(5,)], (1,), [], None)
+    inpt = s.input_nodes[0]
+    d1, d2 = Node('N_0', Dense(10)), Node('N_1', Dense(20))
+    out = Node('Structure_Output', Concatenate())
+    s.graph.add_edges_from([(inpt, d1), (inpt, d2), (d1, out), (d2, out)])
+    s.output_node = out
+
+    cost = estimate(s)
+    assert cost['params'] == (5*10 + 10) + (5*20 + 20) + (30*1 + 1)
+    assert cost['flops'] == 2*5*10 + 2*5*20 + 2*30
+    # the input is freed after the second Dense, both Dense are freed after the concatenation
+    assert cost['activation_memory'] == 4 * (10 + 20 + 30)
+
+
+def test_incompatible_shapes():
+    from deephyper.search.nas.model.space.cost import estimate, ShapeError
+
+    s = Structure([(5,)], (1,), [], None)
+    inpt = s.input_nodes[0]
+    d1 = Node('N_0', Dense(10))
+    out = Node('Structure_Output', Dense(3))
+    s.graph.add_edges_from([(inpt, out), (d1, out), (inpt, d1)])
+    s.output_node = out
+
+    with pytest.raises(ShapeError):
+        estimate(s)
+
+
+def test_no_input():
+    from deephyper.search.nas.model.space.cost import estimate, ShapeError
+
+    s = Structure([(5,)], (1,), [], None)
+    inpt = s.input_nodes[0]
+    d1 = Node('N_0', Dense(10))
+    out = Node('Structure_Output', Concatenate())
+    # N_0 is not connected to the input
+    s.graph.add_edges_from([(inpt, out), (d1, out)])
+    s.output_node = out
+
+    with pytest.raises(ShapeError):
+        estimate(s)
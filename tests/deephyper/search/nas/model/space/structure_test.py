@@ -0,0 +1,197 @@
+import pytest
+
+
+def test_fingerprint():
+    from deephyper.search.nas.model.baseline.anl_mlp_2 import create_structure
+
+    def fingerprint(ops):
+        structure = create_structure((5,), (1,), 2)
+        structure.set_ops(ops)
+        return structure.fingerprint()
+
+    # node ids differ between structures, not the fingerprints
+    assert fingerprint([0, 1, 0, 0, 1, 0]) == fingerprint([0, 1, 0, 0, 1, 0])
+    assert fingerprint([0, 0, 0, 0, 0, 0]) != fingerprint([0, 1, 0, 0, 0, 0])
+    # both cells are connected to the input, their outputs are concatenated
+    assert fingerprint([0, 1, 0, 0, 2, 0]) == fingerprint([0, 2, 0, 0, 1, 0])
+    # the second cell is connected to the first one
+    assert fingerprint([0, 1, 0, 1, 2, 0]) != fingerprint([0, 2, 0, 1, 1, 0])
+    assert fingerprint([0, 1, 1, 0, 1, 0]) != fingerprint([0, 1, 0, 0, 1, 0])
+
+
+def test_template():
+    import threading
+    from deephyper.search.nas.model.baseline.anl_mlp_2 import create_structure
+    from deephyper.search.nas.model.space.node import Node
+    from deephyper.search.nas.model.space.template import get_template
+
+    cs = dict(func=create_structure, kwargs=dict(num_cells=2))
+    num = Node.num
+    template = get_template(cs, (5,), (1,))
+    assert Node.num == num
+    assert get_template(cs, (5,), (1,)) is template
+
+    for ops in ([0, 1, 0, 1, 2, 0], [0, 2, 3, 0, 1, 0], [0, 1, 0, 1, 2, 0]):
+        structure = create_structure((5,), (1,), 2)
+        structure.set_ops(ops)
+        template.set_ops(ops)
+        assert template.fingerprint() == structure.fingerprint()
+        assert template.estimate_cost()['params'] == structure.estimate_cost()['params']
+
+    # the templates of other threads have the same ids
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_template(cs, (5,), (1,))))
+    thread.start()
+    thread.join()
+    assert other[0] is not template
+    assert other[0].map_sh2int == template.map_sh2int
+
+
+def test_local_numbering_threads():
+    import threading
+    from deephyper.search.nas.model.space.cell import Cell
+    from deephyper.search.nas.model.space.node import Node, local_numbering
+
+    node_num, cell_num = Node.num, Cell.num
+    other = []
+    with local_numbering():
+        node, cell = Node(), Cell([])
+        # structures created by other threads meanwhile use the global counters
+        thread = threading.Thread(target=lambda: other.extend([Node(), Cell([])]))
+        thread.start()
+        thread.join()
+    assert node.id == 1 and cell.num == 1
+    assert other[0].id == node_num + 1 and other[1].num == cell_num + 1
+    assert Node.num == node_num + 1 and Cell.num == cell_num + 1
+
+
+def test_fuse_table():
+    from deephyper.search.nas.model.baseline.anl_mlp_2 import create_structure
+    from deephyper.search.nas.model.space.structure import fuse_table
+
+    structure = create_structure((5,), (1,), 2)
+    # Connect, Dense, Dropout(0.) in each cell, the second cell is connected to the first one
+    structure.set_ops([0, 1, 0, 1, 2, 0])
+    table, sources = fuse_table(structure.node_table)
+
+    assert [n.name for n, _ in table] == ['Input_0', 'N_1', 'N_1']
+    assert [[p.name for p in pred] for _, pred in table] == [[], ['Input_0'], ['N_1']]
+    assert sources[structure.output_node] == [table[-1][0]]
+
+    # the outputs of both cells are concatenated
+    structure.set_ops([0, 1, 0, 0, 2, 0])
+    table, _ = fuse_table(structure.node_table)
+    assert [n.name for n, _ in table] == ['Input_0', 'N_1', 'N_1', 'Structure_Output']
+
+
+def test_layer_signatures():
+    from deephyper.search.nas.model.baseline.anl_mlp_2 import create_structure
+
+    def signatures(ops):
+        structure = create_structure((5,), (1,), 2)
+        structure.set_ops(ops)
+        structure.create_model()
+        return structure.fingerprint(), structure.get_layer_signatures()
+
+    # Dense(5) and Dense(10) on the input, concatenated in opposite orders
+    fp1, sigs1 = signatures([0, 1, 0, 0, 2, 0])
+    fp2, sigs2 = signatures([0, 2, 0, 0, 1, 0])
+    assert fp1 == fp2
+    inner1 = {sig for sig in sigs1 if not sig.startswith('output_')}
+    inner2 = {sig for sig in sigs2 if not sig.startswith('output_')}
+    assert len(inner1) == 2 and inner1 == inner2
+    # the weights of the output layer do not fit the other order
+    output1 = {sig for sig in sigs1 if sig.startswith('output_')}
+    output2 = {sig for sig in sigs2 if sig.startswith('output_')}
+    assert len(output1) == 1 and output1 != output2
+
+
+def test_reset_after_failed_model(monkeypatch):
+    from deephyper.search.nas.model.baseline.anl_mlp_2 import create_structure
+    from deephyper.search.nas.model.space import structure as structure_module
+
+    def failing_create_tensors(table, train=None):
+        create_tensors(table, train=train)
+        raise ValueError('model creation failed')
+
+    structure = create_structure((5,), (1,), 2)
+    structure.set_ops([0, 1, 0, 0, 1, 0])
+    create_tensors = structure_module.create_tensors
+    monkeypatch.setattr(structure_module, 'create_tensors', failing_create_tensors)
+    with pytest.raises(ValueError):
+        structure.create_model()
+    monkeypatch.undo()
+    stale = [n._tensor for n in structure.graph.nodes() if n._tensor is not None]
+    stale += [op._layer for n in structure.graph.nodes() if hasattr(n, 'ops')
+              for op in n.ops if getattr(op, '_layer', None) is not None]
+
+    # the first cell keeps its Dense(5)
+    structure.set_ops([0, 1, 0, 0, 2, 0])
+    structure.create_model()
+    new = [n._tensor for n, _ in structure.node_table]
+    new += [layer for _, layer in structure._node_layers()]
+    assert not any(x is y for x in new for y in stale)
+
+    other = create_structure((5,), (1,), 2)
+    other.set_ops([0, 1, 0, 0, 2, 0])
+    other.create_model()
+    assert structure.get_layer_signatures().keys() == other.get_layer_signatures().keys()
+
+
+def create_large_structure(num_cells, num_blocks, num_nodes):
+    from deephyper.search.nas.model.space.block import Block
+    from deephyper.search.nas.model.space.cell import Cell
+    from deephyper.search.nas.model.space.node import VariableNode
+    from deephyper.search.nas.model.space.op.op1d import Dense, Identity
+    from deephyper.search.nas.model.space.structure import KerasStructure
+
+    # sequential cells of parallel blocks, each block is a chain of nodes
+    structure = KerasStructure((5,), (1,))
+    inputs = structure.input_nodes
+    for _ in range(num_cells):
+        cell = Cell(inputs)
+        for _ in range(num_blocks):
+            block = Block()
+            nodes = []
+            for i in range(num_nodes):
+                node = VariableNode(f'N_{i}')
+                node.add_op(Identity())
+                node.add_op(Dense(2))
+                block.add_node(node)
+                if nodes:
+                    block.add_edge(nodes[-1], node)
+                nodes.append(node)
+            cell.graph.add_edge(inputs[-1], nodes[0])
+            cell.add_block(block)
+        cell.set_outputs()
+        structure.add_cell(cell)
+        inputs = [cell.output]
+    return structure
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('num_cells,num_blocks,num_nodes,params', [
+    # Dense(2) every 100 nodes, then the output layer
+    (1, 1, 2000, (5*2 + 2) + 19 * (2*2 + 2) + (2*1 + 1)),
+    # the outputs of the 2 blocks of a cell are concatenated
+    (4, 2, 250, 2 * ((5*2 + 2) + 2 * (2*2 + 2)) + 3 * 2 * ((4*2 + 2) + 2 * (2*2 + 2)) + (4*1 + 1)),
+])
+def test_large_structure_benchmark(num_cells, num_blocks, num_nodes, params):
+    import time
+
+    t0 = time.time()
+    structure = create_large_structure(num_cells, num_blocks, num_nodes)
+    structure.set_ops([1 if i % 100 == 0 else 0
+                       for _ in range(num_cells * num_blocks) for i in range(num_nodes)])
+    cost = structure.estimate_cost()
+    structure.fingerprint()
+    t1 = time.time()
+    structure.create_model()
+    t2 = time.time()
+
+    # input, variable nodes, outputs of the cells and output of the structure
+    assert len(structure.node_table) == num_cells * (num_blocks * num_nodes + 1) + 2
+    assert cost['params'] == params
+    # loose bounds, a recursive or quadratic walk of the graph takes minutes
+    assert t1 - t0 < 20
+    assert t2 - t1 < 120
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class Layer:
+    def __init__(self, *shapes):
+        self.weights = [np.random.rand(*shp) for shp in shapes]
+
+    def get_weights(self):
+        return self.weights
+
+    def set_weights(self, weights):
+        self.weights = weights
+
+
+class Structure:
+    def __init__(self, name, layers):
+        self.name = name
+        self.layers = layers
+
+    def fingerprint(self):
+        return self.name
+
+    def get_layer_signatures(self):
+        return self.layers
+
+
+def test_weights_store(tmpdir):
+    from deephyper.search.nas.model.weights_store import WeightsStore
+    store = WeightsStore(str(tmpdir))
+
+    parent = Structure('parent', {'a': Layer((2, 3), (3,)), 'b': Layer((3, 1))})
+    store.save(parent)
+
+    child = Structure('child', {'a': Layer((2, 3), (3,)), 'b': Layer((4, 1)), 'c': Layer((1,))})
+    assert store.load(child) == 1
+    assert np.array_equal(child.layers['a'].weights[0], parent.layers['a'].weights[0])
+    assert not np.array_equal(child.layers['b'].weights[0][:3], parent.layers['b'].weights[0])
+
+
+def test_weights_store_bound(tmpdir):
+    import os
+    from deephyper.search.nas.model.weights_store import WeightsStore
+    store = WeightsStore(str(tmpdir), max_files=2)
+
+    for i in range(3):
+        store.save(Structure(f'arch{i}', {f'l{i}': Layer((2,))}))
+        # distinct modification times
+        os.utime(os.path.join(str(tmpdir), f'arch{i}.npz'), (i, i))
+    store.save(Structure('arch3', {'l3': Layer((2,))}))
+    assert sorted(os.listdir(str(tmpdir))) == ['arch2.npz', 'arch3.npz']
+
+    child = Structure('child', {f'l{i}': Layer((2,)) for i in range(4)})
+    assert store.load(child) == 2